@@ -0,0 +1,149 @@
+import numpy as np
+
+# --- 포지션 / 청산 사유 코드 ---
+FLAT, LONG, SHORT = 0, 1, -1
+REASON_SIGNAL, REASON_STOP = 0, 1
+
+
+# --- 포지션 상태 머신 ---
+# 봉 단위가 아니라 거래 단위로 진행합니다.
+# 진입/청산 후보 인덱스를 미리 뽑아두고 searchsorted 로 다음 이벤트로 바로 건너뛰므로
+# 파이썬 루프 횟수는 거래 수에 비례하고, 봉 단위 작업은 모두 NumPy 배열 연산입니다.
+def resolve_positions(close, long_entry, short_entry, long_exit, short_exit,
+                      start=0, stop=None, sl_pct=None, valid=None):
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close) if stop is None else min(stop, len(close))
+    if valid is None:
+        valid = np.ones(len(close), dtype=bool)
+
+    entry_mask = (long_entry | short_entry) & valid
+    entries = np.flatnonzero(entry_mask[:n])
+    exits = {
+        LONG: np.flatnonzero((long_exit & valid)[:n]),
+        SHORT: np.flatnonzero((short_exit & valid)[:n]),
+    }
+
+    entry_idx, exit_idx, sides, reasons = [], [], [], []
+    open_side, open_entry = FLAT, -1
+
+    i = start
+    while True:
+        k = np.searchsorted(entries, i)
+        if k >= len(entries):
+            break
+        e = int(entries[k])
+        side = LONG if long_entry[e] else SHORT
+        entry_price = close[e]
+
+        # 1. 신호 청산 후보: 진입 다음 봉부터
+        side_exits = exits[side]
+        k2 = np.searchsorted(side_exits, e, side="right")
+        x = int(side_exits[k2]) if k2 < len(side_exits) else n
+        reason = REASON_SIGNAL
+
+        # 2. 손절 후보: 신호 청산 봉까지 포함해 검사 (같은 봉이면 손절 우선)
+        if sl_pct is not None:
+            hi = min(x + 1, n)
+            seg = close[e + 1:hi]
+            if side == LONG:
+                hit = seg <= entry_price * (1 - sl_pct)
+            else:
+                hit = seg >= entry_price * (1 + sl_pct)
+            hit &= valid[e + 1:hi]
+            if hit.any():
+                x = e + 1 + int(hit.argmax())
+                reason = REASON_STOP
+
+        if x >= n:
+            open_side, open_entry = side, e
+            break
+
+        entry_idx.append(e)
+        exit_idx.append(x)
+        sides.append(side)
+        reasons.append(reason)
+        i = x  # 청산한 봉에서 바로 재진입 가능
+
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    exit_idx = np.asarray(exit_idx, dtype=np.int64)
+    sides = np.asarray(sides, dtype=np.int8)
+    entry_price = close[entry_idx]
+    exit_price = close[exit_idx]
+    pnl = np.where(sides == LONG, exit_price - entry_price, entry_price - exit_price) / entry_price
+
+    return {
+        "entry_idx": entry_idx,
+        "exit_idx": exit_idx,
+        "side": sides,
+        "reason": np.asarray(reasons, dtype=np.int8),
+        "pnl": pnl,
+        "open_side": open_side,
+        "open_entry_idx": open_entry,
+    }
+
+
+def run_backtest(close, signals, start=0, stop=None, sl_pct=None):
+    return resolve_positions(
+        close,
+        signals["long_entry"], signals["short_entry"],
+        signals["long_exit"], signals["short_exit"],
+        start=start, stop=stop, sl_pct=sl_pct, valid=signals.get("valid"),
+    )
+
+
+# --- 파라미터 조합 일괄 상태 머신 ---
+# 신호 배열이 (봉 수, P) 일 때 P개 조합의 포지션을 한 번의 봉 순회로 동시에 해결합니다.
+# 봉마다의 연산은 조합 축 방향 NumPy 벡터 연산이고, 결과는 조합별 resolve_positions 와 같습니다.
+# start / sl_pct 는 스칼라 또는 (P,) 배열 (손절 없음은 np.inf)
+def resolve_positions_batch(close, long_entry, short_entry, long_exit, short_exit,
+                            start=0, sl_pct=np.inf, valid=None, initial_balance=1000000):
+    close = np.asarray(close, dtype=np.float64)
+    n, p = long_entry.shape
+    start = np.broadcast_to(np.asarray(start, dtype=np.int64), (p,))
+    sl_pct = np.broadcast_to(np.asarray(sl_pct, dtype=np.float64), (p,))
+    if valid is None:
+        valid = np.ones((n, 1), dtype=bool)
+
+    pos = np.zeros(p, dtype=np.int8)
+    entry = np.ones(p)
+    balance = np.full(p, float(initial_balance))
+    trades = np.zeros(p, dtype=np.int64)
+    wins = np.zeros(p, dtype=np.int64)
+    long_stop_factor = 1 - sl_pct
+    short_stop_factor = 1 + sl_pct
+
+    with np.errstate(invalid="ignore"):
+        for i in range(int(start.min()) if p else n, n):
+            c = close[i]
+            active = valid[i] & (start <= i)
+
+            # 1. 청산 (손절 또는 신호)
+            exit_long = (pos == LONG) & active & ((c <= entry * long_stop_factor) | long_exit[i])
+            exit_short = (pos == SHORT) & active & ((c >= entry * short_stop_factor) | short_exit[i])
+            closing = exit_long | exit_short
+            if closing.any():
+                pnl = np.where(exit_long, c - entry, entry - c) / entry
+                balance[closing] *= 1 + pnl[closing]
+                trades += closing
+                wins += closing & (pnl > 0)
+                pos[closing] = FLAT
+
+            # 2. 진입
+            flat = (pos == FLAT) & active
+            go_long = flat & long_entry[i]
+            go_short = flat & ~go_long & short_entry[i]
+            opening = go_long | go_short
+            if opening.any():
+                pos[go_long] = LONG
+                pos[go_short] = SHORT
+                entry[opening] = c
+
+    return {"balance": balance, "trades": trades, "wins": wins, "open_side": pos}
+
+
+# --- 잔고 복리 계산 (거래 순서대로 누적) ---
+def compound_balance(initial_balance, pnl):
+    if len(pnl) == 0:
+        return initial_balance
+    factors = np.concatenate(([initial_balance], 1 + np.asarray(pnl, dtype=np.float64)))
+    return np.multiply.accumulate(factors)[-1]
@@ -0,0 +1,156 @@
+import os
+import re
+import threading
+
+import pandas as pd
+
+# --- 로컬 OHLCV 저장소 ---
+# (source, ticker, interval) 마다 파일 하나. 마지막 저장 시각 이후의 꼬리만 받아서 이어 붙입니다.
+STORE_DIR = os.environ.get("AUTO_TRADE_BAR_STORE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bar_store"))
+
+
+class BarStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        self.frames = {}  # 프로세스 내 메모리 캐시
+
+    def path(self, source, ticker, interval):
+        safe_ticker = re.sub(r"[^0-9A-Za-z_.-]", "_", ticker)
+        return os.path.join(self.root, source, safe_ticker, f"{interval}.pkl")
+
+    def load(self, source, ticker, interval):
+        key = (source, ticker, interval)
+        with self.lock:
+            if key in self.frames:
+                return self.frames[key]
+        path = self.path(source, ticker, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_pickle(path)
+        except Exception as e:
+            print(f"Bar store read error {path}: {e}")
+            return None
+        with self.lock:
+            self.frames[key] = df
+        return df
+
+    def save(self, source, ticker, interval, df):
+        path = self.path(source, ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, path)  # 원자적 교체 (읽는 쪽은 항상 완전한 파일만 봄)
+        with self.lock:
+            self.frames[(source, ticker, interval)] = df
+
+    def last_timestamp(self, source, ticker, interval):
+        df = self.load(source, ticker, interval)
+        if df is None or df.empty:
+            return None
+        return df.index[-1]
+
+    # 저장된 봉 + 새로 받은 꼬리 봉 병합
+    # 저장 당시 마지막 봉은 아직 진행 중이던 봉일 수 있으므로 버리고 새 값으로 대체합니다.
+    @staticmethod
+    def splice(stored, tail):
+        if stored is None or stored.empty:
+            return tail
+        if tail is None or tail.empty:
+            return stored
+        if tail.index.tz != stored.index.tz:
+            tail = tail.tz_convert(stored.index.tz) if stored.index.tz is not None else tail.tz_localize(None)
+        if tail.index[0] > stored.index[-1]:
+            # 꼬리가 저장된 마지막 봉(미완성)을 포함하지 않으면 중간이 비었을 수 있음 -> 전체 재수집
+            return None
+        merged = pd.concat([stored.iloc[:-1], tail])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        return merged.sort_index()
+
+    # fetch_fn(ticker, interval, count, since=...) 로 꼬리만 받아서 동기화
+    # trim: 보관 기간 정리 함수 (df -> df)
+    def sync(self, source, ticker, interval, fetch_fn, count, trim=None, offline=False):
+        stored = self.load(source, ticker, interval)
+        if offline:
+            return stored if stored is not None else pd.DataFrame()
+
+        merged = None
+        if stored is not None and not stored.empty:
+            tail = fetch_fn(ticker, interval, count, since=stored.index[-1])
+            if tail is None or tail.empty:
+                raise ConnectionError(f"empty tail for {ticker} ({interval})")
+            merged = self.splice(stored, tail)
+
+        if merged is None:
+            merged = fetch_fn(ticker, interval, count)
+            if merged is None or merged.empty:
+                raise ConnectionError(f"empty response for {ticker} ({interval})")
+
+        if trim is not None:
+            merged = trim(merged)
+        self.save(source, ticker, interval, merged)
+        return merged
+
+    # 저장소를 거치는 수집 함수로 감싸기 (data_fetcher.iter_fetch 에 그대로 넘길 수 있는 형태)
+    def synced(self, source, fetch_fn, trim=None, offline=False):
+        def fetch(ticker, interval, count):
+            return self.sync(source, ticker, interval, fetch_fn, count,
+                             trim=(lambda df: trim(source, interval, df, count)) if trim else None,
+                             offline=offline)
+        return fetch
+
+    # 여러 종목 일괄 동기화: bulk_fn(tickers, interval, count, since=...) -> {ticker: df}
+    # 모든 종목에 저장본이 있으면 가장 이른 마지막 봉 이후 꼬리만 한 번에 받고,
+    # 저장본이 없거나 꼬리가 이어지지 않는 종목만 모아서 전체 기간을 다시 받습니다.
+    def sync_many(self, source, tickers, interval, bulk_fn, count, trim=None, offline=False):
+        stored = {t: self.load(source, t, interval) for t in tickers}
+        if offline:
+            return {t: df for t, df in stored.items() if df is not None and not df.empty}
+
+        merged = {}
+        lasts = [df.index[-1] for df in stored.values() if df is not None and not df.empty]
+        if lasts and len(lasts) == len(tickers):
+            tails = bulk_fn(tickers, interval, count, since=min(lasts))
+            for t in tickers:
+                tail = tails.get(t)
+                if tail is not None and not tail.empty:
+                    spliced = self.splice(stored[t], tail)
+                    if spliced is not None:
+                        merged[t] = spliced
+
+        missing = [t for t in tickers if t not in merged]
+        if missing:
+            full = bulk_fn(missing, interval, count)
+            for t in missing:
+                df = full.get(t)
+                if df is not None and not df.empty:
+                    merged[t] = df
+
+        if not merged:
+            raise ConnectionError(f"empty response for {len(tickers)} tickers ({interval})")
+        for t, df in merged.items():
+            if trim is not None:
+                df = merged[t] = trim(df)
+            self.save(source, t, interval, df)
+        return merged
+
+    def synced_many(self, source, bulk_fn, trim=None, offline=False):
+        def fetch(tickers, interval, count):
+            return self.sync_many(source, tickers, interval, bulk_fn, count,
+                                  trim=(lambda df: trim(source, interval, df, count)) if trim else None,
+                                  offline=offline)
+        return fetch
+
+    # 네트워크 실패 시 대체용: 저장된 봉 그대로 반환
+    def fallback(self, source, ticker, interval):
+        def load():
+            df = self.load(source, ticker, interval)
+            return df if df is not None else pd.DataFrame()
+        return load
+
+    def fallback_many(self, source, tickers, interval):
+        def load():
+            frames = {t: self.load(source, t, interval) for t in tickers}
+            return {t: df for t, df in frames.items() if df is not None and not df.empty}
+        return load
@@ -1,12 +1,30 @@
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
-import yfinance as yf
-import pyupbit
 import json
 import time
 import traceback
 from datetime import datetime
 import os
+import threading
+
+import backtest_engine
+import bar_store
+import data_fetcher
+import history
+import indicators
+import parallel
+import perf
+import portfolio
+import result_cache
+import risk_metrics
+import scheduler
+import snapshots
+import strategies
+import streaming
+import sweep
+import timeframes
+import trade_records
+import walk_forward
 
 # --- 설정 ---
 ASSET_LIST = [
@@ -47,303 +65,650 @@ ASSET_LIST = [
 INTERVALS = ["5분", "15분", "30분", "1시간", "4시간", "1일"]
 
 # --- 데이터 수집 함수 ---
-def get_data(ticker, source, interval_str):
-    df = pd.DataFrame()
-    try:
-        # 매핑
-        upbit_int_map = {"5분":"minute5", "15분":"minute15", "30분":"minute30", "1시간":"minute60", "4시간":"minute240", "1일":"day"}
-        yahoo_int_map = {"5분":"5m", "15분":"15m", "30분":"30m", "1시간":"1h", "4시간":"1h", "1일":"1d"} # Yahoo 4시간 미지원 -> 1시간
-        
-        # 요청 개수 (EMA 200 계산을 위해 넉넉하게 늘림)
-        req_count = 1000 
-        
-        if source == "upbit":
-            target_interval = upbit_int_map.get(interval_str, "day")
-            df = pyupbit.get_ohlcv(ticker, interval=target_interval, count=req_count)
+# yfinance / pyupbit 는 실제로 요청할 때 import (스냅샷만 읽는 대시보드 시작에는 필요 없음, benchmarks/import_time.py)
+UPBIT_INT_MAP = {"5분":"minute5", "15분":"minute15", "30분":"minute30", "1시간":"minute60", "4시간":"minute240", "1일":"day"}
+YAHOO_INT_MAP = {"5분":"5m", "15분":"15m", "30분":"30m", "1시간":"1h", "1일":"1d"} # Yahoo 4시간 미지원 -> timeframes.FETCH_PLANS 에서 1시간봉으로 리샘플
+
+# 요청 개수 (EMA 200 계산을 위해 넉넉하게 늘림)
+REQ_COUNT = 1000
+UPBIT_PAGE_SIZE = 200 # pyupbit는 200개씩 나눠서 요청
+
+# Yahoo 보관 기간 (기간 단위로 요청)
+def yahoo_period(target_interval):
+    return "1mo" if target_interval in ["5m", "15m", "30m"] else "2y"
+
+YAHOO_PERIOD_DAYS = {"1mo": 30, "2y": 730}
+
+# since: 저장소에 있는 마지막 봉 시각 -> 그 이후 꼬리만 요청
+def fetch_upbit(ticker, interval_str, count=REQ_COUNT, since=None):
+    target_interval = UPBIT_INT_MAP.get(interval_str, "day")
+    if since is not None:
+        # pyupbit 인덱스는 KST 현지 시각 (tz 없음)
+        elapsed = pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None) - since
+        missing = int(elapsed / pd.Timedelta(minutes=timeframes.INTERVAL_MINUTES[interval_str])) + 2
+        count = min(count, max(missing, 2))
+    import pyupbit
+    return pyupbit.get_ohlcv(ticker, interval=target_interval, count=count)
+
+# 장기 히스토리용 페이지 1개: to(KST 현지 시각) 이전 count 개
+def fetch_upbit_page(ticker, interval_str, to, count=UPBIT_PAGE_SIZE):
+    target_interval = UPBIT_INT_MAP.get(interval_str, "day")
+    # pyupbit 는 tz 없는 to 를 이 컴퓨터의 현지 시각으로 해석하므로 KST 를 명시
+    import pyupbit
+    return pyupbit.get_ohlcv(ticker, interval=target_interval, count=count, to=pd.Timestamp(to).tz_localize("Asia/Seoul"))
+
+def fetch_yahoo(ticker, interval_str, count=REQ_COUNT, since=None):
+    import yfinance as yf
+    target_interval = YAHOO_INT_MAP.get(interval_str, "1d")
+    # Yahoo Period 설정 (데이터 양 확보)
+    if since is not None:
+        df = yf.download(ticker, start=since, interval=target_interval, progress=False, auto_adjust=False)
+    else:
+        df = yf.download(ticker, period=yahoo_period(target_interval), interval=target_interval, progress=False, auto_adjust=False)
+    if not df.empty:
+        # MultiIndex 컬럼 처리
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = [c[0].lower() if isinstance(c, tuple) else c.lower() for c in df.columns]
+        else:
+            df.columns = [c.lower() for c in df.columns]
         
-        elif source == "yahoo":
-            target_interval = yahoo_int_map.get(interval_str, "1d")
-            # Yahoo Period 설정 (데이터 양 확보)
-            target_period = "1mo" if target_interval in ["5m", "15m", "30m"] else "2y"
-            
-            df = yf.download(ticker, period=target_period, interval=target_interval, progress=False, auto_adjust=False)
-            if not df.empty:
-                # MultiIndex 컬럼 처리
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = [c[0].lower() if isinstance(c, tuple) else c.lower() for c in df.columns]
-                else:
-                    df.columns = [c.lower() for c in df.columns]
-                
-                # 필요한 컬럼만 선택
-                cols = ['open','high','low','close','volume']
-                df = df[[c for c in cols if c in df.columns]]
-                
-    except Exception as e:
-        print(f"Error fetching {ticker} ({interval_str}): {e}")
-    
+        # 필요한 컬럼만 선택
+        cols = ['open','high','low','close','volume']
+        df = df[[c for c in cols if c in df.columns]]
     return df
 
-# --- 기존 전략 로직 (RSI v1, EMA Cross) ---
-def run_strategy(df, strategy_type):
-    if df is None or df.empty or len(df) < 200: # EMA 200 등을 위해 최소 데이터 확보
+# --- Yahoo 다중 종목 일괄 수집 ---
+# 같은 봉 길이/기간의 종목들을 yf.download 한 번으로 받고 종목별로 나눕니다.
+# 반환: {ticker: df}
+def fetch_yahoo_bulk(tickers, interval_str, count=REQ_COUNT, since=None):
+    import yfinance as yf
+    target_interval = YAHOO_INT_MAP.get(interval_str, "1d")
+    kwargs = {"interval": target_interval, "progress": False, "auto_adjust": False, "group_by": "ticker", "threads": True}
+    if since is not None:
+        df = yf.download(list(tickers), start=since, **kwargs)
+    else:
+        df = yf.download(list(tickers), period=yahoo_period(target_interval), **kwargs)
+    return split_yahoo_frame(df, tickers)
+
+def split_yahoo_frame(df, tickers):
+    frames = {}
+    if df is None or df.empty:
+        return frames
+    cols = ['open','high','low','close','volume']
+    multi = isinstance(df.columns, pd.MultiIndex)
+    names = set(df.columns.get_level_values(0)) if multi else set()
+    for ticker in tickers:
+        if multi:
+            if ticker not in names:
+                continue
+            part = df[ticker]  # 열 선택만 (데이터 복사 없음)
+        elif len(tickers) == 1:
+            part = df
+        else:
+            continue
+        part = part.rename(columns=str.lower)
+        part = part[[c for c in cols if c in part.columns]]
+        # 다른 종목만 거래된 시각(전부 NaN)은 제외
+        if 'close' in part.columns:
+            has_close = part['close'].notna()
+            if not has_close.all():
+                part = part[has_close]
+        if not part.empty:
+            frames[ticker] = part
+    return frames
+
+# 소스 이름 -> 수집 함수 (테스트 시 data_fetcher.FakeSource 등으로 교체 가능)
+DATA_SOURCES = {"upbit": fetch_upbit, "yahoo": fetch_yahoo}
+
+# 여러 종목을 한 번에 받을 수 있는 소스 -> 일괄 수집 함수 (tickers, interval, count, since) -> {ticker: df}
+BULK_SOURCES = {"yahoo": fetch_yahoo_bulk}
+
+# 로컬 봉 저장소 (증분 동기화)
+BAR_STORE = bar_store.BarStore()
+
+# 저장소 보관 기간: Upbit 은 최근 count 개, Yahoo 는 요청 기간(period) 만큼
+# 보관 기간을 TRIM_SLACK 배 넘었을 때만 잘라냅니다. 그 사이에는 시작 봉이 고정되어
+# 스트리밍 전략(streaming.py)이 새 봉만 이어서 반영할 수 있습니다.
+TRIM_SLACK = 1.25
+
+# Upbit 장기 히스토리 보관 기간 (봉 길이 -> 일 수). 설정된 봉 길이는 count 대신 기간으로 보관하고
+# `python batch_analyzer.py --backfill` 로 과거 구간을 채웁니다.
+# 예) AUTO_TRADE_UPBIT_HISTORY="5분=730,1시간=1460"
+def parse_history_days(spec):
+    days = {}
+    for item in filter(None, (x.strip() for x in spec.split(","))):
+        interval, value = item.split("=")
+        days[interval.strip()] = int(value)
+    return days
+
+UPBIT_HISTORY_DAYS = parse_history_days(os.environ.get("AUTO_TRADE_UPBIT_HISTORY", ""))
+
+def trim_history(source, interval_str, df, count):
+    if source == "upbit" and interval_str in UPBIT_HISTORY_DAYS:
+        window = pd.Timedelta(days=UPBIT_HISTORY_DAYS[interval_str])
+        if df.index[0] >= df.index[-1] - window * TRIM_SLACK:
+            return df
+        return df[df.index >= df.index[-1] - window]
+    if source == "yahoo":
+        days = YAHOO_PERIOD_DAYS[yahoo_period(YAHOO_INT_MAP.get(interval_str, "1d"))]
+        if df.index[0] >= df.index[-1] - pd.Timedelta(days=days * TRIM_SLACK):
+            return df
+        return df[df.index >= df.index[-1] - pd.Timedelta(days=days)]
+    if len(df) <= count * TRIM_SLACK:
+        return df
+    return df.iloc[-count:]
+
+# 소스별 1회 수집에 드는 실제 API 요청 수 (토큰 버킷 차감량)
+def request_cost(source, count=REQ_COUNT):
+    if source == "upbit":
+        return -(-count // UPBIT_PAGE_SIZE)
+    return 1
+
+# --- 멀티 타임프레임 수집 계획 ---
+# (기준 봉 길이, 요청 개수, 기준 봉에서 만들 봉 길이 목록) 목록
+def plan_asset_fetch(source, intervals):
+    plan = []
+    for base, targets in timeframes.plan_fetch(source, intervals).items():
+        count = REQ_COUNT * timeframes.base_ratio(base, targets)
+        plan.append((base, count, targets))
+    return plan
+
+# store: 봉 저장소 (None 이면 저장소 없이 매번 전체 수집)
+# offline: True 면 네트워크 없이 저장된 봉만 사용
+def get_multi_timeframe_data(asset, intervals=INTERVALS, sources=None, store=None, offline=False):
+    ticker, source = asset['ticker'], asset['source']
+    fetch_fn = (sources or DATA_SOURCES).get(source)
+    frames = {}
+    if fetch_fn is None:
+        return frames
+    if store is None and sources is None:
+        store = BAR_STORE
+
+    session = timeframes.get_session(asset)
+    fetch = store.synced(source, fetch_fn, trim_history, offline) if store is not None else fetch_fn
+    retries = 0 if offline else data_fetcher.RETRIES
+    for base, count, targets in plan_asset_fetch(source, intervals):
+        fallback = store.fallback(source, ticker, base) if store is not None else None
+        base_df = data_fetcher.fetch_with_retry(fetch, ticker, base, count, label=f"{ticker} ({base})", retries=retries, fallback=fallback)
+        frames.update(timeframes.build_timeframes(base_df, base, targets, session))
+    return frames
+
+def get_data(ticker, source, interval_str, sources=None, store=None, offline=False):
+    asset = next((a for a in ASSET_LIST if a['ticker'] == ticker and a['source'] == source), {"ticker": ticker, "source": source})
+    return get_multi_timeframe_data(asset, [interval_str], sources, store, offline).get(interval_str, pd.DataFrame())
+
+# --- 전략 실행 ---
+# strategy: strategies.STRATEGIES 의 이름 ("RSI v1", "RSI v2 (Smart)", "EMA Cross", ...)
+# 명세를 컴파일한 신호 배열 연산 + backtest_engine 상태 머신으로 실행합니다. (strategies.py)
+# ind: indicators.FrameIndicators (같은 프레임을 쓰는 전략끼리 지표 배열 공유, 없으면 공용 캐시에서 생성)
+MIN_BARS = 200  # EMA 200 등을 위해 최소 데이터 확보
+
+def run_strategy(df, strategy, ind=None):
+    if df is None or df.empty or len(df) < MIN_BARS:
+        return None
+    program = strategies.STRATEGIES.get(strategy)
+    if program is None:
         return None
 
-    df = df.copy()
+    ind = ind or indicators.INDICATOR_CACHE.frame(df)
     
     # 지표 계산
-    if strategy_type == "RSI":
-        df['RSI'] = ta.rsi(df['close'], length=14)
-    elif strategy_type == "EMA":
-        df['EMA_Fast'] = ta.ema(df['close'], length=25)
-        df['EMA_Slow'] = ta.ema(df['close'], length=120)
+    values = program.values(ind)
 
     # 결과 저장용
-    balance = 1000000
     initial_balance = 1000000
-    position = None
-    entry_price = 0
-    trades = []
-    
-    # 백테스팅 루프
-    for i in range(len(df)):
-        if i < 120: continue # 지표 안정화 대기
-        
-        curr_close = df['close'].iloc[i]
-        curr_time = str(df.index[i])
-        
-        # 1. 청산 (Exit)
-        if position is not None:
-            is_close = False
-            pnl = 0
-            
-            if strategy_type == "RSI":
-                # RSI v1: 반대 과매수/과매도 도달 시 청산 (단순화)
-                curr_rsi = df['RSI'].iloc[i]
-                if position == 'long' and curr_rsi > 70:
-                    is_close = True
-                    pnl = (curr_close - entry_price) / entry_price
-                elif position == 'short' and curr_rsi < 30:
-                    is_close = True
-                    pnl = (entry_price - curr_close) / entry_price
-                    
-            elif strategy_type == "EMA":
-                fast = df['EMA_Fast'].iloc[i]
-                slow = df['EMA_Slow'].iloc[i]
-                prev_fast = df['EMA_Fast'].iloc[i-1]
-                prev_slow = df['EMA_Slow'].iloc[i-1]
-                
-                if position == 'long' and (prev_fast >= prev_slow and fast < slow):
-                    is_close = True; pnl = (curr_close - entry_price) / entry_price
-                elif position == 'short' and (prev_fast <= prev_slow and fast > slow):
-                    is_close = True; pnl = (entry_price - curr_close) / entry_price
-
-            if is_close:
-                balance *= (1 + pnl)
-                trades.append({'time': curr_time, 'type': 'Exit', 'pnl': pnl})
-                position = None
-
-        # 2. 진입 (Entry)
-        if position is None:
-            if strategy_type == "RSI":
-                curr_rsi = df['RSI'].iloc[i]
-                if not pd.isna(curr_rsi):
-                    if curr_rsi < 30:
-                        position = 'long'; entry_price = curr_close
-                    elif curr_rsi > 70:
-                        position = 'short'; entry_price = curr_close
-                        
-            elif strategy_type == "EMA":
-                fast = df['EMA_Fast'].iloc[i]
-                slow = df['EMA_Slow'].iloc[i]
-                prev_fast = df['EMA_Fast'].iloc[i-1]
-                prev_slow = df['EMA_Slow'].iloc[i-1]
-                
-                if prev_fast <= prev_slow and fast > slow:
-                    position = 'long'; entry_price = curr_close
-                elif prev_fast >= prev_slow and fast < slow:
-                    position = 'short'; entry_price = curr_close
-
-    return calculate_metrics(balance, initial_balance, trades, df, strategy_type)
-
-# --- [NEW] RSI v2 전략 로직 ---
-def run_strategy_rsi_v2(df):
-    if df is None or df.empty or len(df) < 200:
-        return None
-
-    df = df.copy()
-    
-    # 1. 지표 계산
-    df['RSI'] = ta.rsi(df['close'], length=14)
-    df['EMA_200'] = ta.ema(df['close'], length=200) # 추세 필터용
 
-    # 결과 변수
-    balance = 1000000
-    initial_balance = 1000000
-    position = None
-    entry_price = 0
-    trades = []
-    
-    # 손절 설정 (2%)
-    SL_PCT = 0.02
+    # 백테스팅 (지표 안정화 대기: 명세의 warmup 봉)
+    with perf.PERF.span("backtest"):
+        signals = program.signals(values)
+        bt = backtest_engine.run_backtest(values['close'], signals, start=program.warmup, sl_pct=program.stop_loss)
+        balance = backtest_engine.compound_balance(initial_balance, bt['pnl'])
+        times = trade_records.index_times(df.index)
+        trades = trade_records.from_exits(times, bt['exit_idx'], bt['pnl'], bt['side'],
+                                          program.reason_codes(bt['side'], bt['reason']))
+        curve = (times, *risk_metrics.equity_curve(times, values['close'], bt, initial_balance))
 
-    # 백테스팅 루프
-    for i in range(len(df)):
-        if i < 200: continue # EMA 200 생성 대기
-        
-        curr_close = df['close'].iloc[i]
-        curr_rsi = df['RSI'].iloc[i]
-        prev_rsi = df['RSI'].iloc[i-1]
-        curr_ema = df['EMA_200'].iloc[i]
-        curr_time = str(df.index[i])
-        
-        # 지표 결측 체크
-        if pd.isna(curr_rsi) or pd.isna(curr_ema): continue
-
-        # ---------------------------
-        # 1. 청산 (Exit) - 손절매 포함
-        # ---------------------------
-        if position is not None:
-            is_close = False
-            pnl = 0
-            close_reason = ""
-
-            if position == 'long':
-                # A. 손절매 체크
-                if curr_close <= entry_price * (1 - SL_PCT):
-                    is_close = True
-                    pnl = (curr_close - entry_price) / entry_price
-                    close_reason = "Stop Loss"
-                # B. 익절 (RSI 과매수 도달 시)
-                elif curr_rsi > 70:
-                    is_close = True
-                    pnl = (curr_close - entry_price) / entry_price
-                    close_reason = "Take Profit (RSI > 70)"
-            
-            elif position == 'short':
-                # A. 손절매 체크
-                if curr_close >= entry_price * (1 + SL_PCT):
-                    is_close = True
-                    pnl = (entry_price - curr_close) / entry_price
-                    close_reason = "Stop Loss"
-                # B. 익절 (RSI 과매도 도달 시)
-                elif curr_rsi < 30:
-                    is_close = True
-                    pnl = (entry_price - curr_close) / entry_price
-                    close_reason = "Take Profit (RSI < 30)"
-
-            if is_close:
-                balance *= (1 + pnl)
-                trades.append({'time': curr_time, 'type': 'Exit', 'pnl': pnl, 'reason': close_reason})
-                position = None
-
-        # ---------------------------
-        # 2. 진입 (Entry) - 추세 필터 & 확증 진입
-        # ---------------------------
-        if position is None:
-            # A. 상승 추세 (가격 > EMA 200) -> Long만 진입
-            if curr_close > curr_ema:
-                # 눌림목 매수: 어제는 30 밑, 오늘은 30 위 (Cross Over)
-                if prev_rsi < 30 and curr_rsi >= 30:
-                    position = 'long'
-                    entry_price = curr_close
-            
-            # B. 하락 추세 (가격 < EMA 200) -> Short만 진입
-            elif curr_close < curr_ema:
-                # 반등 매도: 어제는 70 위, 오늘은 70 아래 (Cross Under)
-                if prev_rsi > 70 and curr_rsi <= 70:
-                    position = 'short'
-                    entry_price = curr_close
-
-    return calculate_metrics(balance, initial_balance, trades, df, "RSI v2")
+    return calculate_metrics(balance, initial_balance, trades, values, strategy, trade_records.index_tz(df.index), curve)
 
 # --- 공통 결과 계산 함수 ---
-def calculate_metrics(balance, initial_balance, trades, df, strategy_name):
+# values: 'close' 와 전략이 사용한 지표 배열 (별칭 -> 배열), strategy_name: strategies.STRATEGIES 의 이름
+# trades: 거래 기록 구조화 배열 (trade_records.TRADE_DTYPE), tz: 거래 시각의 타임존
+# curve: (봉 시각, 봉 단위 평가금액, 보유 봉 수, 보유 시간 합계) 를 주면 위험 지표 + 축약 자산 곡선도 (risk_metrics.summarize)
+def calculate_metrics(balance, initial_balance, trades, values, strategy_name, tz=None, curve=None):
+    with perf.PERF.span("metrics"):
+        return _calculate_metrics(balance, initial_balance, trades, values, strategy_name, tz, curve)
+
+def _calculate_metrics(balance, initial_balance, trades, values, strategy_name, tz=None, curve=None):
     total_return = (balance - initial_balance) / initial_balance * 100
-    win_trades = [t for t in trades if t['pnl'] > 0]
-    win_rate = (len(win_trades) / len(trades) * 100) if trades else 0
+    win_count = int((trades['pnl'] > 0).sum())
+    win_rate = (win_count / len(trades) * 100) if len(trades) else 0
     
     # 현재 상태 파악 (마지막 봉 기준)
-    current_signal = "Hold"
-    last_idx = -1
-    
-    if strategy_name == "RSI v2":
-        # RSI v2 현재 신호 로직
-        l_rsi = df['RSI'].iloc[last_idx]
-        l_prev_rsi = df['RSI'].iloc[last_idx-1]
-        l_close = df['close'].iloc[last_idx]
-        l_ema = df['EMA_200'].iloc[last_idx] if 'EMA_200' in df.columns else 0
-        
-        if l_close > l_ema and l_prev_rsi < 30 and l_rsi >= 30:
-            current_signal = "Buy (Trend Follow)"
-        elif l_close < l_ema and l_prev_rsi > 70 and l_rsi <= 70:
-            current_signal = "Sell (Trend Follow)"
-            
-    elif strategy_name == "RSI":
-        l_rsi = df['RSI'].iloc[last_idx]
-        if l_rsi < 30: current_signal = "Buy (OverSold)"
-        elif l_rsi > 70: current_signal = "Sell (OverBought)"
-        
-    elif strategy_name == "EMA":
-        fast = df['EMA_Fast'].iloc[last_idx]
-        slow = df['EMA_Slow'].iloc[last_idx]
-        if fast > slow: current_signal = "Hold (Bull)"
-        else: current_signal = "Hold (Bear)"
+    program = strategies.STRATEGIES.get(strategy_name)
+    current_signal = program.current_signal(values) if program is not None else "Hold"
 
     return {
         "return": total_return,
         "win_rate": win_rate,
         "trades": len(trades),
         "trade_history": trades,
+        "tz": tz,
         "current_signal": current_signal,
-        "last_price": df['close'].iloc[-1]
+        "last_price": values['close'][-1],
+        **(risk_metrics.summarize(*curve, len(trades)) if curve is not None else {}),
     }
 
-# ... (위쪽 import 및 함수들은 그대로 유지) ...
+# --- 프레임 1개(자산 x 봉 길이)에 대한 전략 실행 ---
+STRATEGY_NAMES = list(strategies.STRATEGIES)
 
-# --- [수정됨] 메인 실행 함수: 결과를 리턴하도록 변경 ---
-def get_analysis_results():
+# 전략들이 쓰는 지표 (지표 이름 -> 길이 목록)
+STRATEGY_INDICATORS = strategies.indicator_lengths(STRATEGY_NAMES)
+
+# 여러 프레임의 지표를 지표별 커널 한 번으로 미리 계산해서 캐시에 채움 (frames: (asset, interval, df) 목록)
+def prefetch_indicators(frames, cache=None):
+    cache = cache or indicators.INDICATOR_CACHE
+    inds = [cache.frame(df, asset['ticker'], interval) for asset, interval, df in frames
+            if df is not None and len(df) >= MIN_BARS]
+    for name, lengths in STRATEGY_INDICATORS.items():
+        cache.prefetch(inds, name, lengths)
+
+# 결과 행 공통 열 (결과 캐시에서 꺼낸 행도 자산 정보/분석 시각은 새로 붙임)
+def frame_base(asset, interval, current_time):
+    return {"asset": asset['name'], "ticker": asset['ticker'], "source": asset.get('source'), "category": asset.get('category', '기타'), "interval": interval, "timestamp": current_time}
+
+# 실시간 갱신용 스트리밍 전략 보관소 (프로세스 단위)
+LIVE_STREAMS = streaming.StreamRegistry()
+
+# streams: streaming.StreamRegistry 를 주면 이전 실행 이후 새로 들어온 봉만 반영 (없으면 전체 백테스트)
+def analyze_frame(asset, interval, df, current_time, streams=None):
+    rows = []
+    if df is None or df.empty:
+        perf.PERF.count("empty_frames", source=asset.get('source'))
+        return rows
+
+    base = frame_base(asset, interval, current_time)
+
+    # 계측 라벨: 이 안에서 기록되는 지표/백테스트/지표 계산 구간에 (ticker, interval, strategy) 가 붙음
+    with perf.PERF.labels(ticker=asset['ticker'], interval=interval):
+        ind = None
+        for strategy in STRATEGY_NAMES:
+            with perf.PERF.labels(strategy=strategy):
+                if streams is not None and streaming.streamable(strategy):
+                    key = (asset['ticker'], interval, strategy)
+                    if not streams.warm(key, df):
+                        # 처음 보는 프레임: 배치 지표 배열로 스트림 상태를 한 번에 채움
+                        ind = ind or indicators.INDICATOR_CACHE.frame(df, asset['ticker'], interval)
+                    with perf.PERF.span("backtest"):
+                        stream = streams.sync(key, strategy, df, ind)
+                    with perf.PERF.span("metrics"):
+                        res = stream.result()
+                else:
+                    # 전략끼리 RSI(14) 등 지표 배열을 공유 (상태 기반 지표가 없는 전략은 스트리밍 모드에서도 배열 백테스트)
+                    ind = ind or indicators.INDICATOR_CACHE.frame(df, asset['ticker'], interval)
+                    res = run_strategy(df, strategy, ind)
+            if res:
+                rows.append({**base, "strategy": strategy, **res})
+    perf.PERF.count("rows", len(rows), source=asset.get('source'))
+    return rows
+
+# --- 수집 단계: 받아오는 순서대로 (asset, interval, df) 를 yield ---
+# sources: 소스 이름 -> 수집 함수 (기본값 DATA_SOURCES)
+# limits: 소스별 동시성/요청 한도 (기본값 data_fetcher.SOURCE_LIMITS)
+# store: 봉 저장소 (기본값: 실제 소스를 쓸 때만 BAR_STORE)
+# offline: True 면 네트워크 없이 저장된 봉만 사용
+# bulk_sources: 소스 이름 -> 일괄 수집 함수 (기본값: 실제 소스를 쓸 때만 BULK_SOURCES)
+#               (소스, 기준 봉 길이, 세션) 이 같은 종목들을 요청 하나로 묶습니다.
+def iter_frames(sources=None, limits=None, store=None, offline=False, assets=None, intervals=INTERVALS, bulk_sources=None):
+    if store is None and sources is None:
+        store = BAR_STORE
+    if bulk_sources is None and sources is None:
+        bulk_sources = BULK_SOURCES
+    sources = sources or DATA_SOURCES
+    bulk_sources = bulk_sources or {}
+    if store is not None:
+        sources = {name: store.synced(name, fn, trim_history, offline) for name, fn in sources.items()}
+        bulk_sources = {name: store.synced_many(name, fn, trim_history, offline) for name, fn in bulk_sources.items()}
+
+    # 자산 x 기준 봉 길이 단위로 수집 작업 생성 (나머지 봉 길이는 로컬 리샘플)
+    tasks = []
+    bulk_tasks = {}
+    for asset in assets or ASSET_LIST:
+        source = asset['source']
+        for base, count, targets in plan_asset_fetch(source, intervals):
+            if source in bulk_sources:
+                session = timeframes.get_session(asset)
+                task = bulk_tasks.get((source, base, count, session))
+                if task is None:
+                    task = bulk_tasks[(source, base, count, session)] = {
+                        "source": source,
+                        "fn": bulk_sources[source],
+                        "args": ([], base, count),
+                        "cost": 1,
+                        "label": f"{source} {session} ({base})",
+                        "assets": [],
+                        "base": base,
+                        "targets": targets,
+                    }
+                    tasks.append(task)
+                task['args'][0].append(asset['ticker'])
+                task['assets'].append(asset)
+                continue
+            tasks.append({
+                "source": source,
+                "args": (asset['ticker'], base, count),
+                "cost": request_cost(source, count),
+                "label": f"{asset['ticker']} ({base})",
+                "fallback": store.fallback(source, asset['ticker'], base) if store is not None else None,
+                "asset": asset,
+                "base": base,
+                "targets": targets,
+            })
+    if store is not None:
+        for task in bulk_tasks.values():
+            task['fallback'] = store.fallback_many(task['source'], task['args'][0], task['base'])
+
+    retries = 0 if offline else data_fetcher.RETRIES
+    for task, result in data_fetcher.iter_fetch(tasks, sources, limits=limits, retries=retries):
+        if 'assets' not in task:
+            yield from _split_timeframes(task['asset'], task, result)
+            continue
+        # 일괄 수집 결과를 종목별로 나누고 세션 타임존으로 맞춤
+        for asset in task['assets']:
+            base_df = result.get(asset['ticker']) if isinstance(result, dict) else None
+            if base_df is None or base_df.empty:
+                base_df = store.fallback(asset['source'], asset['ticker'], task['base'])() if store is not None else pd.DataFrame()
+            if not base_df.empty and base_df.index.tz is not None:
+                base_df = base_df.tz_convert(timeframes.SESSION_RULES[timeframes.get_session(asset)]['tz'])
+            yield from _split_timeframes(asset, task, base_df)
+
+def _split_timeframes(asset, task, base_df):
+    frames = timeframes.build_timeframes(base_df, task['base'], task['targets'], timeframes.get_session(asset))
+    for interval, df in frames.items():
+        yield asset, interval, df
+
+# --- 결과 캐시 ---
+# 입력 봉 내용 + 아래 파라미터 + 코드 버전이 같으면 (자산, 봉 길이) 결과를 다시 계산하지 않음 (result_cache.py)
+RESULT_PARAMS = {"strategies": strategies.STRATEGY_SPECS, "backend": indicators.INDICATOR_BACKEND}
+RESULT_CACHE = result_cache.ResultCache()
+
+# 캐시에 있는 프레임은 rows_by_task 에 바로 채우고, 나머지만 흘려보냄 (keys: 새로 계산할 작업 -> (asset, 키))
+def _skip_cached(frames, cache, current_time, rows_by_task, keys):
+    for asset, interval, df in frames:
+        if df is None or df.empty:
+            yield asset, interval, df
+            continue
+        key = result_cache.result_key(df, RESULT_PARAMS)
+        rows = cache.get(asset['source'], asset['ticker'], interval, key)
+        if rows is None:
+            keys[(asset['ticker'], interval)] = (asset, key)
+            yield asset, interval, df
+            continue
+        base = frame_base(asset, interval, current_time)
+        rows_by_task[(asset['ticker'], interval)] = [{**row, **base} for row in rows]
+
+# 프레임의 스트리밍 전략이 모두 이전 실행에서 이어지는지 (새 봉만 반영하면 되는지)
+def frame_warm(asset, interval, df, streams):
+    return all(streams.warm((asset['ticker'], interval, strategy), df)
+               for strategy in STRATEGY_NAMES if streaming.streamable(strategy))
+
+# 이어지는 프레임은 바로 스트림에 새 봉만 반영해서 rows_by_task 에 채우고, 처음 보는 프레임만 흘려보냄
+def _stream_warm(frames, current_time, rows_by_task, streams):
+    for asset, interval, df in frames:
+        if df is None or df.empty or not frame_warm(asset, interval, df, streams):
+            yield asset, interval, df
+            continue
+        rows_by_task[(asset['ticker'], interval)] = analyze_frame(asset, interval, df, current_time, streams)
+
+# --- (자산, 봉 길이) 단위 분석: {(ticker, interval): rows} ---
+# assets/intervals 로 일부만 다시 계산할 수 있습니다. (스케줄러가 마감된 봉만 갱신할 때)
+# cache: 결과 캐시 result_cache.ResultCache (기본값: 실제 소스를 쓸 때만 RESULT_CACHE)
+def analyze_tasks(sources=None, limits=None, store=None, offline=False, incremental=False, workers=None, chunksize=None,
+                  assets=None, intervals=INTERVALS, current_time=None, cache=None):
+    current_time = current_time or datetime.now().isoformat()
+    if cache is None and sources is None:
+        cache = RESULT_CACHE
+    rows_by_task = {}
+    keys = {}
+    frames = iter_frames(sources, limits, store, offline, assets, intervals)
+    if cache is not None:
+        frames = _skip_cached(frames, cache, current_time, rows_by_task, keys)
+    streams = LIVE_STREAMS if incremental else None
+    if incremental:
+        # 이어지는 프레임은 여기서 스트리밍 전략에 새 봉만 반영 (처음 보는 프레임만 워커로)
+        frames = _stream_warm(frames, current_time, rows_by_task, streams)
+    # 수집이 끝나는 프레임부터 바로 워커에 넘겨 전체 백테스트 (가격 배열은 공유 메모리로 전달)
+    # incremental 이면 워커가 배치로 채운 스트림 상태를 LIVE_STREAMS 에 받아옴
+    for key, rows in parallel.run_parallel(frames, current_time, workers, chunksize, streams):
+        rows_by_task[key] = rows
+
+    for (ticker, interval), (asset, key) in keys.items():
+        if rows_by_task.get((ticker, interval)):
+            cache.put(asset['source'], ticker, interval, key, rows_by_task[(ticker, interval)])
+    return rows_by_task
+
+# 결과 순서는 ASSET_LIST x INTERVALS 순서로 고정
+def order_results(rows_by_task):
     results = []
-    print("Starting Analysis...")
-    
-    current_time = datetime.now().isoformat()
-    total_tasks = len(ASSET_LIST) * len(INTERVALS) * 3 
-    completed = 0
-    
-    # 진행 상황을 표시하기 위해 Streamlit의 progress bar를 쓸 수도 있지만, 
-    # 일단 로직 분리를 위해 순수 파이썬 로직만 남깁니다.
-    
     for asset in ASSET_LIST:
-        ticker = asset['ticker']
-        name = asset['name']
-        source = asset['source']
-        category = asset.get('category', '기타')
-        
         for interval in INTERVALS:
-            # 데이터 가져오기
-            df = get_data(ticker, source, interval)
-            
-            if df is not None and not df.empty:
-                # 1. RSI v1
-                res1 = run_strategy(df, "RSI")
-                if res1:
-                    results.append({"asset": name, "ticker": ticker, "category": category, "interval": interval, "strategy": "RSI v1", "timestamp": current_time, **res1})
-                
-                # 2. RSI v2 (NEW)
-                res2 = run_strategy_rsi_v2(df)
-                if res2:
-                    results.append({"asset": name, "ticker": ticker, "category": category, "interval": interval, "strategy": "RSI v2 (Smart)", "timestamp": current_time, **res2})
-
-                # 3. EMA Cross
-                res3 = run_strategy(df, "EMA")
-                if res3:
-                    results.append({"asset": name, "ticker": ticker, "category": category, "interval": interval, "strategy": "EMA Cross", "timestamp": current_time, **res3})
-            
-            completed += 3
-            
-    print("Analysis Complete.")
+            results.extend(rows_by_task.get((asset['ticker'], interval), []))
+    return results
+
+# --- [수정됨] 메인 실행 함수: 결과를 리턴하도록 변경 ---
+# sources/limits/store/offline 는 iter_frames 와 동일
+# incremental: True 면 현재 프로세스의 스트리밍 전략(LIVE_STREAMS)에 새 봉만 반영 (반복 갱신용, update_results)
+#              False(기본값) 면 전체 백테스트. 어느 쪽이든 처음 보는 프레임은 워커 프로세스에서 계산
+# workers: 백테스트 워커 프로세스 수 (기본값 parallel.WORKERS)
+# chunksize: 워커에 한 번에 넘길 프레임 수
+# cache: analyze_tasks 와 동일
+# recorder: 이번 실행의 계측기 perf.Recorder (호출한 쪽이 export() 해서 스냅샷과 같이 게시, 기본값 새 Recorder)
+def get_analysis_results(sources=None, limits=None, store=None, offline=False, incremental=False, workers=None, chunksize=None,
+                         cache=None, recorder=None):
+    print("Starting Analysis...")
+    with perf.recording(recorder) as recorder:
+        total_tasks = len(ASSET_LIST) * len(INTERVALS) * len(STRATEGY_NAMES)
+        rows_by_task = analyze_tasks(sources, limits, store, offline, incremental, workers, chunksize, cache=cache)
+        results = order_results(rows_by_task)
+        completed = len(results)
+        perf.PERF.count("tasks_total", total_tasks)
+        perf.PERF.count("tasks_completed", completed)
+
+    report = recorder.export()
+    counters = perf.counter_totals(report)
+    reused = counters.get("result_cache_hits", 0)
+    print(f"Analysis Complete. ({completed}/{total_tasks}) result cache: {reused}/{reused + counters.get('result_cache_misses', 0)} reused, "
+          f"indicator cache: {indicators.INDICATOR_CACHE.stats()}")
+    print(f"Timing: {perf.summary(report)}")
     return results  # [중요] JSON 저장 대신 데이터를 반환합니다!
 
+# --- 부분 갱신: 마감된 (자산, 봉 길이) 만 다시 계산해서 이전 결과에 덮어쓰기 ---
+# groups: [(asset, [interval, ...]), ...] (scheduler.BarCloseScheduler.group 결과)
+# 수집에 실패해 결과가 비면 이전 결과를 유지합니다.
+# recorder: get_analysis_results 와 동일
+# 반복 갱신이므로 기본적으로 스트리밍 전략에 새 봉만 반영 (incremental=True, 처음 보는 프레임은 워커에서 채움)
+def update_results(previous, groups, offline=False, recorder=None, **kwargs):
+    kwargs.setdefault("incremental", True)
+    with perf.recording(recorder):
+        rows_by_task = {}
+        for row in previous or []:
+            rows_by_task.setdefault((row['ticker'], row['interval']), []).append(row)
+
+        # 같은 봉 길이 조합끼리 묶어 한 번에 수집 (Yahoo 파생 봉은 기준 봉 한 번으로)
+        by_intervals = {}
+        for asset, intervals in groups:
+            by_intervals.setdefault(tuple(intervals), []).append(asset)
+
+        current_time = datetime.now().isoformat()
+        for intervals, assets in by_intervals.items():
+            fresh = analyze_tasks(offline=offline, assets=assets, intervals=list(intervals), current_time=current_time, **kwargs)
+            for key, rows in fresh.items():
+                if rows:
+                    rows_by_task[key] = rows
+        return order_results(rows_by_task)
+
+# --- 파라미터 스윕: 전략별 파라미터 조합 순위표 ---
+# strategies: 평가할 전략 이름 목록 (기본값 sweep.SWEEP_GRIDS 전체)
+# grids: 전략 이름 -> 탐색 범위 (기본 범위 대신 사용)
+# top: 상위 N개만 반환
+def get_sweep_results(strategies=None, grids=None, top=None, sources=None, limits=None, store=None, offline=False):
+    print("Starting Parameter Sweep...")
+    table = sweep.run_sweep(iter_frames(sources, limits, store, offline), strategies, grids, top)
+    if not table.empty:
+        table["timestamp"] = datetime.now().isoformat()
+    print(f"Sweep Complete. ({len(table)} rows)")
+    return table
+
+# --- 워크포워드: 학습/검증 구간을 밀면서 구간별 성과 (walk_forward.py) ---
+# train / test / step: 봉 수, 지표는 프레임마다 한 번만 계산
+def get_walk_forward_results(strategy_names=None, train=walk_forward.TRAIN_BARS, test=walk_forward.TEST_BARS,
+                             step=walk_forward.STEP_BARS, sources=None, limits=None, store=None, offline=False):
+    print("Starting Walk-Forward...")
+    table = walk_forward.run_walk_forward(iter_frames(sources, limits, store, offline), strategy_names, train, test, step)
+    print(f"Walk-Forward Complete. ({len(table)} windows)")
+    return table
+
+# --- 포트폴리오 백테스트: 봉 길이마다 전체 자산을 계좌 하나로 (portfolio.py) ---
+# 반환: {(전략, 봉 길이): portfolio.run_portfolio 결과} (평가금액 곡선 + 거래 기록 + 요약)
+def get_portfolio_results(strategy_names=None, intervals=INTERVALS, weight=None, sources=None, limits=None, store=None, offline=False):
+    print("Starting Portfolio Backtest...")
+    order = {asset['ticker']: i for i, asset in enumerate(ASSET_LIST)}
+    by_interval = {}
+    for asset, interval, df in iter_frames(sources, limits, store, offline, intervals=intervals):
+        by_interval.setdefault(interval, []).append((asset, interval, df))
+    results = {}
+    for interval in intervals:
+        frames = sorted(by_interval.get(interval, []), key=lambda f: order.get(f[0]['ticker'], len(order)))
+        prefetch_indicators(frames)
+        for name in strategy_names or STRATEGY_NAMES:
+            with perf.PERF.span("portfolio", strategy=name, interval=interval):
+                result = portfolio.run_portfolio(frames, name, weight=weight)
+            if result is not None:
+                results[(name, interval)] = result
+    print(f"Portfolio Complete. ({len(results)} curves)")
+    return results
+
+# --- Upbit 장기 히스토리 채우기 ---
+# 페이지를 동시에 받아(history.HistoryLoader) 봉 저장소의 과거 구간을 채웁니다.
+# 중간에 끊겨도 다시 실행하면 받은 페이지는 건너뜁니다. 실패한 페이지가 있으면 그 구간은 저장하지 않습니다.
+HISTORY_LOADER = history.HistoryLoader(fetch_upbit_page)
+
+def backfill_upbit(history_days=None, assets=None, store=None, loader=None):
+    history_days = history_days or UPBIT_HISTORY_DAYS
+    store = store or BAR_STORE
+    loader = loader or HISTORY_LOADER
+    now = pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None)
+    for asset in assets or ASSET_LIST:
+        if asset['source'] != "upbit":
+            continue
+        ticker = asset['ticker']
+        for interval, days in history_days.items():
+            started = time.time()
+            try:
+                hist = loader.load(ticker, interval, now - pd.Timedelta(days=days), now=now)
+            except ConnectionError as e:
+                print(f"Backfill {ticker} ({interval}): 일부 페이지 실패, 저장하지 않음 - 다시 실행하면 이어서 받습니다. ({e})")
+                continue
+            if hist.empty:
+                print(f"Backfill {ticker} ({interval}): 데이터 없음")
+                continue
+            stored = store.load("upbit", ticker, interval)
+            if stored is not None and not stored.empty:
+                hist = pd.concat([hist, stored])
+                hist = hist[~hist.index.duplicated(keep="last")].sort_index()
+            store.save("upbit", ticker, interval, hist)
+            print(f"Backfill {ticker} ({interval}): {len(hist)}개, {hist.index[0]} ~ {hist.index[-1]} ({time.time() - started:.1f}s)")
+
+# --- 워커 모드: 주기적으로 재계산해서 스냅샷 게시 ---
+# 대시보드는 SNAPSHOTS 의 최신 스냅샷만 읽으므로 페이지 응답이 분석 시간을 기다리지 않습니다.
+SNAPSHOTS = snapshots.SnapshotStore()
+WORKER_INTERVAL = 600   # 재계산 주기 (초)
+HEARTBEAT_EVERY = 10    # 하트비트 간격 (초, 분석 도중에도 계속 기록)
+
+def publish_analysis(offline=False, store=None):
+    recorder = perf.Recorder()
+    rows = get_analysis_results(offline=offline, recorder=recorder)
+    return (store or SNAPSHOTS).publish(rows, snapshots.channel_name(offline),
+                                        {"offline": offline, "source": "worker", "perf": recorder.export()})
+
+# scheduled: True 면 (자산, 봉 길이) 마다 봉 마감 직후에만 다시 계산 (scheduler.py)
+#            False 면 interval 초마다 전체 재계산
+def run_worker(interval=WORKER_INTERVAL, offline=False, once=False, store=None, scheduled=True):
+    store = store or SNAPSHOTS
+    channel = snapshots.channel_name(offline)
+    stop = threading.Event()
+
+    def beat():
+        while not stop.is_set():
+            store.heartbeat(channel)
+            stop.wait(HEARTBEAT_EVERY)
+
+    threading.Thread(target=beat, daemon=True).start()
+    sched = scheduler.BarCloseScheduler(ASSET_LIST, INTERVALS)
+    sched.prime(pd.Timestamp.now(tz="UTC"))
+    latest = store.load_latest(channel)
+    rows = latest['rows'] if latest else None
+    next_full = time.time() + interval
+    try:
+        while True:
+            now = pd.Timestamp.now(tz="UTC")
+            if store.take_refresh_request(channel) or (not scheduled and time.time() >= next_full):
+                sched.prime(now)
+                next_full = time.time() + interval
+            due = sched.pop_due(now)
+            if due:
+                started = time.time()
+                try:
+                    recorder = perf.Recorder()
+                    rows = update_results(rows, sched.group(due), offline, recorder=recorder)
+                    report = recorder.export()
+                    version = store.publish(rows, channel, {"offline": offline, "source": "worker", "updated": len(due), "perf": report})
+                    perf.write_exports(report, store.dir(channel))
+                    print(f"[worker] snapshot {channel}/{version} 게시 ({len(due)}개 갱신, {time.time() - started:.1f}s) {perf.summary(report)}")
+                except Exception:
+                    traceback.print_exc()
+                if once:
+                    return
+            wait = sched.seconds_until_next(pd.Timestamp.now(tz="UTC"))
+            time.sleep(1 if wait is None else min(max(wait, 0.2), 1))
+    finally:
+        stop.set()
+
 # 로컬에서 테스트할 때만 실행되도록 설정
+# python batch_analyzer.py --worker [--no-schedule --interval 600] [--offline] [--once]
+# python batch_analyzer.py --walk-forward 1000,250,250 [--strategy "RSI v2 (Smart)"] [--offline]
 if __name__ == "__main__":
-    data = get_analysis_results()
-    print(f"데이터 {len(data)}개 생성 완료")
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker", action="store_true", help="주기적으로 재계산해서 결과 스냅샷 게시")
+    parser.add_argument("--interval", type=float, default=WORKER_INTERVAL, help="전체 재계산 주기 (초, --no-schedule 일 때)")
+    parser.add_argument("--no-schedule", action="store_true", help="봉 마감 스케줄 대신 고정 주기로 전체 재계산")
+    parser.add_argument("--offline", action="store_true", help="저장된 봉만 사용")
+    parser.add_argument("--once", action="store_true", help="한 번만 게시하고 종료")
+    parser.add_argument("--backfill", nargs="?", const="", default=None,
+                        help="Upbit 장기 히스토리 채우기 (예: 5분=730,1시간=1460, 생략 시 AUTO_TRADE_UPBIT_HISTORY)")
+    parser.add_argument("--walk-forward", nargs="?", const="", default=None, metavar="TRAIN,TEST,STEP",
+                        help=f"워크포워드 평가 (봉 수, 기본 {walk_forward.TRAIN_BARS},{walk_forward.TEST_BARS},{walk_forward.STEP_BARS})")
+    parser.add_argument("--strategy", action="append", help="워크포워드 대상 전략 (여러 번 지정 가능, 기본 전체)")
+    args = parser.parse_args()
+
+    if args.backfill is not None:
+        days = parse_history_days(args.backfill) or UPBIT_HISTORY_DAYS
+        if not days:
+            print("채울 기간이 없습니다. (--backfill 5분=730 또는 AUTO_TRADE_UPBIT_HISTORY)")
+        else:
+            for interval in days:
+                if interval not in UPBIT_HISTORY_DAYS:
+                    print(f"주의: {interval} 은 AUTO_TRADE_UPBIT_HISTORY 에 없어서 다음 동기화 때 최근 {REQ_COUNT}개로 잘립니다.")
+            backfill_upbit(days)
+    elif args.walk_forward is not None:
+        sizes = [int(v) for v in args.walk_forward.split(",") if v.strip()] if args.walk_forward else []
+        train, test, step = sizes + [walk_forward.TRAIN_BARS, walk_forward.TEST_BARS, walk_forward.STEP_BARS][len(sizes):]
+        table = get_walk_forward_results(args.strategy, train, test, step, offline=args.offline)
+        summary = walk_forward.summarize(table)
+        print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}") if not summary.empty else "평가할 구간이 없습니다.")
+    elif args.worker:
+        run_worker(args.interval, args.offline, args.once, scheduled=not args.no_schedule)
+    else:
+        data = get_analysis_results(offline=args.offline)
+        print(f"데이터 {len(data)}개 생성 완료")
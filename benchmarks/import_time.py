@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# --- import 시간 예산 ---
+# 새 파이썬 프로세스에서 모듈을 import 하는 시간을 재고 예산과 비교합니다.
+# numpy / pandas 는 어차피 필요하므로 먼저 import 해두고, 그 위에 더해지는 시간만 잽니다.
+# 대시보드 첫 화면(스냅샷 읽기)에 필요 없는 무거운 라이브러리(LAZY_MODULES)가 딸려 오면 바로 실패합니다.
+#
+#   python benchmarks/import_time.py            # 예산 확인 (넘으면 종료 코드 1)
+#   python benchmarks/import_time.py --top 20   # 느린 모듈 20개 표시 (python -X importtime)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 이름 -> (import 할 모듈, numpy/pandas 제외 예산 ms)
+TARGETS = {
+    "dashboard": (["batch_analyzer", "fees", "perf", "snapshots", "result_store"], 100),  # streamlit 제외
+    "worker": (["batch_analyzer"], 100),
+}
+# 수집 / 지표 계산 때만 import 해야 하는 모듈
+LAZY_MODULES = ["yfinance", "pyupbit", "pandas_ta"]
+REPEAT = 5  # 새 프로세스 반복 횟수 (최솟값 사용)
+
+PROBE = """
+import json, sys, time
+import numpy, pandas
+t0 = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(modules, importtime=False):
+    code = PROBE.format(imports="\n".join(f"import {m}" for m in modules), lazy=LAZY_MODULES)
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import 실패 ({', '.join(modules)}):\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def slowest_imports(stderr, top):
+    # -X importtime 출력에서 numpy / pandas 이후에 import 된 모듈만 (누적 시간 기준)
+    rows = []
+    started = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        name = parts[2].rstrip()
+        if not started:
+            started = name == " pandas"
+            continue
+        if parts[1].strip().isdigit():
+            rows.append((int(parts[1]) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="import 시간 예산 확인")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--top", type=int, default=10, help="느린 모듈 표시 개수 (0 이면 생략)")
+    parser.add_argument("--scale", type=float, default=1.0, help="예산 배율 (느린 CI 등)")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'target':<12}{'budget':>10}{'current':>12}")
+    for name, (modules, budget) in TARGETS.items():
+        runs = [probe(modules)[0] for _ in range(args.repeat)]
+        elapsed = min(r["seconds"] for r in runs) * 1000
+        loaded = sorted({m for r in runs for m in r["loaded"]})
+        over = elapsed > budget * args.scale
+        print(f"{name:<12}{budget * args.scale:>8.0f}ms{elapsed:>10.1f}ms{'  << OVER BUDGET' if over else ''}")
+        if loaded:
+            print(f"  [Error] 지연 import 대상이 딸려 옴: {', '.join(loaded)}")
+        if over or loaded:
+            failures.append(name)
+        if args.top:
+            _, stderr = probe(modules, importtime=True)
+            for ms, module in slowest_imports(stderr, args.top):
+                print(f"    {ms:8.1f}ms {module}")
+
+    if failures:
+        print(f"\nimport 예산 초과 {len(failures)}건: {', '.join(failures)}")
+        return 1
+    print("\n예산 이내")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
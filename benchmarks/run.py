@@ -0,0 +1,236 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backtest_engine
+import batch_analyzer
+import data_fetcher
+import fees
+import indicators
+import risk_metrics
+import trade_records
+from result_store import ResultStore
+from synthetic import SIZES, fake_sources, synthetic_ohlcv
+
+# --- 오프라인 벤치마크 ---
+# 네트워크 없이 합성 OHLCV 와 가짜 소스로 단계별 시간을 재고 기준값(baseline)과 비교합니다.
+#
+#   python benchmarks/run.py                      # 1k, 100k 봉 측정 + 기준값 비교
+#   python benchmarks/run.py --sizes 1k,100k,10M  # 10M 봉 포함 (메모리 약 2GB)
+#   python benchmarks/run.py --save               # 현재 결과를 기준값으로 저장
+#
+# 단계
+#   fetch          : 가짜 소스(지연 주입) -> 수집 스케줄링 + 봉 길이 리샘플 (전체 자산, 크기 무관)
+#                    동시성은 실제 한도 그대로, 초당 요청 한도만 풀어서 (BENCH_LIMITS) 토큰 버킷 대기 대신 수집 경로를 잽니다.
+#                    --production-limits 로 실제 한도(data_fetcher.SOURCE_LIMITS) 사용
+#   indicators     : 빈 캐시에서 RSI(14), EMA(25/120/200) (batch_analyzer.prefetch_indicators 경로)
+#   backtest       : 전략 전체 실행 (RSI v1 / RSI v2 / EMA Cross, 지표는 캐시된 상태)
+#   metrics        : calculate_metrics (전략별, 위험 지표 + 축약 자산 곡선 포함)
+#   dashboard_load : 결과 행 -> ResultStore (거래 인덱스 포함)
+#   dashboard      : 기간 재계산 + 필터 + 수수료 계산 (대시보드 main 과 같은 경로)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = "1k,100k"
+REPEAT = {"1k": 5, "100k": 3, "10M": 1}   # 크기별 반복 횟수 (최솟값 사용)
+TOLERANCE = 0.25       # 기준값보다 25% 이상 느리면 회귀
+NOISE_FLOOR = 0.002    # 2ms 미만 차이는 측정 잡음으로 보고 무시
+DASHBOARD_ROWS = len(batch_analyzer.ASSET_LIST) * len(batch_analyzer.INTERVALS) * len(batch_analyzer.STRATEGY_NAMES)
+BENCH_LIMITS = {name: {**cfg, "rate": 1000.0, "burst": 1000} for name, cfg in data_fetcher.SOURCE_LIMITS.items()}
+DASHBOARD_TRADES = 5_000_000  # 대시보드 단계 전체 거래 수 상한 (10M 봉에서 메모리 보호)
+
+
+def timed(fn, repeat=1):
+    best = None
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def bench_fetch(latency, jitter, limits=BENCH_LIMITS):
+    sources, bulk_sources = fake_sources(latency, jitter)
+
+    def run():
+        return sum(1 for _ in batch_analyzer.iter_frames(sources, limits, store=None, bulk_sources=bulk_sources))
+
+    elapsed, frames = timed(run)
+    calls = sum(src.calls for src in sources.values())
+    print(f"  fetch: {frames} frames, {calls} requests")
+    return elapsed
+
+
+def strategy_results(df, ind):
+    return [(strategy, batch_analyzer.run_strategy(df, strategy, ind)) for strategy in batch_analyzer.STRATEGY_NAMES]
+
+
+def metrics_inputs(df, ind, results):
+    # 전략이 calculate_metrics 에 넘기는 것과 같은 인자를 결과에서 복원 (봉 단위 평가금액은 엔진 결과에서 다시 만듦)
+    initial_balance = 1000000
+    times = trade_records.index_times(df.index)
+    calls = []
+    for strategy, res in results:
+        balance = initial_balance * (1 + res['return'] / 100)
+        program = batch_analyzer.strategies.STRATEGIES[strategy]
+        values = program.values(ind)
+        bt = backtest_engine.run_backtest(values['close'], program.signals(values), start=program.warmup, sl_pct=program.stop_loss)
+        curve = (times, *risk_metrics.equity_curve(times, values['close'], bt, initial_balance))
+        calls.append((balance, initial_balance, res['trade_history'], values, strategy, res['tz'], curve))
+    return calls
+
+
+def dashboard_rows(results, df):
+    # 대시보드 결과 행 모양 (자산 x 봉 길이 x 전략), 거래 내역은 합성 결과를 돌려 씀
+    per_row = max(1, int(np.mean([len(res['trade_history']) for _, res in results])))
+    n_rows = max(len(results), min(DASHBOARD_ROWS, DASHBOARD_TRADES // per_row))
+    rows = []
+    for i in range(n_rows):
+        asset = batch_analyzer.ASSET_LIST[(i // 3) % len(batch_analyzer.ASSET_LIST)]
+        strategy, res = results[i % len(results)]
+        rows.append({"asset": asset['name'], "ticker": asset['ticker'], "source": asset['source'],
+                     "category": asset.get('category', '기타'), "strategy": strategy,
+                     "interval": batch_analyzer.INTERVALS[(i // 3) % len(batch_analyzer.INTERVALS)],
+                     "timestamp": df.index[-1].isoformat(), **res})
+    return rows
+
+
+def dashboard_recalculate(store, cutoff):
+    trade_idx = store.trade_index
+    stats = trade_idx.window_stats(start=cutoff)
+    overrides = {col: np.where(trade_idx.has_history, stats[col], store.column(col)) for col in ['return', 'win_rate', 'trades']}
+    filtered = store.frame(store.mask(category="All", strategy="All", asset="All", interval="All"), overrides=overrides)
+    factors = fees.round_trip_factors(filtered['source'].to_numpy())
+    return fees.fee_ledger(filtered['return'].to_numpy(), filtered['trades'].to_numpy(), factors, 1000000)
+
+
+def bench_size(label, bars, seed):
+    repeat = REPEAT.get(label, 1)
+    out = {}
+    df = synthetic_ohlcv(bars, seed=seed)
+
+    def compute_indicators():
+        cache = indicators.IndicatorCache()
+        batch_analyzer.prefetch_indicators([({"ticker": None}, None, df)], cache)
+        ind = cache.frame(df)
+        ind.rsi(14), ind.ema(25), ind.ema(120), ind.ema(200)
+        return ind
+
+    out["indicators"], ind = timed(compute_indicators, repeat)
+    out["backtest"], results = timed(lambda: strategy_results(df, ind), repeat)
+    results = [(name, res) for name, res in results if res]
+    calls = metrics_inputs(df, ind, results)
+    out["metrics"], _ = timed(lambda: [batch_analyzer.calculate_metrics(*c) for c in calls], repeat)
+
+    rows = dashboard_rows(results, df)
+    out["dashboard_load"], store = timed(lambda: ResultStore(rows), repeat)
+    cutoff = df.index[-1] - pd.Timedelta(days=30)
+    out["dashboard"], _ = timed(lambda: dashboard_recalculate(store, cutoff), repeat)
+    print(f"  {label}: {bars:,} bars, {sum(len(r['trade_history']) for _, r in results):,} trades, {len(rows)} dashboard rows")
+    return out
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(current, baseline, tolerance=TOLERANCE, noise_floor=NOISE_FLOOR):
+    # -> [(키, 기준값, 현재값, 비율, 회귀 여부)]
+    report = []
+    for key, now in current.items():
+        base = baseline.get(key)
+        if base is None:
+            report.append((key, None, now, None, False))
+            continue
+        ratio = now / base if base > 0 else float("inf")
+        regressed = ratio > 1 + tolerance and now - base > noise_floor
+        report.append((key, base, now, ratio, regressed))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 (합성 OHLCV + 가짜 소스)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"봉 수 크기 목록 ({','.join(SIZES)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 소스 요청당 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="가짜 소스 추가 지연 최대값 (초)")
+    parser.add_argument("--no-fetch", action="store_true", help="수집 단계 생략")
+    parser.add_argument("--production-limits", action="store_true", help="수집 단계에 실제 소스 요청 한도 사용")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if not args.no_fetch:
+        results["fetch"] = bench_fetch(args.latency, args.jitter,
+                                       data_fetcher.SOURCE_LIMITS if args.production_limits else BENCH_LIMITS)
+    for label in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        if label not in SIZES:
+            parser.error(f"알 수 없는 크기: {label}")
+        for stage, elapsed in bench_size(label, SIZES[label], args.seed).items():
+            results[f"{stage}/{label}"] = elapsed
+        gc.collect()
+
+    payload = {"created": datetime.now().isoformat(), "machine": machine_info(), "latency": args.latency,
+               "limits": "production" if args.production_limits else "bench", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(payload, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"\n{'stage':<24}{'baseline':>12}{'current':>12}{'ratio':>9}")
+    report = compare(results, (baseline or {}).get("results", {}), args.tolerance)
+    for key, base, now, ratio, regressed in report:
+        base_s = f"{base * 1000:.2f}ms" if base is not None else "-"
+        ratio_s = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{key:<24}{base_s:>12}{now * 1000:>10.2f}ms{ratio_s:>9}{'  << REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(key)
+
+    if baseline is not None and baseline.get("machine") != payload["machine"]:
+        print(f"\n[Warn] 기준값과 실행 환경이 다릅니다: {baseline.get('machine')} -> {payload['machine']}")
+    if baseline is not None and baseline.get("latency") != args.latency and "fetch" in results:
+        print(f"[Warn] 가짜 소스 지연이 기준값과 다릅니다: {baseline.get('latency')} -> {args.latency}")
+    if baseline is not None and baseline.get("limits", "production") != payload["limits"] and "fetch" in results:
+        print(f"[Warn] 수집 요청 한도가 기준값과 다릅니다: {baseline.get('limits', 'production')} -> {payload['limits']}")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"\n기준값 저장: {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\n기준값 없음: --save 로 {args.baseline} 를 만드세요.")
+        return 0
+    if regressions:
+        print(f"\n성능 회귀 {len(regressions)}건 (허용 {args.tolerance:.0%}): {', '.join(regressions)}")
+        return 1
+    print("\n회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
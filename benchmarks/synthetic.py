@@ -0,0 +1,88 @@
+import os
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_fetcher
+
+# --- 합성 OHLCV (시드 고정) ---
+# 국면(추세/변동성)이 바뀌는 랜덤 워크 + 시간 공백(휴장/수집 누락) + 결측(NaN) 봉
+# 같은 (bars, seed, freq) 면 항상 같은 프레임이 나옵니다.
+SIZES = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+
+# 국면: (봉당 평균 로그 수익률, 봉당 변동성)
+REGIMES = np.array([
+    (0.0004, 0.006),    # 완만한 상승
+    (-0.0005, 0.009),   # 하락
+    (0.0, 0.004),       # 횡보 (저변동)
+    (0.0, 0.02),        # 고변동
+])
+REGIME_LENGTH = 500     # 국면 평균 지속 봉 수
+GAP_RATE = 0.001        # 봉 사이에 공백이 생길 확률
+GAP_LENGTH = 20         # 공백 평균 길이 (봉 수)
+NAN_RATE = 0.0005       # 가격이 NaN 인 봉 비율
+
+
+def synthetic_ohlcv(bars, seed=0, freq="5min", end=None, start_price=100.0,
+                    gap_rate=GAP_RATE, nan_rate=NAN_RATE):
+    rng = np.random.default_rng(seed)
+
+    # 국면: 평균 REGIME_LENGTH 봉마다 전환
+    segment = np.cumsum(rng.random(bars) < 1.0 / REGIME_LENGTH)
+    regime = rng.integers(0, len(REGIMES), segment[-1] + 1)[segment]
+    drift, vol = REGIMES[regime, 0], REGIMES[regime, 1]
+
+    # 두꺼운 꼬리 (t 분포, 자유도 4 -> 분산 2 라서 1/sqrt(2) 로 맞춤)
+    ret = drift + vol * rng.standard_t(4, bars) / np.sqrt(2.0)
+    close = start_price * np.exp(np.cumsum(ret))
+    open_ = np.empty(bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * (1 + rng.normal(0, 0.2, bars - 1) * vol[1:])
+    wick = np.abs(rng.normal(0, 0.5, (2, bars))) * vol
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(3.0, 1.0, bars) * (1 + np.abs(ret) / vol)
+
+    # 시간 공백: 공백 자리에서는 다음 봉까지 여러 칸을 건너뜀
+    step = np.ones(bars, dtype=np.int64)
+    gaps = rng.random(bars) < gap_rate
+    gaps[0] = False
+    step[gaps] += rng.geometric(1.0 / GAP_LENGTH, int(gaps.sum()))
+    offsets = np.cumsum(step) - step[0]
+    unit = pd.Timedelta(freq).value
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp("2025-01-01")
+    times = end.value - (offsets[-1] - offsets) * unit
+    index = pd.DatetimeIndex(times.astype("datetime64[ns]"))
+
+    # 결측 봉: 가격만 NaN (거래량은 0)
+    missing = rng.random(bars) < nan_rate
+    for arr in (open_, high, low, close):
+        arr[missing] = np.nan
+    volume[missing] = 0.0
+
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+# --- 가짜 소스 (네트워크 없이 지연만 흉내) ---
+# data_fetcher.FakeSource 와 같은 호출 형태 (__call__ / bulk) 에 합성 OHLCV 를 돌려줍니다.
+# DATA_SOURCES / BULK_SOURCES 자리에 그대로 넣어 쓸 수 있습니다.
+class SyntheticSource(data_fetcher.FakeSource):
+    def frame(self, ticker, interval_str, count=None, since=None):
+        bars = count or self.bars
+        seed = zlib.crc32(f"{self.seed}:{ticker}:{interval_str}".encode())
+        df = synthetic_ohlcv(bars, seed=seed, freq=self.FREQS.get(interval_str, "1D"),
+                             end=pd.Timestamp.now().floor("D"))
+        if since is not None:
+            df = df[df.index >= since]
+        return df
+
+
+def fake_sources(latency=0.05, jitter=0.0, fail_rate=0.0, seed=0):
+    # (sources, bulk_sources) -> batch_analyzer.iter_frames 인자
+    upbit = SyntheticSource(latency, jitter, fail_rate, seed=seed)
+    yahoo = SyntheticSource(latency, jitter, fail_rate, seed=seed + 1)
+    return {"upbit": upbit, "yahoo": yahoo}, {"yahoo": yahoo.bulk}
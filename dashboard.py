@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 import os
 from datetime import datetime, timedelta
 import batch_analyzer
+import fees
+import perf
+import snapshots
+import trade_records
+from result_store import ResultStore
 
 # --- 페이지 설정 ---
 st.set_page_config(layout="wide", page_title="Trading Dashboard", page_icon="📊")
@@ -19,27 +25,69 @@ st.markdown("""
 
 # --- 데이터 로드 ---
 
-# [새로 넣을 부분]
-# ttl=600은 10분 동안 분석 결과를 저장(캐시)한다는 뜻입니다.
-@st.cache_data(ttl=600, show_spinner="실시간 데이터 분석 중입니다... 잠시만 기다려주세요.")
-def load_data():
-    # 파일 읽기 대신, batch_analyzer의 분석 함수를 직접 실행합니다.
-    raw_data = batch_analyzer.get_analysis_results()
-    return pd.DataFrame(raw_data)
+# 분석은 워커(`python batch_analyzer.py --worker`)가 주기적으로 돌려 스냅샷으로 게시하고,
+# 페이지는 최신 스냅샷만 읽습니다. 스냅샷이 오래됐으면 일단 그대로 보여주고 뒤에서 재계산합니다.
+# offline=True 면 로컬 봉 저장소(.bar_store)만으로 분석한 스냅샷을 씁니다.
+@st.cache_resource
+def get_revalidator():
+    return snapshots.Revalidator(batch_analyzer.SNAPSHOTS,
+                                 lambda offline, recorder: batch_analyzer.get_analysis_results(offline=offline, recorder=recorder))
+
+# 스냅샷 버전별 결과 저장소 (프로세스당 하나를 모든 세션이 공유, 읽기 전용)
+@st.cache_resource(max_entries=4)
+def get_result_store(version, _rows):
+    return ResultStore(_rows, version)
+
+def load_data(offline=False):
+    channel = snapshots.channel_name(offline)
+    revalidator = get_revalidator()
+    snap = batch_analyzer.SNAPSHOTS.load_latest(channel)
+    if snap is None:
+        # 첫 실행: 보여줄 스냅샷이 없으므로 한 번은 기다림
+        with st.spinner("실시간 데이터 분석 중입니다... 잠시만 기다려주세요."):
+            revalidator.run_now(offline)
+        snap = batch_analyzer.SNAPSHOTS.load_latest(channel)
+        if snap is None:
+            return ResultStore([]), None
+    elif snapshots.SnapshotStore.age(snap) > snapshots.STALE_AFTER:
+        revalidator.trigger(offline)
+    return get_result_store((channel, snap['version']), snap['rows']), snap
+
+# 파라미터 스윕 (전략별 파라미터 조합 순위표)
+@st.cache_data(ttl=3600, show_spinner="파라미터 조합을 평가하는 중입니다...")
+def load_sweep(offline=False):
+    return batch_analyzer.get_sweep_results(offline=offline)
+
+# 자산 곡선 차트에 함께 그릴 최대 행 수 (표 순서 상위)
+EQUITY_CHART_ROWS = 20
+
+# 포트폴리오 백테스트 (봉 길이별 전체 자산 공유 자본 평가금액 곡선)
+@st.cache_data(ttl=3600, show_spinner="포트폴리오 백테스트 중입니다...")
+def load_portfolio(offline=False):
+    return batch_analyzer.get_portfolio_results(offline=offline)
 
 def main():
-    st.caption(f"마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    offline = st.toggle("💾 저장된 데이터만 사용 (오프라인)", value=False)
+    results, snap = load_data(offline)
 
-    if st.button("🔄 데이터 새로고침"):
-        st.cache_data.clear()
-        st.rerun()
+    refreshing = get_revalidator().is_running(snapshots.channel_name(offline))
+    if snap is not None:
+        updated = datetime.fromisoformat(snap['created']).strftime('%Y-%m-%d %H:%M:%S')
+        st.caption(f"마지막 업데이트: {updated}" + (" (백그라운드 갱신 중...)" if refreshing else ""))
 
-    df = load_data()
+    if st.button("🔄 데이터 새로고침"):
+        # 현재 화면은 그대로 두고 뒤에서 재계산 (끝나면 다음 새로고침에 반영)
+        get_revalidator().trigger(offline)
+        load_sweep.clear()
+        load_portfolio.clear()
+        st.toast("백그라운드에서 분석을 다시 실행합니다.")
 
-    if df.empty:
+    if results.empty:
         st.warning("데이터가 없습니다. `batch_analyzer.py`를 먼저 실행해주세요.")
         st.stop()
 
+    trade_idx = results.trade_index
+
     # --- 사이드바 필터 ---
     st.sidebar.header("🔍 필터")
     
@@ -60,25 +108,14 @@ def main():
         
         if use_specific_period:
             # 전체 데이터에서 날짜 범위 추출
-            all_dates = []
-            for _, row in df.iterrows():
-                if isinstance(row.get('trade_history'), list):
-                    for t in row['trade_history']:
-                        try:
-                            dt = pd.to_datetime(t['time'])
-                            if dt.tzinfo is not None:
-                                dt = dt.tz_localize(None)
-                            all_dates.append(dt)
-                        except:
-                            pass
-            
-            if not all_dates:
+            min_date, max_date = trade_idx.time_range()
+            if min_date is None:
                 st.sidebar.warning("날짜 데이터가 없습니다.")
                 min_date = datetime.now()
                 max_date = datetime.now()
             else:
-                min_date = min(all_dates)
-                max_date = max(all_dates)
+                min_date = min_date.to_pydatetime()
+                max_date = max_date.to_pydatetime()
             
             # 위젯 표시
             if period_filter == "1일":
@@ -140,32 +177,32 @@ def main():
                 specific_end_date = datetime(selected_year, 12, 31, 23, 59, 59)
     
     # 전략 필터
-    strategies = ["All"] + list(df['strategy'].unique())
+    strategies = ["All"] + results.labels('strategy')
     selected_strategy = st.sidebar.selectbox("전략 선택", strategies)
     
     # 카테고리 필터
-    if 'category' in df.columns:
-        categories = ["All"] + list(df['category'].unique())
+    if 'category' in results:
+        categories = ["All"] + results.labels('category')
         selected_category = st.sidebar.selectbox("자산 그룹 선택", categories)
     else:
         selected_category = "All"
 
     # 자산 필터
     if selected_category != "All":
-        filtered_assets_list = df[df['category'] == selected_category]['asset'].unique()
-        assets = ["All"] + list(filtered_assets_list)
+        assets = ["All"] + results.labels('asset', results.mask(category=selected_category))
     else:
-        assets = ["All"] + list(df['asset'].unique())
+        assets = ["All"] + results.labels('asset')
         
     selected_asset = st.sidebar.selectbox("자산 선택", assets)
     
     # 봉 길이 필터
-    intervals = ["All"] + list(df['interval'].unique())
+    intervals = ["All"] + results.labels('interval')
     selected_interval = st.sidebar.selectbox("봉 길이 선택", intervals)
 
     # 기간 필터링 적용
     with st.spinner('데이터 분석 중...'):
-        filtered_df = df.copy()
+        # 공유 저장소는 건드리지 않고, 기간 재계산 값은 세션 배열로만 덮어씀
+        overrides = {}
         
         # 기간 필터 적용 (trade_history 기반 재계산)
         if period_filter != "전체":
@@ -184,70 +221,22 @@ def main():
                 elif period_filter == "1년":
                     cutoff_date = now - timedelta(days=365)
             
-            # 재계산 함수
-            def recalculate(row):
-                if 'trade_history' not in row or not isinstance(row['trade_history'], list):
-                    return row
-                
-                trades = row['trade_history']
-                filtered_trades = []
-                
-                for t in trades:
-                    try:
-                        trade_time = pd.to_datetime(t['time'])
-                        if trade_time.tzinfo is not None:
-                            trade_time = trade_time.tz_localize(None)
-                        
-                        # 필터링 조건 확인
-                        include = False
-                        if use_specific_period and specific_start_date and specific_end_date:
-                            # 특정 기간 범위
-                            if specific_start_date <= trade_time <= specific_end_date:
-                                include = True
-                        elif cutoff_date:
-                            # 최근 N일
-                            if cutoff_date.tzinfo is None and trade_time.tzinfo is not None:
-                                # trade_time은 위에서 이미 tz_localize(None) 처리됨
-                                pass 
-                            if trade_time >= cutoff_date:
-                                include = True
-                                
-                        if include:
-                            filtered_trades.append(t)
-                    except:
-                        continue
-                
-                # 메트릭 재계산
-                initial_balance = 1000000
-                balance = initial_balance
-                
-                for t in filtered_trades:
-                    balance *= (1 + t['pnl'])
-                    
-                total_return = (balance - initial_balance) / initial_balance * 100
-                win_trades = [t for t in filtered_trades if t['pnl'] > 0]
-                win_rate = (len(win_trades) / len(filtered_trades) * 100) if filtered_trades else 0
-                
-                row['return'] = total_return
-                row['win_rate'] = win_rate
-                row['trades'] = len(filtered_trades)
-                return row
+            # 재계산: 거래 인덱스에서 행별 기간 구간을 찾아 누적합으로 수익률/승률/거래 수 계산
+            if use_specific_period and specific_start_date and specific_end_date:
+                stats = trade_idx.window_stats(specific_start_date, specific_end_date)
+            else:
+                stats = trade_idx.window_stats(start=cutoff_date)
 
-            # Apply recalculation
-            if 'trade_history' in filtered_df.columns:
-                filtered_df = filtered_df.apply(recalculate, axis=1)
+            # trade_history 가 없는 행은 기존 값 유지
+            has_history = trade_idx.has_history
+            for col in ['return', 'win_rate', 'trades']:
+                if col in results:
+                    overrides[col] = np.where(has_history, stats[col], results.column(col))
 
-        
-        # 나머지 필터 적용
-        if selected_category != "All" and 'category' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['category'] == selected_category]
-            
-        if selected_strategy != "All":
-            filtered_df = filtered_df[filtered_df['strategy'] == selected_strategy]
-        if selected_asset != "All":
-            filtered_df = filtered_df[filtered_df['asset'] == selected_asset]
-        if selected_interval != "All":
-            filtered_df = filtered_df[filtered_df['interval'] == selected_interval]
+        # 나머지 필터 적용 (범주 코드 비교로 마스크만 만들고, 선택된 행만 꺼냄)
+        mask = results.mask(category=selected_category, strategy=selected_strategy,
+                            asset=selected_asset, interval=selected_interval)
+        filtered_df = results.frame(mask, overrides=overrides)
 
         # --- 필터링 결과 요약 통계 ---
         st.subheader("📊 선택한 조건의 백테스팅 결과")
@@ -267,43 +256,31 @@ def main():
             # 평균 수익률 계산
             avg_return = filtered_df['return'].mean()
             
-            # 거래 수수료 설정 (매수 0.05% + 매도 0.05% = 왕복 0.1%)
-            fee_per_trade_pct = 0.001  # 0.1% = 0.001
-            
             # 초기 금액
             initial_amount = 1000000
             
-            # 수수료를 고려한 복리 계산
-            # 각 거래마다: 수익 = (1 + return_rate) * (1 - fee_rate) - 1
-            # 전체 거래 후 최종 금액 = initial * Π[(1 + return_i) * (1 - fee)]
-            balance_no_fee = initial_amount
-            balance_with_fee = initial_amount
-            
-            for _, row in filtered_df.iterrows():
-                return_rate = row['return'] / 100  # % to decimal
-                trades_count = row['trades']
-                
-                # 해당 전략의 각 거래별 평균 수익률 적용
-                avg_return_per_trade = return_rate / trades_count if trades_count > 0 else 0
-                
-                for _ in range(int(trades_count)):
-                    # 수수료 없이
-                    balance_no_fee *= (1 + avg_return_per_trade)
-                    
-                    # 수수료 포함 (매수 시 0.05%, 매도 시 0.05% = 총 0.1%)
-                    # 거래 후 실제 수익 = (1 + return) * (1 - 0.001) - 1
-                    balance_with_fee *= (1 + avg_return_per_trade) * (1 - fee_per_trade_pct)
+            # 수수료를 고려한 복리 계산 (소스별 수수료율, 실제 거래 pnl 기준)
+            # 각 거래마다: 잔고 *= (1 + pnl) * (1 - 왕복 수수료율)
+            sources = filtered_df['source'].to_numpy() if 'source' in filtered_df.columns else np.full(len(filtered_df), None)
+            fee_factors = fees.round_trip_factors(sources)
+            ledger = fees.fee_ledger(filtered_df['return'].to_numpy(), filtered_df['trades'].to_numpy(), fee_factors, initial_amount)
             
             # 최종 금액
-            final_amount_before_fee = balance_no_fee
-            final_amount_after_fee = balance_with_fee
+            final_amount_before_fee = ledger['before']
+            final_amount_after_fee = ledger['after']
             
             # 총 수수료 금액 = 수수료 전 금액 - 수수료 후 금액
-            total_fee_amount = final_amount_before_fee - final_amount_after_fee
+            total_fee_amount = ledger['fee_amount']
             
             # 수익률 계산
-            return_before_fee = ((final_amount_before_fee - initial_amount) / initial_amount) * 100
-            return_after_fee = ((final_amount_after_fee - initial_amount) / initial_amount) * 100
+            return_before_fee = ledger['return_before']
+            return_after_fee = ledger['return_after']
+            
+            # 선택된 결과에 적용된 왕복 수수료율 (소스별)
+            fee_rates = sorted(set((1 - fee_factors).round(6).tolist()))
+            fee_rate_str = " / ".join(f"{r * 100:.2f}%" for r in fee_rates) or "-"
+            fee_help = ", ".join(f"{src}: 매수 {sched[fees.ENTRY_ORDER] * 100:.3f}% + 매도 {sched[fees.EXIT_ORDER] * 100:.3f}%"
+                                 for src, sched in fees.FEE_SCHEDULES.items())
             
             # 메트릭 카드로 표시 (2줄로 배치)
             # 첫 번째 줄: 기본 통계
@@ -350,8 +327,8 @@ def main():
             with col6:
                 st.metric(
                     label="수수료율 (왕복)",
-                    value="0.1%",
-                    help="매수 0.05% + 매도 0.05%"
+                    value=fee_rate_str,
+                    help=fee_help
                 )
             
             with col7:
@@ -388,7 +365,8 @@ def main():
         st.subheader("📋 거래 목록")
         
         # 표시할 컬럼 선택
-        cols_to_show = ['asset', 'category', 'strategy', 'interval', 'return', 'win_rate', 'trades', 'current_signal', 'last_price']
+        cols_to_show = ['asset', 'category', 'strategy', 'interval', 'return', 'win_rate', 'trades', 'max_drawdown', 'sharpe',
+                        'sortino', 'exposure', 'avg_hold_hours', 'current_signal', 'last_price']
         # category 컬럼이 없으면 제외
         display_cols = [c for c in cols_to_show if c in filtered_df.columns]
         
@@ -417,12 +395,154 @@ def main():
             .format({
                 'return': "{:.2f}%",
                 'win_rate': "{:.1f}%",
+                'max_drawdown': "{:.2f}%",
+                'sharpe': "{:.2f}",
+                'sortino': "{:.2f}",
+                'exposure': "{:.1f}%",
+                'avg_hold_hours': "{:.1f}h",
                 'last_price': "{:,.2f}"
-            }),
+            }, na_rep="-"),
             use_container_width=True,
             height=400
         )
 
+        if 'max_drawdown' in filtered_df.columns:
+            st.caption("MDD / Sharpe / Sortino / 노출 / 평균 보유 시간은 기간 필터와 무관하게 전체 기간 기준 (수수료 전)")
+
+        # --- 자산 곡선 (행마다 축약 저장된 곡선) ---
+        if st.checkbox("📉 자산 곡선 보기 (전체 기간)"):
+            show_equity_curves(filtered_df, results.equity_curves(mask))
+
+        # --- 파라미터 스윕 결과 ---
+        if st.checkbox("🧪 파라미터 스윕 결과 보기"):
+            sweep_df = load_sweep(offline)
+            if sweep_df.empty:
+                st.info("스윕 결과가 없습니다.")
+            else:
+                if selected_category != "All":
+                    sweep_df = sweep_df[sweep_df['category'] == selected_category]
+                if selected_strategy != "All":
+                    sweep_df = sweep_df[sweep_df['strategy'] == selected_strategy]
+                if selected_asset != "All":
+                    sweep_df = sweep_df[sweep_df['asset'] == selected_asset]
+                if selected_interval != "All":
+                    sweep_df = sweep_df[sweep_df['interval'] == selected_interval]
+
+                st.dataframe(
+                    sweep_df[['rank', 'asset', 'strategy', 'interval', 'params', 'return', 'win_rate', 'trades']]
+                    .head(200)
+                    .style
+                    .applymap(color_return, subset=['return'])
+                    .format({'return': "{:.2f}%", 'win_rate': "{:.1f}%"}),
+                    use_container_width=True,
+                    height=400
+                )
+
+        # --- 포트폴리오 (공유 자본) ---
+        if st.checkbox("💼 포트폴리오 (공유 자본)"):
+            show_portfolio(load_portfolio(offline), selected_strategy, selected_interval)
+
+        # --- 성능 (마지막 실행 계측) ---
+        if st.checkbox("⏱ 성능 (마지막 실행)"):
+            show_performance((snap or {}).get('meta', {}).get('perf'))
+
+# 표 순서(수익률 순) 상위 행들의 누적 수익률 곡선 (curves: frame 행 순서의 (risk_metrics.CURVE_DTYPE 배열, 타임존))
+# 시각은 거래 목록과 같은 행별 현지 시각 (trade_records.wall_times)
+def show_equity_curves(frame, curves, limit=EQUITY_CHART_ROWS):
+    series = {}
+    for i in frame.sort_values(by='return', ascending=False).index:
+        curve, tz = curves[i]
+        if curve is None or len(curve) == 0:
+            continue
+        label = f"{frame.at[i, 'asset']} · {frame.at[i, 'strategy']} · {frame.at[i, 'interval']}"
+        times = pd.to_datetime(trade_records.wall_times(curve['time'], tz))
+        series[label] = pd.Series((curve['equity'] / curve['equity'][0] - 1) * 100, index=times)
+        if len(series) >= limit:
+            break
+    if not series:
+        st.info("자산 곡선이 없습니다. 다음 갱신부터 표시됩니다.")
+        return
+    st.caption(f"수익률 상위 {len(series)}개 행의 누적 수익률 (%, 수수료 전, LTTB 축약 곡선)")
+    chart = pd.concat(series, axis=1).sort_index().ffill()
+    st.line_chart(chart)
+
+def show_portfolio(portfolios, selected_strategy, selected_interval):
+    if not portfolios:
+        st.info("포트폴리오 결과가 없습니다.")
+        return
+
+    # 전략 / 봉 길이는 사이드바 선택을 따르고, "All" 이면 여기서 고름
+    strategy_names = list(dict.fromkeys(name for name, _ in portfolios))
+    interval_names = list(dict.fromkeys(interval for _, interval in portfolios))
+    col1, col2 = st.columns(2)
+    with col1:
+        strategy = selected_strategy if selected_strategy in strategy_names else st.selectbox("포트폴리오 전략", strategy_names)
+    with col2:
+        interval = selected_interval if selected_interval in interval_names else st.selectbox("포트폴리오 봉 길이", interval_names)
+    result = portfolios.get((strategy, interval))
+    if result is None:
+        st.info("선택한 전략 / 봉 길이의 포트폴리오 결과가 없습니다.")
+        return
+
+    st.caption(f"자산 {len(result['tickers'])}개가 초기 자본 {result['initial_balance']:,.0f}원을 나눠 씀 (진입 1건 = 평가금액 / 자산 수, 수수료 포함)")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("최종 평가금액", f"{result['final_balance']:,.0f}원")
+    with col2:
+        st.metric("수익률", f"{result['return']:.2f}%")
+    with col3:
+        st.metric("거래 수", f"{result['trades']:,}", help=f"보유 중: {result['open_positions']}개")
+    with col4:
+        st.metric("승률", f"{result['win_rate']:.1f}%")
+
+    times = pd.to_datetime(result['times'], utc=True).tz_convert("Asia/Seoul").tz_localize(None)
+    st.line_chart(pd.DataFrame({"평가금액": result['equity'], "투자 금액": result['exposure']}, index=times))
+
+    by_asset = pd.DataFrame({"ticker": result['tickers'], "pnl": result['asset_pnl']}).sort_values("pnl", ascending=False)
+    st.dataframe(by_asset.style.format({'pnl': "{:,.0f}원"}), use_container_width=True)
+
+def show_performance(report):
+    if not report:
+        st.info("계측 결과가 없습니다. 다음 갱신부터 표시됩니다.")
+        return
+
+    started = datetime.fromtimestamp(report['started']).strftime('%Y-%m-%d %H:%M:%S')
+    st.caption(f"실행 시작: {started}, 소요: {report['finished'] - report['started']:.1f}초")
+
+    counters = perf.counter_totals(report)
+    hits, misses = counters.get('indicator_cache_hits', 0), counters.get('indicator_cache_misses', 0)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("결과 행", f"{counters.get('rows', 0):,}")
+    with col2:
+        st.metric("수집 재시도", f"{counters.get('fetch_retries', 0):,}")
+    with col3:
+        st.metric("수집 실패", f"{counters.get('fetch_failures', 0):,}", help=f"저장된 봉으로 대체: {counters.get('fetch_fallbacks', 0)}건")
+    with col4:
+        st.metric("지표 캐시 적중률", f"{hits / (hits + misses) * 100:.1f}%" if hits + misses else "-")
+
+    # 단계별 합계 (fetch 는 동시 수집이라 합계가 실제 소요 시간보다 클 수 있음)
+    st.markdown("**단계별 합계**")
+    totals = pd.DataFrame(perf.stage_totals(report))
+    if not totals.empty:
+        totals['avg_ms'] = totals['seconds'] / totals['count'].clip(lower=1) * 1000
+        st.dataframe(totals.style.format({'seconds': "{:.2f}s", 'avg_ms': "{:.1f}ms"}), use_container_width=True)
+
+    # 가장 느린 작업
+    st.markdown("**가장 느린 작업**")
+    slow = pd.DataFrame(perf.slowest(report, 20))
+    if not slow.empty:
+        cols = [c for c in ['stage', 'ticker', 'interval', 'strategy', 'indicator', 'task', 'seconds', 'ok'] if c in slow.columns]
+        st.dataframe(slow[cols].style.format({'seconds': "{:.3f}s"}), use_container_width=True)
+    if report.get('dropped'):
+        st.caption(f"보관 한도를 넘어 목록에서 빠진 구간: {report['dropped']}개 (합계에는 포함)")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("JSON 내보내기", perf.to_json(report), file_name="perf.json", mime="application/json")
+    with col2:
+        st.download_button("Prometheus 내보내기", perf.to_prometheus(report), file_name="perf.prom", mime="text/plain")
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,210 @@
+import contextvars
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import perf
+
+# --- 소스별 요청 한도 ---
+# max_concurrency: 소스별 동시 요청 수 (소스마다 별도 스레드 풀)
+# rate / burst: 토큰 버킷 (초당 요청 수 / 순간 최대 요청 수)
+SOURCE_LIMITS = {
+    # Upbit 시세 조회 API는 IP 기준 초당 10회 -> 여유를 두고 초당 8회
+    "upbit": {"max_concurrency": 3, "rate": 8.0, "burst": 8},
+    # Yahoo는 공식 한도가 없지만 몰아서 요청하면 429가 나므로 보수적으로 설정
+    "yahoo": {"max_concurrency": 4, "rate": 2.0, "burst": 4},
+}
+DEFAULT_LIMIT = {"max_concurrency": 2, "rate": 2.0, "burst": 2}
+
+RETRIES = 3
+BACKOFF_BASE = 0.5  # 초
+BACKOFF_MAX = 8.0
+
+
+# --- 토큰 버킷 ---
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # burst 보다 비싼 요청(여러 페이지 수집)은 capacity 씩 나눠서 받아 실제 비용 전체를 차감
+    def acquire(self, tokens=1):
+        tokens = float(tokens)
+        while tokens > 0:
+            chunk = min(tokens, self.capacity)
+            self._take(chunk)
+            tokens -= chunk
+
+    def _take(self, tokens):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SourceLimiter:
+    def __init__(self, max_concurrency, rate, burst=None):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst)
+
+
+def build_limiters(limits=None):
+    limits = limits or SOURCE_LIMITS
+    return {name: SourceLimiter(**cfg) for name, cfg in limits.items()}
+
+
+def is_empty(result):
+    # 수집 결과: DataFrame 또는 {ticker: DataFrame} (여러 종목 일괄 수집)
+    if result is None:
+        return True
+    if isinstance(result, dict):
+        return not any(df is not None and not df.empty for df in result.values())
+    return result.empty
+
+
+def result_size(result):
+    if isinstance(result, dict):
+        return sum(len(df) for df in result.values() if df is not None)
+    return len(result)
+
+
+# --- 재시도 (지수 백오프 + 지터) ---
+# fallback: 모든 시도가 실패했을 때 대신 쓸 데이터를 돌려주는 함수 (예: 로컬 저장소)
+# allow_empty: True 면 빈 응답도 정상 결과로 봄 (상장 이전 구간 페이지 등)
+def fetch_with_retry(fn, *args, limiter=None, cost=1, retries=RETRIES, label="", fallback=None, allow_empty=False, source=None):
+    with perf.PERF.span("fetch", source=source, task=label) as span:
+        last_error = None
+        for attempt in range(retries + 1):
+            if attempt > 0:
+                perf.PERF.count("fetch_retries", source=source)
+            if limiter is not None:
+                limiter.bucket.acquire(cost)
+            try:
+                df = fn(*args)
+                if df is not None and (allow_empty or not is_empty(df)):
+                    perf.PERF.count("fetched_bars", result_size(df), source=source)
+                    return df
+                last_error = "empty response"
+            except Exception as e:
+                last_error = e
+
+            if attempt < retries:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                time.sleep(delay * (0.5 + random.random() / 2))
+
+        span["ok"] = False
+        perf.PERF.count("fetch_failures", source=source)
+        print(f"Error fetching {label}: {last_error} ({retries + 1}회 시도)")
+        if fallback is not None:
+            df = fallback()
+            if not is_empty(df):
+                perf.PERF.count("fetch_fallbacks", source=source)
+                print(f"Using stored bars for {label} ({result_size(df)}개)")
+                return df
+        # allow_empty 일 때는 "빈 응답" 과 "실패" 를 구분할 수 있도록 None
+        return None if allow_empty else pd.DataFrame()
+
+
+# --- 동시 수집 ---
+# tasks: {"source": ..., "args": (...), "cost": n, ...} 형태의 dict 목록
+#        "fn" 이 있으면 소스 기본 함수 대신 사용 (같은 소스 한도를 공유하는 일괄 수집 등)
+# fetch_fns: 소스 이름 -> 수집 함수
+# 완료되는 순서대로 (task, df) 를 yield 하므로 호출하는 쪽에서 바로 백테스트를 시작할 수 있습니다.
+def iter_fetch(tasks, fetch_fns, limits=None, retries=RETRIES):
+    limiters = build_limiters(limits)
+    pools = {}
+    futures = {}
+    try:
+        for task in tasks:
+            source = task["source"]
+            if source not in limiters:
+                limiters[source] = SourceLimiter(**DEFAULT_LIMIT)
+            limiter = limiters[source]
+            if source not in pools:
+                pools[source] = ThreadPoolExecutor(
+                    max_workers=limiter.max_concurrency, thread_name_prefix=f"fetch-{source}"
+                )
+            fn = task.get("fn") or fetch_fns.get(source)
+            if fn is None:
+                continue
+            fut = pools[source].submit(
+                contextvars.copy_context().run,  # 계측(perf.recording)을 수집 스레드에도
+                fetch_with_retry, fn, *task["args"],
+                limiter=limiter, cost=task.get("cost", 1), retries=retries,
+                label=task.get("label", str(task["args"])),
+                fallback=task.get("fallback"),
+                allow_empty=task.get("allow_empty", False),
+                source=source,
+            )
+            futures[fut] = task
+
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- 테스트용 가짜 소스 (지연 주입) ---
+class FakeSource:
+    FREQS = {"5분": "5min", "15분": "15min", "30분": "30min", "1시간": "1h", "4시간": "4h", "1일": "1D"}
+
+    def __init__(self, latency=0.05, jitter=0.0, fail_rate=0.0, bars=1000, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.bars = bars
+        self.seed = seed
+        self.calls = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def _wait(self, label):
+        with self.lock:
+            self.calls += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            fail = self.rng.random() < self.fail_rate
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError(f"fake failure: {label}")
+
+    def __call__(self, ticker, interval_str, count=None, since=None):
+        self._wait(f"{ticker} {interval_str}")
+        return self.frame(ticker, interval_str, count, since)
+
+    # 여러 종목을 요청 한 번으로 (yf.download 다중 종목과 같은 형태: {ticker: df})
+    def bulk(self, tickers, interval_str, count=None, since=None):
+        self._wait(f"{len(tickers)} tickers {interval_str}")
+        return {ticker: self.frame(ticker, interval_str, count, since) for ticker in tickers}
+
+    def frame(self, ticker, interval_str, count=None, since=None):
+        bars = count or self.bars
+        rng = np.random.default_rng(zlib.crc32(f"{self.seed}:{ticker}:{interval_str}".encode()))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+        spread = np.abs(rng.normal(0, 0.003, bars)) * close
+        index = pd.date_range(end=pd.Timestamp.now().floor("D"), periods=bars,
+                              freq=self.FREQS.get(interval_str, "1D"))
+        df = pd.DataFrame({
+            "open": np.concatenate(([close[0]], close[:-1])),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 100, bars),
+        }, index=index)
+        if since is not None:
+            df = df[df.index >= since]
+        return df
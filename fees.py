@@ -0,0 +1,57 @@
+import numpy as np
+
+# --- 소스별 수수료율 (편도, 체결 금액 대비) ---
+# upbit: 원화 마켓 일반 수수료 (메이커/테이커 동일)
+# yahoo: 미국 주식/ETF/선물 해외 위탁 수수료 (국내 증권사 기본 요율)
+FEE_SCHEDULES = {
+    "upbit": {"maker": 0.0005, "taker": 0.0005},
+    "yahoo": {"maker": 0.0025, "taker": 0.0025},
+}
+DEFAULT_SCHEDULE = FEE_SCHEDULES["upbit"]
+
+# 전략은 신호 봉 종가에 시장가로 진입/청산하므로 양쪽 모두 테이커
+ENTRY_ORDER, EXIT_ORDER = "taker", "taker"
+
+
+def round_trip_rate(source, entry=ENTRY_ORDER, exit=EXIT_ORDER, schedules=None):
+    sched = (schedules or FEE_SCHEDULES).get(source, DEFAULT_SCHEDULE)
+    return 1 - (1 - sched[entry]) * (1 - sched[exit])
+
+
+# 행별 왕복 수수료 적용 배율 (1 - 왕복 수수료율)
+def round_trip_factors(sources, entry=ENTRY_ORDER, exit=EXIT_ORDER, schedules=None):
+    sources = np.asarray(sources, dtype=object)
+    factors = np.empty(len(sources), dtype=np.float64)
+    for source in set(sources.tolist()):
+        factors[sources == source] = 1 - round_trip_rate(source, entry, exit, schedules)
+    return factors
+
+
+# --- 수수료 원장 ---
+# 모든 거래를 한 계좌에서 순서대로 복리 적용 (기존 대시보드와 같은 가정)
+# 거래마다 잔고 *= (1 + pnl) * (1 - 왕복 수수료율) 이므로, 행의 복리 수익률(실제 거래 pnl 의 곱)과
+# 거래 수만 있으면 행별 (1 + return) * factor ** trades 로 정확히 같은 결과가 나옵니다.
+# 곱은 로그 합 + 부호(음수 인자 개수) 로 계산해 넘침 없이 한 번에 처리합니다.
+def fee_ledger(return_pct, trades, fee_factor, initial_balance=1000000):
+    growth = 1 + np.asarray(return_pct, dtype=np.float64) / 100
+    trades = np.asarray(trades, dtype=np.float64)
+    fee_factor = np.broadcast_to(np.asarray(fee_factor, dtype=np.float64), growth.shape)
+
+    with np.errstate(divide="ignore"):
+        log_before = np.log(np.abs(growth)).sum()
+    sign = -1.0 if (growth < 0).sum() % 2 else 1.0
+    log_fee = (trades * np.log(fee_factor)).sum()
+
+    if np.isneginf(log_before):
+        before = after = 0.0
+    else:
+        before = initial_balance * sign * np.exp(log_before)
+        after = initial_balance * sign * np.exp(log_before + log_fee)
+
+    return {
+        "before": before,
+        "after": after,
+        "fee_amount": before - after,
+        "return_before": (before - initial_balance) / initial_balance * 100,
+        "return_after": (after - initial_balance) / initial_balance * 100,
+    }
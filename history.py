@@ -0,0 +1,151 @@
+import math
+import os
+import re
+import threading
+
+import pandas as pd
+
+import data_fetcher
+import timeframes
+
+# --- Upbit 장기 히스토리 수집기 ---
+# Upbit 캔들 API 는 `to` 이전 캔들을 한 번에 최대 200개까지만 줍니다.
+# 페이지 경계(`to`)를 미리 계획해 두고 소스 한도 안에서 여러 페이지를 동시에 받은 뒤
+# 이어 붙입니다. 받은 페이지는 바로 디스크에 남겨서 중간에 끊겨도 이어서 받습니다.
+#
+#   <root>/<ticker>/<interval>/<to 의 epoch-ns>.pkl   페이지 (빈 페이지도 완료 표시로 저장)
+#   <root>/<ticker>/<interval>/BEGIN                  상장 시작이 확인된 페이지의 to (이전 페이지는 요청 안 함)
+# 재시도 끝에 실패한 페이지는 저장하지 않고(다음 실행 때 다시 요청) 중간이 빈 히스토리 대신 ConnectionError 를 냅니다.
+HISTORY_DIR = os.environ.get("AUTO_TRADE_HISTORY", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".history_pages"))
+PAGE_SIZE = 200
+WAVE = 4  # 한 번에 제출할 페이지 수 = 소스 동시 요청 수 x WAVE (상장 시작을 만나면 다음 묶음부터 중단)
+
+
+def plan_pages(interval_str, start, end, page_size=PAGE_SIZE):
+    # [start, end) 를 덮는 페이지 경계 목록 (최신 -> 과거)
+    # 경계는 epoch 기준 고정 격자라서 다시 실행해도 같은 페이지 이름이 나옵니다. (이어받기)
+    span = pd.Timedelta(minutes=timeframes.INTERVAL_MINUTES[interval_str] * page_size)
+    epoch = pd.Timestamp(0)
+    first = epoch + span * math.ceil((pd.Timestamp(end) - epoch) / span)
+    n = max(0, math.ceil((first - pd.Timestamp(start)) / span))
+    return [first - span * k for k in range(n)]
+
+
+class HistoryLoader:
+    # fetch_page(ticker, interval_str, to, count) -> df (인덱스는 KST 현지 시각, to 이전 count 개)
+    def __init__(self, fetch_page, root=HISTORY_DIR, source="upbit", limits=None, page_size=PAGE_SIZE):
+        self.fetch_page = fetch_page
+        self.root = root
+        self.source = source
+        self.limits = limits
+        self.page_size = page_size
+
+    def dir(self, ticker, interval_str):
+        safe_ticker = re.sub(r"[^0-9A-Za-z_.-]", "_", ticker)
+        return os.path.join(self.root, safe_ticker, interval_str)
+
+    def _page_path(self, folder, to):
+        return os.path.join(folder, f"{to.value}.pkl")
+
+    def _save_page(self, folder, to, df):
+        path = self._page_path(folder, to)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, path)
+
+    def _begin(self, folder):
+        try:
+            with open(os.path.join(folder, "BEGIN")) as f:
+                return pd.Timestamp(int(f.read().strip()))
+        except (OSError, ValueError):
+            return None
+
+    def _mark_begin(self, folder, to):
+        current = self._begin(folder)
+        if current is None or to > current:
+            with open(os.path.join(folder, "BEGIN"), "w") as f:
+                f.write(str(to.value))
+
+    # --- [start, end) 구간 히스토리 (KST 현지 시각) ---
+    # now: 현재 시각 (이 시각 이후를 포함하는 최신 페이지는 진행 중이므로 체크포인트하지 않음)
+    # 실패한 페이지가 있으면 받은 페이지만 체크포인트하고 ConnectionError
+    def load(self, ticker, interval_str, start, end=None, now=None, keep_pages=True):
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None)
+        end = pd.Timestamp(end) if end is not None else now
+        start = pd.Timestamp(start)
+        folder = self.dir(ticker, interval_str)
+        os.makedirs(folder, exist_ok=True)
+
+        pages = plan_pages(interval_str, start, end, self.page_size)
+        begin = self._begin(folder)
+        if begin is not None:
+            pages = [to for to in pages if to >= begin]
+        todo = [to for to in pages if to > now or not os.path.exists(self._page_path(folder, to))]
+
+        limit = (self.limits or data_fetcher.SOURCE_LIMITS).get(self.source, data_fetcher.DEFAULT_LIMIT)
+        wave = max(1, limit["max_concurrency"] * WAVE)
+        fetched = {}
+        failed = []
+        for lo in range(0, len(todo), wave):
+            tasks = [{
+                "source": self.source,
+                "fn": self.fetch_page,
+                "args": (ticker, interval_str, to, self.page_size),
+                "label": f"{ticker} ({interval_str}) to={to}",
+                "allow_empty": True,
+                "to": to,
+            } for to in todo[lo:lo + wave]]
+            reached_begin = False
+            for task, df in data_fetcher.iter_fetch(tasks, {}, limits=self.limits):
+                to = task['to']
+                if df is None:
+                    failed.append(to)
+                    continue
+                fetched[to] = df
+                if to <= now:
+                    self._save_page(folder, to, df)
+                if len(df) < self.page_size:
+                    # 상장 시작 페이지: 더 과거 페이지는 비어 있음
+                    self._mark_begin(folder, to)
+                    reached_begin = True
+            if reached_begin:
+                break
+
+        begin = self._begin(folder)
+        failed = [to for to in failed if begin is None or to >= begin]
+        if failed:
+            raise ConnectionError(f"{ticker} ({interval_str}): {len(failed)}/{len(todo)} pages failed "
+                                  f"(to={', '.join(str(to) for to in sorted(failed))})")
+
+        # 이어 붙이기: 체크포인트 + 이번에 받은 페이지
+        parts = []
+        for to in pages:
+            if begin is not None and to < begin:
+                continue
+            if to in fetched:
+                parts.append(fetched[to])
+            elif os.path.exists(self._page_path(folder, to)):
+                parts.append(pd.read_pickle(self._page_path(folder, to)))
+        parts = [p for p in parts if p is not None and not p.empty]
+        if not parts:
+            return pd.DataFrame()
+
+        df = pd.concat(parts[::-1])
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        df = df[(df.index >= start) & (df.index < end)]
+
+        if not keep_pages:
+            for name in os.listdir(folder):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(folder, name))
+        return df
+
+    # 계획 대비 체크포인트 진행률 (완료 페이지 수, 전체 페이지 수)
+    def progress(self, ticker, interval_str, start, end):
+        folder = self.dir(ticker, interval_str)
+        pages = plan_pages(interval_str, start, end, self.page_size)
+        begin = self._begin(folder)
+        if begin is not None:
+            pages = [to for to in pages if to >= begin]
+        done = sum(os.path.exists(self._page_path(folder, to)) for to in pages)
+        return done, len(pages)
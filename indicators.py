@@ -0,0 +1,173 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import kernels
+import perf
+
+# --- 지표 계산 함수 (이름 -> 함수(종가 배열 (봉 x 열 또는 1차원), length) -> 같은 모양 배열) ---
+# length 는 정수 또는 열별 길이 배열. 열마다 앞쪽 NaN 은 시작 전으로 봅니다. (kernels.py)
+# AUTO_TRADE_INDICATORS=pandas_ta 면 예전처럼 pandas_ta 로 열마다 계산 (결과 비교용)
+INDICATOR_BACKEND = os.environ.get("AUTO_TRADE_INDICATORS", "numpy")
+
+
+def _pandas_ta(name):
+    def compute(close, length):
+        import pandas as pd
+        import pandas_ta as ta
+
+        arr = np.asarray(close, dtype=np.float64)
+        cols = arr.reshape(len(arr), -1)
+        lengths = np.broadcast_to(length, cols.shape[1:])
+        out = np.full(cols.shape, np.nan)
+        for j in range(cols.shape[1]):
+            start = kernels.first_valid(cols[:, j:j + 1])[0]
+            res = getattr(ta, name)(pd.Series(cols[start:, j]), length=int(lengths[j]))
+            if res is not None:
+                out[start:, j] = res.to_numpy(dtype=np.float64)
+        return out.reshape(arr.shape)
+    return compute
+
+
+if INDICATOR_BACKEND == "pandas_ta":
+    INDICATORS = {"rsi": _pandas_ta("rsi"), "ema": _pandas_ta("ema")}
+else:
+    INDICATORS = {"rsi": kernels.rsi, "ema": kernels.ema}
+
+# prefetch 한 번에 쌓을 최대 (봉 x 열) 크기
+# 배열이 CPU 캐시를 넘으면 봉마다 여러 번 도는 NumPy 연산이 메모리 대역폭에 묶여서 오히려 느려짐 (약 0.5MB)
+PANEL_CELLS = 65_536
+
+
+# --- 데이터 버전 ---
+# 인덱스 + 종가 내용 해시. 봉이 하나라도 바뀌면(미완성 봉 갱신 포함) 버전이 달라집니다.
+def data_version(df):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df.index.asi8 if hasattr(df.index, "asi8") else np.arange(len(df))).tobytes())
+    h.update(np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _readonly(values):
+    arr = np.array(values, dtype=np.float64)
+    arr.setflags(write=False)
+    return arr
+
+
+# --- 지표 캐시 (LRU) ---
+# 키: (ticker, interval, data_version, 지표 이름, 파라미터)
+class IndicatorCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                perf.PERF.count("indicator_cache_hits")
+                return self.entries[key]
+            self.misses += 1
+        perf.PERF.count("indicator_cache_misses")
+
+        return self.put(key, compute())
+
+    def put(self, key, values):
+        value = _readonly(values)
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    # --- 여러 프레임 x 여러 길이를 커널 한 번으로 ---
+    # frames: FrameIndicators 목록. 캐시에 없는 (프레임, 길이) 만 끝을 맞춘 (봉 x 열) 배열로 쌓아서 계산합니다.
+    # (길이가 다른 프레임은 앞쪽을 NaN 으로 채움 = 시작이 늦은 종목, 배열 크기는 PANEL_CELLS 이하로 나눔)
+    def prefetch(self, frames, name, lengths):
+        with self.lock:
+            missing = [(fi, length) for fi in frames for length in lengths
+                       if fi.key(name, length=length) not in self.entries]
+            self.misses += len(missing)
+        if not missing:
+            return
+        perf.PERF.count("indicator_cache_misses", len(missing))
+
+        missing.sort(key=lambda item: len(item[0].close), reverse=True)
+        lo = 0
+        while lo < len(missing):
+            rows = max(1, len(missing[lo][0].close))
+            part = missing[lo:lo + max(1, PANEL_CELLS // rows)]
+            lo += len(part)
+            panel = np.full((rows, len(part)), np.nan)
+            for j, (fi, _) in enumerate(part):
+                panel[rows - len(fi.close):, j] = fi.close
+            with perf.PERF.span("indicator", indicator=f"{name} x{len(part)}"):
+                out = INDICATORS[name](panel, np.array([length for _, length in part]))
+            for j, (fi, length) in enumerate(part):
+                self.put(fi.key(name, length=length), out[rows - len(fi.close):, j])
+
+    def frame(self, df, ticker=None, interval=None):
+        return FrameIndicators(self, df, (ticker, interval, data_version(df)))
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hit_rate": (self.hits / total * 100) if total else 0,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# --- 프레임 1개에 대한 지표 조회 창구 ---
+# 전략들은 df.copy() 없이 여기서 읽기 전용 배열을 받아 씁니다.
+class FrameIndicators:
+    def __init__(self, cache, df, frame_key):
+        self.cache = cache
+        self.df = df
+        self.frame_key = frame_key
+        self._close = None
+
+    @property
+    def close(self):
+        if self._close is None:
+            self._close = _readonly(self.df['close'].to_numpy(dtype=np.float64))
+        return self._close
+
+    def key(self, name, **params):
+        return self.frame_key + (name, tuple(sorted(params.items())))
+
+    def get(self, name, **params):
+        return self.cache.get(self.key(name, **params), lambda: self._compute(name, params))
+
+    def _compute(self, name, params):
+        with perf.PERF.span("indicator", indicator=f"{name}({', '.join(str(v) for v in params.values())})"):
+            return INDICATORS[name](self.close, **params)
+
+    def rsi(self, length=14):
+        return self.get("rsi", length=length)
+
+    def ema(self, length):
+        return self.get("ema", length=length)
+
+
+# 프로세스 공용 캐시
+INDICATOR_CACHE = IndicatorCache()
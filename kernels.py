@@ -0,0 +1,193 @@
+import numpy as np
+
+# --- 지표 커널 (NumPy, 봉 x 열 2차원) ---
+# 열 하나 = 독립된 시계열 (종목 또는 파라미터). 1차원 배열을 주면 1차원으로 돌려줍니다.
+# 열마다 첫 유효 값 이전(앞쪽 NaN)은 아직 시작 전으로 봅니다. (상장일이 다른 종목을 한 배열에)
+# pandas ewm(ignore_na=False) 점화식을 선형 점화식 y_t = a_t * y_(t-1) + b_t 로 바꿔서
+# 블록 단위 누적곱/누적합으로 계산하므로 봉 단위 파이썬 루프가 없습니다.
+# 결과는 pandas_ta.rsi / pandas_ta.ema (streaming.py 의 상태 기반 계산과 같은 정의) 와 1e-9 이내로 같습니다.
+MAX_GROWTH = 1e150  # 블록 안에서 1 / 누적곱 이 이 값을 넘지 않도록 블록 길이를 정함
+MIN_FACTOR = 1e-200  # 감쇠 계수 하한: alpha = 1 (길이 1) 이면 f = 0 이라 b / f 가 발산 (값 / f 가 넘치지 않을 만큼만 작게)
+
+
+def _as_2d(values):
+    # 내부 계산은 (열 x 봉) 배치: 봉 방향 누적합이 연속 메모리에서 돌도록
+    arr = np.asarray(values, dtype=np.float64)
+    return (arr[None, :], True) if arr.ndim == 1 else (np.ascontiguousarray(arr.T), False)
+
+
+def _restore(out, squeeze):
+    return out[0] if squeeze else out.T
+
+
+def _per_column(value, n):
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+
+def first_valid(values):
+    # 열별 첫 유효 행 (유효 값이 없으면 행 수), values: 봉 x 열
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+
+
+def _block(factor, rows):
+    # 감쇠 계수 f (0 < f <= 1) 가 블록 길이만큼 곱해져도 1 / f^block <= MAX_GROWTH
+    worst = -np.log(np.min(factor)) if len(factor) else 0.0
+    return max(1, min(rows, int(np.log(MAX_GROWTH) / worst))) if worst > 0 else max(1, rows)
+
+
+# y_t = a_t * y_(t-1) + b_t (y_(-1) = 0), 마지막 축(봉) 방향, b: 열 x 봉 (덮어씀)
+# a: 열별 상수 (n,) 또는 봉별 (열 x 봉)
+# 블록 안에서는 y_t = P_t * (y_s + sum(b_j / P_j)), P = a 의 누적곱. 모든 블록의 누적합을 한 번에 구한 뒤
+# 블록 시작 값(carry)만 블록 수만큼 이어 붙입니다.
+def linear_scan(a, b, block):
+    n, rows = b.shape
+    nblocks = -(-rows // block)
+    pad = nblocks * block - rows
+    if pad:
+        b = np.concatenate([b, np.zeros((n, pad))], axis=1)
+    b = b.reshape(n, nblocks, block)
+    if a.ndim == 1:
+        # 열별 상수: 거듭제곱은 서로 다른 계수마다 한 번만 (여러 종목 / 같은 길이)
+        factors, which = np.unique(a, return_inverse=True)
+        steps = np.arange(1, block + 1)
+        growth = (factors[:, None] ** steps)[which][:, None, :]
+        b *= (factors[:, None] ** -steps)[which][:, None, :]
+    else:
+        if pad:
+            a = np.concatenate([a, np.ones((n, pad))], axis=1)
+        growth = np.cumprod(a.reshape(n, nblocks, block), axis=-1)
+        b /= growth
+    sums = np.cumsum(b, axis=-1, out=b)
+
+    carries = np.empty((n, nblocks, 1))
+    carry = np.zeros(n)
+    ends = np.broadcast_to(growth[:, :, -1], (n, nblocks))
+    for k in range(nblocks):
+        carries[:, k, 0] = carry
+        carry = ends[:, k] * (carry + sums[:, k, -1])
+    sums += carries
+    sums *= growth
+    return sums.reshape(n, -1)[:, :rows]
+
+
+# --- 관측 위치 정보 ---
+# start: 열별 첫 관측 봉, holes: 시작 이후 빈 봉 (열, 봉, 직전 관측 봉) 목록
+# 빈 봉은 보통 드물어서 봉 x 열 전체 배열 대신 위치 목록으로만 다룹니다.
+def _observations(x):
+    obs = ~np.isnan(x)
+    rows = x.shape[1]
+    start = np.where(obs.any(axis=1), obs.argmax(axis=1), rows)
+    col, row = np.nonzero(~obs)
+    keep = row > start[col]
+    col, row = col[keep], row[keep]
+    # 연속된 빈 봉 묶음의 직전 관측 봉 = 묶음 첫 봉 - 1
+    first = np.ones(len(row), dtype=bool)
+    first[1:] = (col[1:] != col[:-1]) | (row[1:] != row[:-1] + 1)
+    last = (row[first] - 1)[np.cumsum(first) - 1]
+    return obs, start, (col, row, last)
+
+
+def _resumed(holes, rows):
+    # 빈 봉 묶음 바로 다음 관측 봉 -> (열, 봉, 직전 관측 이후 봉 수)
+    col, row, last = holes
+    end = np.ones(len(row), dtype=bool)
+    end[:-1] = (col[1:] != col[:-1]) | (row[1:] != row[:-1] + 1)
+    col, row, last = col[end], row[end] + 1, last[end]
+    keep = row < rows
+    return col[keep], row[keep], row[keep] - last[keep]
+
+
+def _finish(out, start, holes, min_periods):
+    col, row, last = holes
+    # 빈 봉은 직전 관측 봉의 값 그대로 (pandas 와 같음, 긴 공백에서 가중치가 0 으로 내려가도 안전)
+    out[col, row] = out[col, last]
+    # min_periods 번째 관측 봉 이전은 NaN: 그 전에 나온 빈 봉 수만큼 뒤로 밀림
+    need = np.maximum(min_periods, 1)
+    rank = np.arange(len(col)) - np.searchsorted(col, col)
+    early = row - start[col] - rank < need[col]
+    ready = start + need - 1 + np.bincount(col[early], minlength=len(out))
+    out[np.arange(out.shape[1]) < ready[:, None]] = np.nan
+    return out
+
+
+# --- pandas Series.ewm(alpha=..., adjust=..., min_periods=...).mean() ---
+# values: 봉 x 열 (또는 1차원), alpha / min_periods 는 스칼라 또는 열별 배열
+def ewm_mean(values, alpha, adjust=True, min_periods=0):
+    x, squeeze = _as_2d(values)
+    return _restore(_ewm_mean(x, alpha, adjust, min_periods), squeeze)
+
+
+def _ewm_mean(x, alpha, adjust=True, min_periods=0):
+    n, rows = x.shape
+    alpha = _per_column(alpha, n)
+    factor = np.maximum(1. - alpha, MIN_FACTOR)
+    obs, start, holes = _observations(x)
+    xs = np.where(obs, x, 0.)
+    block = _block(factor, rows)
+
+    with np.errstate(invalid="ignore", divide="ignore", under="ignore"):
+        if adjust:
+            # 가중합 / 가중치합: 매 봉 f 배로 감쇠, 관측 봉에서 값 / 1 을 더함 (시작 전에는 둘 다 0)
+            out = linear_scan(np.tile(factor, 2), np.vstack([xs, obs.astype(np.float64)]), block)
+            out = out[:n] / out[n:]
+        else:
+            # w = f * w + alpha * x, 첫 관측은 w = x (시작 전에는 0 이라 감쇠 계수는 처음부터 f 로 둬도 같음)
+            b = xs
+            b *= alpha[:, None]
+            began = np.nonzero(start < rows)[0]
+            b[began, start[began]] = x[began, start[began]]
+            col, row, gap = _resumed(holes, rows)
+            if not len(col):
+                out = linear_scan(factor, b, block)
+            else:
+                # 빈 봉 다음 관측 봉: w = (f^k * w' + alpha * x) / (f^k + alpha), k = 직전 관측 이후 봉 수
+                # z = w * f^(직전 관측 이후 빈 봉 수) 로 바꾸면 빈 봉은 z *= f, 그 관측 봉만 z = (f * z + alpha * x) / (f^k + alpha)
+                # 이라서 봉마다 f <= a_t <= f / alpha (누적곱이 블록 안에서 넘치지 않음)
+                a = np.broadcast_to(factor[:, None], (n, rows)).copy()
+                scale = factor[col] ** gap + alpha[col]
+                a[col, row] = factor[col] / scale
+                b[col, row] /= scale
+                out = linear_scan(a, b, block)
+
+    return _finish(out, start, holes, _per_column(min_periods, n))
+
+
+# --- pandas_ta.rsi: Wilder 평균 (rma = ewm(alpha=1/length, min_periods=length)) ---
+# RSI = 상승분 평균 / (상승분 평균 + 하락분 평균). 두 평균은 관측 위치가 같아 가중치 합이 같으므로
+# 약분하고 감쇠 가중합(상승분, 전체 변동폭) 두 개만 계산합니다.
+def rsi(close, length=14):
+    x, squeeze = _as_2d(close)
+    n, rows = x.shape
+    lengths = _per_column(length, n)
+    diff = np.full_like(x, np.nan)
+    np.subtract(x[:, 1:], x[:, :-1], out=diff[:, 1:])
+    obs, start, holes = _observations(diff)
+    moves = np.empty((2 * n, rows))
+    np.fmax(diff, 0., out=moves[:n])
+    np.abs(diff, out=moves[n:])
+    np.nan_to_num(moves[n:], copy=False)
+    with np.errstate(invalid="ignore", divide="ignore", under="ignore"):
+        factor = np.maximum(1. - 1. / lengths, MIN_FACTOR)
+        sums = linear_scan(np.tile(factor, 2), moves, _block(factor, rows))
+        out = np.where(sums[n:] != 0, 100. * sums[:n] / sums[n:], np.nan)
+    return _restore(_finish(out, start, holes, lengths), squeeze)
+
+
+# --- pandas_ta.ema: 첫 length 봉 평균으로 시작, ewm(span=length, adjust=False) ---
+def ema(close, length):
+    x, squeeze = _as_2d(close)
+    n, rows = x.shape
+    lengths = _per_column(length, n).astype(np.int64)
+    start = first_valid(x.T)
+    seed_row = start + lengths - 1
+    cols = np.nonzero(seed_row < rows)[0]
+
+    # 시작 전 ~ 첫 평균 직전 봉은 NaN, 첫 평균 봉은 (앞 length 봉 합 / length)
+    values = np.where(np.arange(rows) > seed_row[:, None], x, np.nan)
+    if len(cols):
+        head = seed_row[cols].max() + 1
+        csum = np.hstack([np.zeros((n, 1)), np.nancumsum(x[:, :head], axis=1)])
+        values[cols, seed_row[cols]] = (csum[cols, seed_row[cols] + 1] - csum[cols, start[cols]]) / lengths[cols]
+
+    return _restore(_ewm_mean(values, 2. / (lengths + 1.), False), squeeze)
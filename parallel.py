@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import perf
+import streaming
+
+# --- 병렬 백테스트 설정 ---
+# AUTO_TRADE_WORKERS: 워커 프로세스 수 (0 = CPU 코어 수, 1 = 현재 프로세스에서 순차 실행)
+# AUTO_TRADE_CHUNK: 워커에 한 번에 넘길 프레임(자산 x 봉 길이) 수
+WORKERS = int(os.environ.get("AUTO_TRADE_WORKERS", "0"))
+CHUNK_SIZE = int(os.environ.get("AUTO_TRADE_CHUNK", "4"))
+# AUTO_TRADE_MP_START: 워커 프로세스 시작 방식. 대시보드처럼 스레드가 도는 프로세스에서 fork 하면
+# 다른 스레드가 잡고 있던 잠금이 자식에 그대로 복사되므로 기본값은 forkserver (없으면 spawn)
+MP_START = os.environ.get("AUTO_TRADE_MP_START",
+                          "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+OHLCV_COLS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def resolve_workers(workers=None):
+    workers = WORKERS if workers is None else workers
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+# --- 공유 메모리 묶음 ---
+# 청크 안의 프레임들을 공유 메모리 블록 하나에 나란히 적재합니다.
+#   [시각 int64 x 전체 행][OHLCV float64 x 전체 행 x 5]
+# 워커에는 블록 이름과 (시작 행, 행 수, tz) 메타데이터만 피클링해서 넘깁니다.
+def pack_frames(frames):
+    lengths = [len(df) for _, _, df in frames]
+    rows = sum(lengths)
+    nbytes = max(1, rows * 8 * (1 + len(OHLCV_COLS)))
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+    times = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf, offset=0)
+    values = np.ndarray((rows, len(OHLCV_COLS)), dtype=np.float64, buffer=shm.buf, offset=rows * 8)
+
+    meta = []
+    offset = 0
+    for (asset, interval, df), length in zip(frames, lengths):
+        index = pd.DatetimeIndex(df.index)
+        times[offset:offset + length] = index.asi8
+        for j, col in enumerate(OHLCV_COLS):
+            values[offset:offset + length, j] = df[col].to_numpy(dtype=np.float64) if col in df.columns else np.nan
+        meta.append({"asset": asset, "interval": interval, "offset": offset, "length": length,
+                     "tz": str(index.tz) if index.tz is not None else None, "unit": index.unit})
+        offset += length
+
+    return shm, {"name": shm.name, "rows": rows, "frames": meta}
+
+
+# 해제(unlink) 책임은 부모 프로세스. 워커는 부모의 resource_tracker 를 같이 쓰므로 (fork / spawn 모두)
+# Python < 3.13 에서 붙을 때 등록되는 것은 부모가 만든 등록과 같은 한 건이고, 워커 종료로 블록이 지워지지 않습니다.
+# 워커에서 unregister 하면 그 한 건이 지워져 부모의 unlink 때 tracker 가 KeyError 를 냅니다.
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)  # Python < 3.13: track 인자 없음
+
+
+def unpack_frames(shm, packed):
+    rows = packed["rows"]
+    times = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf, offset=0)
+    values = np.ndarray((rows, len(OHLCV_COLS)), dtype=np.float64, buffer=shm.buf, offset=rows * 8)
+    frames = []
+    for m in packed["frames"]:
+        lo, hi = m["offset"], m["offset"] + m["length"]
+        index = pd.DatetimeIndex(times[lo:hi].astype(f"datetime64[{m['unit']}]"))
+        if m["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(m["tz"])
+        df = pd.DataFrame(values[lo:hi], index=index, columns=OHLCV_COLS, copy=False)
+        frames.append((m["asset"], m["interval"], df))
+    return frames
+
+
+# --- 워커 진입점 ---
+# with_streams: True 면 스트리밍 전략 상태도 채워서 (SpecStream.fill) 같이 돌려줌
+# 반환: (결과 목록, 이 청크의 계측 결과, 스트림 {키: 스트림} 또는 None) -> 부모가 계측기 / 스트림 보관소에 합침
+def _run_chunk(packed, current_time, with_streams=False):
+    import batch_analyzer
+
+    shm = _attach(packed["name"])
+    try:
+        streams = streaming.StreamRegistry() if with_streams else None
+        with perf.recording() as recorder:
+            frames = unpack_frames(shm, packed)
+            batch_analyzer.prefetch_indicators(frames)
+            out = [((asset['ticker'], interval), batch_analyzer.analyze_frame(asset, interval, df, current_time, streams))
+                   for asset, interval, df in frames]
+            del frames
+        return out, recorder.export(), streams.streams if streams is not None else None
+    finally:
+        shm.close()
+
+
+# forkserver 는 서버 프로세스에 분석 모듈을 한 번만 올려두고 워커마다 거기서 fork
+def _mp_context():
+    context = multiprocessing.get_context(MP_START)
+    if MP_START == "forkserver":
+        context.set_forkserver_preload(["batch_analyzer"])
+    return context
+
+
+def _chunks(frames, size):
+    chunk = []
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- 병렬 실행기 ---
+# frames: (asset, interval, df) 반복자 (도착하는 대로 청크 단위로 제출)
+# streams: streaming.StreamRegistry 를 주면 프레임마다 스트리밍 전략 상태를 배치로 채워서 보관소에 넣음
+#          (처음 보는 프레임의 상태를 워커에서 만들고, 다음 실행부터는 새 봉만 반영)
+# 반환: [((ticker, interval), rows), ...] 제출 순서 그대로
+def run_parallel(frames, current_time, workers=None, chunksize=None, streams=None):
+    workers = resolve_workers(workers)
+    chunksize = chunksize or CHUNK_SIZE
+
+    if workers <= 1:
+        import batch_analyzer
+        results = []
+        for chunk in _chunks(frames, chunksize):
+            batch_analyzer.prefetch_indicators(chunk)
+            results.extend(((asset['ticker'], interval), batch_analyzer.analyze_frame(asset, interval, df, current_time, streams))
+                           for asset, interval, df in chunk)
+        return results
+
+    pending = []  # 제출 순서대로 (future, shm) 또는 (None, 빈 프레임 결과)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as pool:
+        def submit(chunk):
+            shm, packed = pack_frames(chunk)
+            pending.append((pool.submit(_run_chunk, packed, current_time, streams is not None), shm))
+
+        try:
+            chunk = []
+            for asset, interval, df in frames:
+                if df is None or df.empty:
+                    pending.append((None, ((asset['ticker'], interval), [])))
+                    continue
+                chunk.append((asset, interval, df))
+                if len(chunk) >= chunksize:
+                    submit(chunk)
+                    chunk = []
+            if chunk:
+                submit(chunk)
+
+            for fut, item in pending:
+                if fut is None:
+                    results.append(item)
+                else:
+                    out, report, filled = fut.result()
+                    perf.PERF.merge(report)
+                    if filled:
+                        streams.streams.update(filled)
+                    results.extend(out)
+        finally:
+            for fut, shm in pending:
+                if fut is not None:
+                    shm.close()
+                    shm.unlink()
+    return results
@@ -0,0 +1,220 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- 성능 계측 (구간 + 카운터) ---
+# 분석 한 번(마지막 실행)의 단계별 소요 시간을 모읍니다.
+#   span(stage, **labels)   : 구간 시간 (fetch / indicator / backtest / metrics)
+#   count(name, n, **labels): 카운터 (rows, fetch_retries, fetch_failures, indicator_cache_hits ...)
+#   labels(**labels)        : 현재 스레드의 기본 라벨 (ticker / interval / strategy), 안쪽 span 에 자동으로 붙음
+# export() 결과(dict)는 JSON 으로 그대로 저장되고 스냅샷 meta["perf"] 로 대시보드에 전달됩니다.
+# 실행마다 Recorder 를 따로 두고 recording() 으로 현재 실행에 묶습니다. (동시에 도는 실행끼리 섞이지 않음)
+STAGES = ["fetch", "indicator", "backtest", "metrics"]
+MAX_SPANS = 20000   # 보관할 구간 수 상한 (넘치면 단계별 합계만 갱신)
+METRIC_PREFIX = "auto_trade"
+
+
+class Recorder:
+    def __init__(self, max_spans=MAX_SPANS):
+        self.max_spans = max_spans
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.spans = []
+            self.stages = {}    # stage -> {"seconds", "count", "failures"}
+            self.counters = {}  # (name, ((label, value), ...)) -> 값
+            self.dropped = 0
+
+    # --- 라벨 ---
+    def current_labels(self):
+        return getattr(self.local, "labels", {})
+
+    @contextmanager
+    def labels(self, **labels):
+        previous = self.current_labels()
+        self.local.labels = {**previous, **{k: v for k, v in labels.items() if v is not None}}
+        try:
+            yield
+        finally:
+            self.local.labels = previous
+
+    # --- 구간 ---
+    # with PERF.span("fetch", task=...) as span: ... span["ok"] = False 로 실패 표시
+    @contextmanager
+    def span(self, stage, **labels):
+        record = {**self.current_labels(), **labels, "ok": True}
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["ok"] = False
+            raise
+        finally:
+            self.add_span(stage, time.perf_counter() - started, record)
+
+    def add_span(self, stage, seconds, labels=None):
+        record = {"stage": stage, "seconds": seconds, "ok": True, **(labels or {})}
+        with self.lock:
+            total = self.stages.setdefault(stage, {"seconds": 0.0, "count": 0, "failures": 0})
+            total["seconds"] += seconds
+            total["count"] += 1
+            total["failures"] += 0 if record["ok"] else 1
+            if len(self.spans) < self.max_spans:
+                self.spans.append(record)
+            else:
+                self.dropped += 1
+
+    # --- 카운터 ---
+    def count(self, name, n=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    # --- 내보내기 / 합치기 ---
+    def export(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "finished": time.time(),
+                "stages": {stage: dict(total) for stage, total in self.stages.items()},
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in self.counters.items()],
+                "spans": list(self.spans),
+                "dropped": self.dropped,
+            }
+
+    # 워커 프로세스에서 export() 한 결과를 합침 (parallel.py)
+    def merge(self, report):
+        with self.lock:
+            for stage, total in report.get("stages", {}).items():
+                mine = self.stages.setdefault(stage, {"seconds": 0.0, "count": 0, "failures": 0})
+                for k in mine:
+                    mine[k] += total.get(k, 0)
+            for c in report.get("counters", []):
+                key = (c["name"], tuple(sorted(c["labels"].items())))
+                self.counters[key] = self.counters.get(key, 0) + c["value"]
+            room = max(0, self.max_spans - len(self.spans))
+            spans = report.get("spans", [])
+            self.spans.extend(spans[:room])
+            self.dropped += report.get("dropped", 0) + max(0, len(spans) - room)
+
+
+# --- 실행별 계측기 ---
+# recording(recorder) 블록 안(같은 contextvars 컨텍스트)의 계측은 그 recorder 로 모입니다.
+# 스레드 풀에 넘기는 작업은 contextvars.copy_context().run 으로 컨텍스트를 같이 넘겨야 합니다. (data_fetcher.iter_fetch)
+# 실행 밖에서 부른 계측은 프로세스 기본 계측기(DEFAULT)로
+DEFAULT = Recorder()
+_CURRENT = contextvars.ContextVar("perf_recorder", default=None)
+
+
+def current():
+    recorder = _CURRENT.get()
+    return DEFAULT if recorder is None else recorder
+
+
+# recorder: 이번 실행의 계측기 (기본값 새 Recorder)
+@contextmanager
+def recording(recorder=None):
+    recorder = Recorder() if recorder is None else recorder
+    token = _CURRENT.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _CURRENT.reset(token)
+
+
+# 현재 실행의 계측기로 넘겨주는 창구 (perf.PERF.span(...), perf.PERF.count(...))
+class _Current:
+    def __getattr__(self, name):
+        return getattr(current(), name)
+
+
+PERF = _Current()
+
+
+# --- 보고서 조회 (export() 결과 기준, 대시보드에서 사용) ---
+def stage_totals(report):
+    stages = report.get("stages", {})
+    order = STAGES + sorted(s for s in stages if s not in STAGES)
+    return [{"stage": s, **stages[s]} for s in order if s in stages]
+
+
+def slowest(report, n=10, stage=None):
+    spans = [s for s in report.get("spans", []) if stage is None or s["stage"] == stage]
+    return sorted(spans, key=lambda s: s["seconds"], reverse=True)[:n]
+
+
+def counter_totals(report):
+    # 카운터 이름 -> 라벨을 무시한 합계
+    totals = {}
+    for c in report.get("counters", []):
+        totals[c["name"]] = totals.get(c["name"], 0) + c["value"]
+    return totals
+
+
+def summary(report):
+    parts = [f"{t['stage']} {t['seconds']:.1f}s/{t['count']}" for t in stage_totals(report)]
+    return ", ".join(parts)
+
+
+# --- JSON / Prometheus 텍스트 형식 ---
+def to_json(report):
+    return json.dumps(report, ensure_ascii=False, indent=2, default=str)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def to_prometheus(report, prefix=METRIC_PREFIX):
+    # 마지막 실행 값이므로 모두 gauge (실행마다 초기화)
+    lines = []
+
+    def metric(name, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        for labels, value in samples:
+            lines.append(f"{prefix}_{name}{_label_text(labels)} {value}")
+
+    totals = stage_totals(report)
+    metric("stage_seconds", "Seconds spent per stage in the last analysis run.",
+           [({"stage": t["stage"]}, round(t["seconds"], 6)) for t in totals])
+    metric("stage_spans", "Number of timed spans per stage in the last analysis run.",
+           [({"stage": t["stage"]}, t["count"]) for t in totals])
+    metric("stage_failures", "Number of failed spans per stage in the last analysis run.",
+           [({"stage": t["stage"]}, t["failures"]) for t in totals])
+
+    by_name = {}
+    for c in report.get("counters", []):
+        by_name.setdefault(c["name"], []).append((c["labels"], c["value"]))
+    for name in sorted(by_name):
+        metric(name, f"Last analysis run counter '{name}'.", by_name[name])
+
+    metric("run_started_timestamp_seconds", "Unix time the last analysis run started.", [({}, report.get("started", 0))])
+    metric("run_duration_seconds", "Wall time of the last analysis run.",
+           [({}, round(report.get("finished", 0) - report.get("started", 0), 6))])
+    return "\n".join(lines) + "\n"
+
+
+# <folder>/perf.json, <folder>/perf.prom (node_exporter textfile collector 등에서 읽어감)
+def write_exports(report, folder):
+    os.makedirs(folder, exist_ok=True)
+    for name, text in (("perf.json", to_json(report)), ("perf.prom", to_prometheus(report))):
+        path = os.path.join(folder, name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
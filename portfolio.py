@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+import backtest_engine
+import fees
+import indicators
+import strategies
+import timeframes
+import trade_records
+
+# --- 포트폴리오 백테스트 (봉 x 자산) ---
+# 같은 봉 길이의 자산들을 공통 시간축(UTC) 하나에 (봉 x 자산) 배열로 맞추고, 현금 하나를 나눠 쓰면서 전략을 동시에 돌립니다.
+# - 신호는 자산마다 자기 봉에서만 판단 (strategies.py 명세, 지표는 자산별 원래 봉으로 계산)
+# - 진입 금액: 현재 평가금액 x weight (기본 1 / 자산 수), 남은 여력(평가금액 - 보유 포지션 금액)을 넘지 않음 (레버리지 없음)
+#   여력이 모자라면 자산 순서대로 채우고 마지막 자산은 남은 만큼만 진입
+# - 청산 -> 진입 순서, 같은 봉 재진입 가능, 손절은 종가 기준 (backtest_engine.resolve_positions 와 같은 규칙)
+# - 수수료: 소스별 편도 수수료를 진입/청산 금액에 적용 (fees.FEE_SCHEDULES)
+# 봉마다 돌지 않고 진입 후보 봉 / 포지션별 청산 예정 봉으로만 건너뛰며, 평가금액 곡선은 마지막에 배열 연산으로 만듭니다.
+INITIAL_BALANCE = 1000000
+MIN_BARS = 200  # batch_analyzer.MIN_BARS 와 같음 (이보다 짧은 자산은 제외)
+
+# 포트폴리오 거래 기록: 거래 기록 + 자산 번호(tickers 순서) + 실현 손익 금액 (수수료 포함)
+# pnl 은 진입 금액 대비 수익률 (수수료 포함)
+PORTFOLIO_TRADE_DTYPE = np.dtype(trade_records.TRADE_DTYPE.descr + [("asset", "i2"), ("amount", "f8")])
+
+
+def utc_times(asset, index):
+    # tz 없는 인덱스는 자산 세션 타임존의 현지 시각 (timeframes.SESSION_RULES)
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize(timeframes.SESSION_RULES[timeframes.get_session(asset)]['tz'],
+                                  ambiguous="NaT", nonexistent="shift_forward")
+    return index.tz_convert("UTC").as_unit("ns").asi8
+
+
+# --- 공통 시간축 ---
+# frames: (asset, interval, df) 목록 -> (UTC epoch-ns 시간축, 자산별 시간축 위치 목록)
+def align(frames):
+    times = [utc_times(asset, df.index) for asset, _, df in frames]
+    axis = np.unique(np.concatenate(times)) if times else np.empty(0, dtype=np.int64)
+    return axis, [np.searchsorted(axis, t) for t in times]
+
+
+# frames: 같은 봉 길이의 (asset, interval, df) 목록, strategy: strategies.STRATEGIES 이름
+# weight: 진입 1건의 평가금액 대비 비중 (기본 1 / 자산 수)
+# cache: indicators.IndicatorCache (기본 공용 캐시)
+def run_portfolio(frames, strategy, weight=None, initial_balance=INITIAL_BALANCE, fee=True, cache=None):
+    program = strategies.STRATEGIES[strategy]
+    cache = cache or indicators.INDICATOR_CACHE
+    frames = [(asset, interval, df) for asset, interval, df in frames if df is not None and len(df) >= MIN_BARS]
+    frames = [(asset, interval, df[df.index.notna()]) for asset, interval, df in frames]
+    if not frames:
+        return None
+
+    axis, positions = align(frames)
+    T, A = len(axis), len(frames)
+    weight = 1.0 / A if weight is None else weight
+
+    # --- (봉 x 자산) 배열 ---
+    close = np.full((T, A), np.nan)
+    tradable = np.zeros((T, A), dtype=bool)       # 자기 봉이 있고 가격/지표가 유효한 봉
+    long_entry = np.zeros((T, A), dtype=bool)
+    short_entry = np.zeros((T, A), dtype=bool)
+    long_exit = np.zeros((T, A), dtype=bool)
+    short_exit = np.zeros((T, A), dtype=bool)
+    started = np.zeros((T, A), dtype=bool)        # 지표 안정화(warmup) 이후
+    for a, ((asset, interval, df), rows) in enumerate(zip(frames, positions)):
+        ind = cache.frame(df, asset['ticker'], interval)
+        values = program.values(ind)
+        signals = program.signals(values)
+        valid = signals.get("valid", True) & ~np.isnan(values['close'])
+        close[rows, a] = values['close']
+        tradable[rows, a] = valid
+        long_entry[rows, a] = signals['long_entry']
+        short_entry[rows, a] = signals['short_entry']
+        long_exit[rows, a] = signals['long_exit']
+        short_exit[rows, a] = signals['short_exit']
+        if program.warmup < len(rows):
+            started[rows[program.warmup]:, a] = True
+    long_entry &= tradable & started
+    short_entry &= tradable & started
+    entry_bars = np.flatnonzero((long_entry | short_entry).any(axis=1))
+    exit_rows = {backtest_engine.LONG: [np.flatnonzero(long_exit[:, a] & tradable[:, a]) for a in range(A)],
+                 backtest_engine.SHORT: [np.flatnonzero(short_exit[:, a] & tradable[:, a]) for a in range(A)]}
+    mark = pd.DataFrame(close).ffill().to_numpy()  # 평가용 가격 (봉이 없는 시각은 직전 가격)
+
+    sources = [asset.get('source') for asset, _, _ in frames]
+    entry_fee = np.array([fees.FEE_SCHEDULES.get(s, fees.DEFAULT_SCHEDULE)[fees.ENTRY_ORDER] for s in sources]) if fee else np.zeros(A)
+    exit_fee = np.array([fees.FEE_SCHEDULES.get(s, fees.DEFAULT_SCHEDULE)[fees.EXIT_ORDER] for s in sources]) if fee else np.zeros(A)
+    sl_pct = program.stop_loss
+
+    # --- 포지션 상태 (자산 축 벡터) ---
+    qty = np.zeros(A)                       # 보유 수량 (숏은 음수)
+    side = np.zeros(A, dtype=np.int8)
+    cost = np.zeros(A)                      # 진입 금액 + 진입 수수료 (부호 포함 현금 유출)
+    notional_in = np.zeros(A)
+    exit_at = np.full(A, T)                 # 청산 예정 봉 (없으면 T)
+    exit_reason = np.zeros(A, dtype=np.int8)
+    cash = float(initial_balance)
+
+    def schedule_exit(a, e):
+        # 신호 청산: 진입 다음 봉부터 첫 청산 신호, 손절: 그 봉까지 포함해 종가 검사 (같은 봉이면 손절 우선)
+        rows = exit_rows[side[a]][a]
+        k = np.searchsorted(rows, e, side="right")
+        x = int(rows[k]) if k < len(rows) else T
+        reason = backtest_engine.REASON_SIGNAL
+        if sl_pct is not None:
+            hi = min(x + 1, T)
+            seg = close[e + 1:hi, a]
+            limit = close[e, a] * (1 - sl_pct if side[a] == backtest_engine.LONG else 1 + sl_pct)
+            with np.errstate(invalid="ignore"):
+                hit = (seg <= limit) if side[a] == backtest_engine.LONG else (seg >= limit)
+            hit &= tradable[e + 1:hi, a]
+            if hit.any():
+                x = e + 1 + int(hit.argmax())
+                reason = backtest_engine.REASON_STOP
+        exit_at[a] = x
+        exit_reason[a] = reason
+
+    event_rows, event_qty, event_cash = [], [], []
+    trades = []
+    i = 0
+    while True:
+        k = np.searchsorted(entry_bars, i)
+        e = int(entry_bars[k]) if k < len(entry_bars) else T
+        t = min(e, int(exit_at.min()))
+        if t >= T:
+            break
+        price = close[t]
+
+        # 1. 청산
+        closing = np.flatnonzero(exit_at == t)
+        if len(closing):
+            value = qty[closing] * price[closing]
+            proceeds = value - np.abs(value) * exit_fee[closing]
+            cash += proceeds.sum()
+            amount = proceeds - cost[closing]
+            trades.append((np.full(len(closing), t), amount / notional_in[closing], side[closing],
+                           exit_reason[closing], closing, amount))
+            qty[closing] = 0.0
+            side[closing] = 0
+            exit_at[closing] = T
+
+        # 2. 진입 (비어 있는 자산만, 자산 순서대로 여력 배분)
+        if t == e:
+            go_long = (side == 0) & long_entry[t]
+            go_short = (side == 0) & ~go_long & short_entry[t]
+            opening = np.flatnonzero(go_long | go_short)
+            if len(opening):
+                held = np.where(qty != 0, qty * mark[t], 0.0)
+                equity = cash + held.sum()
+                room = max(equity - np.abs(held).sum(), 0.0)
+                need = np.full(len(opening), max(equity * weight, 0.0)) * (1 + entry_fee[opening])
+                spent = np.cumsum(need) - need
+                paid = np.clip(room - spent, 0.0, need)
+                notional = paid / (1 + entry_fee[opening])
+                ok = notional > 0
+                opening, notional, paid = opening[ok], notional[ok], paid[ok]
+                sign = np.where(go_long[opening], backtest_engine.LONG, backtest_engine.SHORT)
+                qty[opening] = sign * notional / price[opening]
+                side[opening] = sign
+                cost[opening] = sign * notional + (paid - notional)
+                notional_in[opening] = notional
+                cash -= cost[opening].sum()
+                for a in opening:
+                    schedule_exit(int(a), t)
+
+        event_rows.append(t)
+        event_qty.append(qty.copy())
+        event_cash.append(cash)
+        i = t + 1
+
+    # --- 평가금액 곡선: 이벤트 사이에는 포지션이 그대로이므로 이벤트 상태를 앞으로 채워서 한 번에 평가 ---
+    last = np.full(T, -1)
+    last[np.asarray(event_rows, dtype=np.int64)] = np.arange(len(event_rows))
+    last = np.maximum.accumulate(last)
+    held_qty = np.vstack([np.zeros((1, A))] + [q[None, :] for q in event_qty])[last + 1]
+    cash_curve = np.concatenate([[float(initial_balance)], event_cash])[last + 1]
+    holdings = np.where(held_qty != 0, held_qty * np.nan_to_num(mark), 0.0)
+    equity = cash_curve + holdings.sum(axis=1)
+
+    records = np.empty(sum(len(part[0]) for part in trades), dtype=PORTFOLIO_TRADE_DTYPE)
+    if trades:
+        rows, pnl, sides, reasons, assets, amounts = (np.concatenate(col) for col in zip(*trades))
+        records["time"] = axis[rows]
+        records["pnl"] = pnl
+        records["side"] = sides
+        records["reason"] = program.reason_codes(sides, reasons)
+        records["asset"] = assets
+        records["amount"] = amounts
+
+    return {
+        "strategy": strategy,
+        "interval": frames[0][1],
+        "tickers": [asset['ticker'] for asset, _, _ in frames],
+        "times": axis,
+        "equity": equity,
+        "cash": cash_curve,
+        "exposure": np.abs(holdings).sum(axis=1),
+        "trade_history": records,
+        "initial_balance": float(initial_balance),
+        "final_balance": float(equity[-1]),
+        "return": (equity[-1] - initial_balance) / initial_balance * 100,
+        "trades": len(records),
+        "win_rate": float((records["pnl"] > 0).mean() * 100) if len(records) else 0.0,
+        "open_positions": int((side != 0).sum()),
+        "asset_pnl": np.bincount(records["asset"], weights=records["amount"], minlength=A),
+    }
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+
+import indicators
+import perf
+
+# --- 분석 결과 캐시 (입력 내용 해시 기준, 디스크 보관) ---
+# (자산, 봉 길이) 마다 파일 하나에 마지막 결과와 그 입력 키를 둡니다.
+# 키 = 봉 내용 해시 (indicators.data_version + 타임존) + 전략 파라미터 + 코드 버전
+# 봉이 그대로면 (주말 주식, 휴장 중 선물, 아직 마감 안 된 일봉) 백테스트 없이 저장된 결과를 다시 씁니다.
+CACHE_DIR = os.environ.get("AUTO_TRADE_RESULT_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache"))
+
+# 결과에 영향을 주는 코드: 하나라도 바뀌면 모든 키가 바뀜 (배포 후 첫 실행은 전체 재계산)
+CODE_FILES = ["batch_analyzer.py", "backtest_engine.py", "indicators.py", "kernels.py", "risk_metrics.py", "strategies.py",
+              "streaming.py", "trade_records.py"]
+
+
+def code_version(files=CODE_FILES):
+    root = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.blake2b(digest_size=8)
+    for name in files:
+        with open(os.path.join(root, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+CODE_VERSION = code_version()
+
+
+def result_key(df, params, code=CODE_VERSION):
+    h = hashlib.blake2b(digest_size=16)
+    for part in (indicators.data_version(df), str(getattr(df.index, "tz", None)), repr(params), code):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        self.entries = {}  # (source, ticker, interval) -> (키, 결과 행) 프로세스 내 메모리 캐시
+
+    def path(self, source, ticker, interval):
+        safe_ticker = re.sub(r"[^0-9A-Za-z_.-]", "_", ticker)
+        return os.path.join(self.root, source, safe_ticker, f"{interval}.pkl")
+
+    def _load(self, source, ticker, interval):
+        entry_id = (source, ticker, interval)
+        with self.lock:
+            if entry_id in self.entries:
+                return self.entries[entry_id]
+        path = self.path(source, ticker, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            print(f"Result cache read error {path}: {e}")
+            return None
+        with self.lock:
+            self.entries[entry_id] = entry
+        return entry
+
+    # 키가 같을 때만 저장된 결과 행, 아니면 None
+    def get(self, source, ticker, interval, key):
+        entry = self._load(source, ticker, interval)
+        if entry is not None and entry[0] == key:
+            perf.PERF.count("result_cache_hits", source=source)
+            return entry[1]
+        perf.PERF.count("result_cache_misses", source=source)
+        return None
+
+    def put(self, source, ticker, interval, key, rows):
+        entry = (key, rows)
+        path = self.path(source, ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)  # 원자적 교체 (다른 워커는 항상 완전한 파일만 봄)
+        with self.lock:
+            self.entries[(source, ticker, interval)] = entry
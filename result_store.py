@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from trade_index import TradeIndex
+
+# --- 분석 결과 저장소 (프로세스당 하나, 읽기 전용) ---
+# 결과 행(list of dict)을 열 단위 NumPy 배열로 한 번만 변환해 두고 모든 세션이 같은 객체를 공유합니다.
+# 문자열 열은 범주 코드(int16) + 범주 목록(처음 나온 순서)으로, 거래 내역은 TradeIndex 로 보관합니다.
+# 세션은 필터 마스크(bool 배열)만 만들고, 화면에 표시할 행만 작은 DataFrame 으로 꺼냅니다.
+CATEGORICAL_COLUMNS = ['asset', 'ticker', 'source', 'category', 'strategy', 'interval', 'current_signal', 'timestamp']
+NUMERIC_COLUMNS = {'return': np.float64, 'win_rate': np.float64, 'trades': np.int64, 'last_price': np.float64,
+                   'max_drawdown': np.float64, 'sharpe': np.float64, 'sortino': np.float64, 'exposure': np.float64,
+                   'avg_hold_hours': np.float64}
+
+
+def _readonly(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+class ResultStore:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.n = len(rows)
+        self.codes = {}
+        self.categories = {}
+        self.numeric = {}
+
+        for col in CATEGORICAL_COLUMNS:
+            values = [r.get(col) for r in rows]
+            if all(v is None for v in values):
+                continue
+            cat = pd.Categorical(values, categories=pd.unique(pd.Series([v for v in values if v is not None], dtype=object)))
+            self.codes[col] = _readonly(cat.codes.astype(np.int16))
+            self.categories[col] = tuple(cat.categories)
+
+        for col, dtype in NUMERIC_COLUMNS.items():
+            if any(col in r for r in rows):
+                fill = 0 if dtype is np.int64 else np.nan
+                self.numeric[col] = _readonly(np.array([r.get(col, fill) for r in rows], dtype=dtype))
+
+        self.trade_index = TradeIndex.from_histories([r.get('trade_history') for r in rows], [r.get('tz') for r in rows])
+        self.curves = [r.get('equity_curve') for r in rows]  # 행별 축약 자산 곡선 (risk_metrics.CURVE_DTYPE, 없으면 None)
+        self.tzs = [r.get('tz') for r in rows]               # 행별 시각 타임존 (곡선 시각을 현지 시각으로 바꿀 때)
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def empty(self):
+        return self.n == 0
+
+    @property
+    def columns(self):
+        return list(self.codes) + list(self.numeric)
+
+    def __contains__(self, col):
+        return col in self.codes or col in self.numeric
+
+    # --- 범주 열 ---
+    # 마스크 안에 나오는 라벨 (처음 나온 순서 = pandas unique 와 같은 순서)
+    def labels(self, col, mask=None):
+        codes = self.codes[col] if mask is None else self.codes[col][mask]
+        present = np.unique(codes[codes >= 0])
+        return [self.categories[col][c] for c in present]
+
+    def mask(self, **selected):
+        # selected: 열 이름 -> 라벨 ("All" / None 이면 조건 없음)
+        m = np.ones(self.n, dtype=bool)
+        for col, label in selected.items():
+            if label in (None, "All") or col not in self.codes:
+                continue
+            cats = self.categories[col]
+            m &= self.codes[col] == (cats.index(label) if label in cats else -2)
+        return m
+
+    # --- 열 꺼내기 (읽기 전용 배열) ---
+    def column(self, col, mask=None):
+        if col in self.numeric:
+            values = self.numeric[col]
+            return values if mask is None else values[mask]
+        codes = self.codes[col] if mask is None else self.codes[col][mask]
+        labels = np.array(self.categories[col] + (None,), dtype=object)
+        return labels[codes]  # 코드 -1 (값 없음) 은 마지막 None 으로
+
+    # 마스크 안 행들의 (축약 자산 곡선, 타임존) (행 순서대로)
+    def equity_curves(self, mask=None):
+        rows = range(self.n) if mask is None else np.flatnonzero(mask)
+        return [(self.curves[i], self.tzs[i]) for i in rows]
+
+    # 선택된 행만 표시용 DataFrame 으로 (overrides: 열 이름 -> 전체 행 길이의 배열, 기간 재계산 값 등)
+    def frame(self, mask=None, columns=None, overrides=None):
+        overrides = overrides or {}
+        columns = columns or self.columns
+        data = {}
+        for col in columns:
+            if col in overrides:
+                values = overrides[col]
+                data[col] = values if mask is None else values[mask]
+            elif col in self:
+                data[col] = self.column(col, mask)
+        return pd.DataFrame(data)
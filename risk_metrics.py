@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+
+import backtest_engine
+
+# --- 위험 지표 + 자산 곡선 ---
+# 봉 단위 평가금액(자산 곡선)을 만들고, 그 곡선 하나로 MDD / Sharpe / Sortino / 노출 비율 / 평균 보유 시간을 한 번에 계산합니다.
+# 평가금액 = 마지막 청산 후 잔고, 포지션 보유 중이면 그 잔고 x (1 + 미실현 수익률) (수수료 전, 거래 기록 pnl 과 같은 기준)
+# 결과 행에는 전체 곡선 대신 LTTB 로 줄인 곡선(최대 CURVE_POINTS 점)만 담아 대시보드로 보냅니다.
+CURVE_POINTS = int(os.environ.get("AUTO_TRADE_CURVE_POINTS", 1000))
+CURVE_DTYPE = np.dtype([("time", "i8"), ("equity", "f8")])
+YEAR_NS = 365.25 * 24 * 3600 * 1e9
+LTTB_MAX_WIDTH = 16  # 버킷 폭이 이 이하면 (이전 점 x 후보 점) 표로 한 번에 계산, 넘으면 버킷 단위 루프
+
+
+# 엔진 결과(backtest_engine.resolve_positions) -> (봉 단위 평가금액, 보유 봉 수, 청산된 거래 보유 시간 합계 ns)
+def equity_curve(times, close, bt, initial_balance):
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    entry, exit, side = bt["entry_idx"], bt["exit_idx"], bt["side"]
+    balances = np.multiply.accumulate(np.concatenate(([initial_balance], 1 + bt["pnl"])))  # compound_balance 와 같은 순서
+    hold_ns = int((times[exit] - times[entry]).sum())
+    if bt["open_side"] != backtest_engine.FLAT:
+        entry = np.append(entry, bt["open_entry_idx"])
+        exit = np.append(exit, n)
+        side = np.append(side, bt["open_side"])
+
+    bars = np.arange(n)
+    equity = balances[np.searchsorted(bt["exit_idx"], bars, side="right")]
+    if len(exit) == 0:
+        return equity, 0, hold_ns  # 거래도 보유 포지션도 없음: 평가금액 = 초기 잔고
+    j = np.searchsorted(entry, bars, side="right") - 1  # 그 봉까지 마지막으로 진입한 거래
+    held = (j >= 0) & (bars < exit[np.maximum(j, 0)])
+    if held.any():
+        j = j[held]
+        entry_price = close[entry[j]]
+        price = close[held]
+        equity[held] = balances[j] * (1 + np.where(side[j] == backtest_engine.LONG, price - entry_price, entry_price - price) / entry_price)
+    return equity, int(held.sum()), hold_ns
+
+
+# --- 곡선 하나로 위험 지표 계산 ---
+# times: 봉 시각 (epoch-ns), equity: 봉 단위 평가금액 (NaN 은 직전 값), held_bars: 포지션 보유 봉 수
+# hold_ns: 청산된 거래들의 보유 시간 합계, trades: 청산된 거래 수
+def summarize(times, equity, held_bars, hold_ns, trades, points=CURVE_POINTS):
+    equity = np.asarray(equity, dtype=np.float64)
+    if np.isnan(equity).any():
+        last = np.where(np.isnan(equity), 0, np.arange(len(equity)))
+        equity = equity[np.maximum.accumulate(last)]
+    n = len(equity)
+
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1
+    returns = returns[np.isfinite(returns)]
+    years = (times[-1] - times[0]) / YEAR_NS if n > 1 else 0
+    scale = np.sqrt(len(returns) / years) if years > 0 else 0.0  # 연율화: 실제 1년당 봉 수 (휴장 시간 반영)
+    mean = returns.mean() if len(returns) else 0.0
+    std = returns.std() if len(returns) else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else 0.0
+
+    idx = lttb(equity, points)
+    curve = np.empty(len(idx), dtype=CURVE_DTYPE)
+    curve["time"] = times[idx]
+    curve["equity"] = equity[idx]
+    return {
+        "max_drawdown": float(np.nanmin(drawdown) * 100) if n else 0.0,
+        "sharpe": float(mean / std * scale) if std > 0 else 0.0,
+        "sortino": float(mean / downside * scale) if downside > 0 else 0.0,
+        "exposure": held_bars / n * 100 if n else 0.0,
+        "avg_hold_hours": hold_ns / trades / 3.6e12 if trades else 0.0,
+        "equity_curve": curve,
+    }
+
+
+# --- LTTB (Largest-Triangle-Three-Buckets) 다운샘플: 남길 점의 위치 ---
+# 첫 점/끝 점은 그대로, 나머지는 points-2 개 버킷에서 (직전에 고른 점, 다음 버킷 평균) 과 만드는 삼각형이 가장 큰 점 하나씩
+# 각 버킷의 선택은 직전 버킷에서 고른 점에만 의존하므로, 버킷 폭이 작으면 "직전 버킷의 점마다 이 버킷 최선의 점" 표를
+# 한 번에 계산해 두고 앞에서부터 따라가기만 합니다 (결과는 순차 LTTB 와 같음).
+def lttb(y, points=CURVE_POINTS):
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)  # 버킷 b = [edges[b], edges[b + 1])
+    counts = np.diff(edges)
+    nb = len(counts)
+    avg_x = (edges[:-1] + edges[1:] - 1) / 2
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    cx = np.append(avg_x[1:], n - 1)  # 다음 버킷 평균 (마지막 버킷은 끝 점)
+    cy = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    width = int(counts.max())
+    if width > LTTB_MAX_WIDTH:
+        x = np.arange(n, dtype=np.float64)
+        a, ay = 0, y[0]
+        for b, (lo, hi) in enumerate(zip(edges[:-1].tolist(), edges[1:].tolist())):
+            area = np.abs((a - cx[b]) * (y[lo:hi] - ay) - (a - x[lo:hi]) * (cy[b] - ay))
+            a = lo + int(area.argmax())
+            ay = y[a]
+            out[b + 1] = a
+        return out
+
+    # (버킷, 직전 버킷의 점 i, 이 버킷의 점 j) 삼각형 넓이 -> 점 i 마다 최선의 j
+    ok = np.arange(width) < counts[:, None]
+    pos = np.where(ok, edges[:-1, None] + np.arange(width), edges[:-1, None])
+    px, py = pos.astype(np.float64), y[pos]
+    ax, ay = np.empty_like(px), np.empty_like(py)
+    ax[0], ay[0] = 0, y[0]  # 첫 버킷의 직전 점은 첫 점
+    ax[1:], ay[1:] = px[:-1], py[:-1]
+    ax, ay = ax[:, :, None], ay[:, :, None]
+    area = np.abs((ax - cx[:, None, None]) * (py[:, None, :] - ay) - (ax - px[:, None, :]) * (cy[:, None, None] - ay))
+    area[~np.broadcast_to(ok[:, None, :], area.shape)] = -1
+    best = area.argmax(axis=2).tolist()
+    chosen = []
+    j = 0
+    for row in best:
+        j = row[j]
+        chosen.append(j)
+    out[1:-1] = pos[np.arange(nb), chosen]
+    return out
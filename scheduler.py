@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import timeframes
+
+# --- 세션별 거래 시간 ---
+# 세션 타임존의 현지 시각 기준, 요일(월=0 ... 일=6) -> [(시작 분, 끝 분), ...]
+# None 이면 24시간/7일 거래 (휴장일은 고려하지 않음: 휴장일 봉은 수집해도 새 봉이 없을 뿐)
+TRADING_HOURS = {
+    "upbit_krw": None,
+    "crypto_utc": None,
+    # 미국 주식/ETF 정규장 09:30~16:00 ET
+    "us_equity": {d: [(570, 960)] for d in range(5)},
+    # CME Globex: 일 18:00 ~ 금 17:00 ET, 월~목 17:00~18:00 일일 휴장
+    "us_futures": {
+        6: [(1080, 1440)],
+        0: [(0, 1020), (1080, 1440)],
+        1: [(0, 1020), (1080, 1440)],
+        2: [(0, 1020), (1080, 1440)],
+        3: [(0, 1020), (1080, 1440)],
+        4: [(0, 1020)],
+    },
+}
+
+# 봉 마감 후 수집까지 대기 시간 (초): 거래소 집계 / 데이터 제공 지연 반영
+CLOSE_DELAY = {"upbit": 5, "yahoo": 60}
+DEFAULT_CLOSE_DELAY = 30
+
+# 다음 마감 봉을 찾을 때 살펴볼 최대 기간 (긴 휴장 대비)
+MAX_LOOKAHEAD = timedelta(days=10)
+
+
+def _open_windows(session, day):
+    # day(현지 날짜)의 거래 구간 목록 [(시작, 끝)] (naive 현지 시각)
+    hours = TRADING_HOURS.get(session)
+    midnight = datetime.combine(day, datetime.min.time())
+    if hours is None:
+        return [(midnight, midnight + timedelta(days=1))]
+    return [(midnight + timedelta(minutes=a), midnight + timedelta(minutes=b)) for a, b in hours.get(day.weekday(), [])]
+
+
+def is_open(session, local_time):
+    return any(a <= local_time < b for a, b in _open_windows(session, local_time.date()))
+
+
+def effective_close(session, bar_start, bar_end):
+    # 봉 [bar_start, bar_end) 안의 마지막 거래 시각 = 그 봉의 데이터가 확정되는 시각
+    # 봉 전체가 휴장이면 None (새 데이터가 없으므로 건너뜀)
+    last = None
+    day = bar_start.date()
+    while day <= (bar_end - timedelta(microseconds=1)).date():
+        for a, b in _open_windows(session, day):
+            lo, hi = max(a, bar_start), min(b, bar_end)
+            if lo < hi:
+                last = hi if last is None else max(last, hi)
+        day += timedelta(days=1)
+    return last
+
+
+def _bar_start(interval, session, local_time):
+    # local_time 을 포함하는 봉의 시작 시각 (timeframes.resample_ohlcv 와 같은 경계)
+    rules = timeframes.SESSION_RULES[session]
+    offset = pd.Timedelta(rules['day_offset'] if interval == "1일" else rules['intraday_offset']).to_pytimedelta()
+    step = timedelta(minutes=timeframes.INTERVAL_MINUTES[interval])
+    origin = datetime.combine(local_time.date(), datetime.min.time()) + offset
+    if origin > local_time:
+        origin -= timedelta(days=1)
+    return origin + (local_time - origin) // step * step
+
+
+def next_close(interval, session, now):
+    # now(UTC) 이후 처음으로 확정되는 봉의 마감 시각 (UTC)
+    tz = timeframes.SESSION_RULES[session]['tz']
+    now = pd.Timestamp(now).tz_convert("UTC") if pd.Timestamp(now).tzinfo else pd.Timestamp(now).tz_localize("UTC")
+    local_now = now.tz_convert(tz).tz_localize(None).to_pydatetime()
+    step = timedelta(minutes=timeframes.INTERVAL_MINUTES[interval])
+
+    start = _bar_start(interval, session, local_now)
+    limit = local_now + MAX_LOOKAHEAD
+    while start < limit:
+        close = effective_close(session, start, start + step)
+        if close is not None and close > local_now:
+            return pd.Timestamp(close).tz_localize(tz, ambiguous=True, nonexistent="shift_forward").tz_convert("UTC")
+        start += step
+    return None
+
+
+# --- 봉 마감 정렬 스케줄러 ---
+# (자산, 봉 길이) 마다 다음 봉 마감 + 지연 시각을 기억하고, 시각이 된 것만 돌려줍니다.
+class BarCloseScheduler:
+    def __init__(self, assets, intervals, delays=None):
+        self.assets = {a['ticker']: a for a in assets}
+        self.intervals = list(intervals)
+        self.delays = delays or CLOSE_DELAY
+        self.next_run = {}  # (ticker, interval) -> UTC Timestamp (None = 일정 없음)
+
+    def _schedule(self, asset, interval, now):
+        close = next_close(interval, timeframes.get_session(asset), now)
+        if close is None:
+            return None
+        return close + pd.Timedelta(seconds=self.delays.get(asset.get('source'), DEFAULT_CLOSE_DELAY))
+
+    # 처음 한 번은 모든 (자산, 봉 길이) 를 즉시 실행 대상으로
+    def prime(self, now):
+        for ticker in self.assets:
+            for interval in self.intervals:
+                self.next_run[(ticker, interval)] = pd.Timestamp(now)
+
+    def pop_due(self, now):
+        now = pd.Timestamp(now)
+        due = [key for key, at in self.next_run.items() if at is not None and at <= now]
+        for ticker, interval in due:
+            self.next_run[(ticker, interval)] = self._schedule(self.assets[ticker], interval, now)
+        return due
+
+    def seconds_until_next(self, now):
+        pending = [at for at in self.next_run.values() if at is not None]
+        if not pending:
+            return None
+        return max(0.0, (min(pending) - pd.Timestamp(now)).total_seconds())
+
+    # 실행 대상을 자산별 봉 길이 목록으로 묶음 -> [(asset, [interval, ...]), ...]
+    def group(self, due):
+        by_asset = {}
+        for ticker, interval in due:
+            by_asset.setdefault(ticker, []).append(interval)
+        return [(self.assets[t], [i for i in self.intervals if i in ivs]) for t, ivs in by_asset.items()]
@@ -0,0 +1,172 @@
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import perf
+
+# --- 분석 결과 스냅샷 ---
+# 워커가 분석을 끝낼 때마다 버전이 붙은 결과 파일을 원자적으로 게시하고,
+# 대시보드는 가장 최근 스냅샷만 읽습니다. (페이지 응답 시간이 분석 시간과 무관)
+#
+#   <root>/<channel>/results-<version>.pkl   결과 본문 (한 번 쓰면 변경 없음)
+#   <root>/<channel>/LATEST                  최신 버전 이름 (tmp + os.replace 로 교체)
+#   <root>/<channel>/HEARTBEAT               워커 생존 신호 (마지막 루프 시각)
+#   <root>/<channel>/REFRESH                 대시보드의 즉시 갱신 요청
+SNAPSHOT_DIR = os.environ.get("AUTO_TRADE_SNAPSHOTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots"))
+KEEP = 5             # 채널별로 남겨둘 스냅샷 수
+STALE_AFTER = 600    # 이 시간(초)이 지난 스냅샷은 백그라운드 재계산 대상
+WORKER_TIMEOUT = 120  # 하트비트가 이 시간(초) 안에 있으면 워커가 살아있는 것으로 봄
+
+
+def channel_name(offline=False):
+    return "offline" if offline else "live"
+
+
+def _atomic_write(path, data):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        self.cache = {}  # channel -> 마지막으로 읽은 스냅샷 (버전이 같으면 파일을 다시 읽지 않음)
+
+    def dir(self, channel):
+        return os.path.join(self.root, channel)
+
+    # --- 게시 ---
+    def publish(self, rows, channel="live", meta=None):
+        folder = self.dir(channel)
+        os.makedirs(folder, exist_ok=True)
+        now = datetime.now()
+        version = f"{now.strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}"
+        snapshot = {"version": version, "created": now.isoformat(), "created_ts": time.time(),
+                    "rows": rows, "meta": meta or {}}
+
+        _atomic_write(os.path.join(folder, f"results-{version}.pkl"), pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+        _atomic_write(os.path.join(folder, "LATEST"), version.encode())
+        self.prune(channel)
+        return version
+
+    def prune(self, channel, keep=KEEP):
+        folder = self.dir(channel)
+        files = sorted(f for f in os.listdir(folder) if f.startswith("results-") and f.endswith(".pkl"))
+        for name in files[:-keep]:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass  # 다른 프로세스가 먼저 지웠거나 아직 읽는 중 (다음 게시 때 다시 시도)
+
+    # --- 읽기 ---
+    def latest_version(self, channel="live"):
+        try:
+            with open(os.path.join(self.dir(channel), "LATEST"), "rb") as f:
+                return f.read().decode().strip() or None
+        except OSError:
+            return None
+
+    def load_latest(self, channel="live"):
+        version = self.latest_version(channel)
+        if version is None:
+            return None
+        with self.lock:
+            cached = self.cache.get(channel)
+            if cached is not None and cached["version"] == version:
+                return cached
+        try:
+            with open(os.path.join(self.dir(channel), f"results-{version}.pkl"), "rb") as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Snapshot read error {channel}/{version}: {e}")
+            return cached if cached is not None else None
+        with self.lock:
+            self.cache[channel] = snapshot
+        return snapshot
+
+    @staticmethod
+    def age(snapshot):
+        return time.time() - snapshot["created_ts"]
+
+    # --- 워커 <-> 대시보드 신호 ---
+    def heartbeat(self, channel="live"):
+        os.makedirs(self.dir(channel), exist_ok=True)
+        _atomic_write(os.path.join(self.dir(channel), "HEARTBEAT"), str(time.time()).encode())
+
+    def worker_alive(self, channel="live", timeout=WORKER_TIMEOUT):
+        try:
+            with open(os.path.join(self.dir(channel), "HEARTBEAT"), "rb") as f:
+                return time.time() - float(f.read().decode()) < timeout
+        except (OSError, ValueError):
+            return False
+
+    def request_refresh(self, channel="live"):
+        os.makedirs(self.dir(channel), exist_ok=True)
+        _atomic_write(os.path.join(self.dir(channel), "REFRESH"), str(time.time()).encode())
+
+    def take_refresh_request(self, channel="live"):
+        try:
+            os.remove(os.path.join(self.dir(channel), "REFRESH"))
+            return True
+        except OSError:
+            return False
+
+
+# --- 백그라운드 재계산 (stale-while-revalidate) ---
+# 워커 프로세스가 없을 때 대시보드 프로세스 안에서 채널당 하나의 스레드로만 재계산합니다.
+# compute(offline, recorder) -> rows (recorder: 이번 재계산의 perf.Recorder, 스냅샷 meta["perf"] 로 게시)
+# meta() -> 스냅샷 meta 에 덧붙일 dict (선택)
+class Revalidator:
+    def __init__(self, store, compute, meta=None):
+        self.store = store
+        self.compute = compute
+        self.meta = meta
+        self.lock = threading.Lock()
+        self.running = set()
+
+    def is_running(self, channel):
+        with self.lock:
+            return channel in self.running
+
+    def trigger(self, offline=False):
+        channel = channel_name(offline)
+        if self.store.worker_alive(channel):
+            # 워커가 있으면 갱신 요청만 남기고 워커가 처리
+            self.store.request_refresh(channel)
+            return False
+        with self.lock:
+            if channel in self.running:
+                return False
+            self.running.add(channel)
+        threading.Thread(target=self._run, args=(offline, channel), daemon=True).start()
+        return True
+
+    # 스냅샷이 아예 없을 때(첫 실행)만 사용: 이미 진행 중인 재계산이 있으면 끝나길 기다림
+    def run_now(self, offline=False, poll=0.5):
+        channel = channel_name(offline)
+        while True:
+            with self.lock:
+                if channel not in self.running:
+                    self.running.add(channel)
+                    break
+            time.sleep(poll)
+            if self.store.latest_version(channel) is not None:
+                return
+        self._run(offline, channel)
+
+    def _run(self, offline, channel):
+        try:
+            recorder = perf.Recorder()
+            rows = self.compute(offline, recorder)
+            self.store.publish(rows, channel, {"offline": offline, "source": "dashboard", "perf": recorder.export(),
+                                               **(self.meta() if self.meta else {})})
+        except Exception as e:
+            print(f"Background refresh failed ({channel}): {e}")
+        finally:
+            with self.lock:
+                self.running.discard(channel)
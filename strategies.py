@@ -0,0 +1,265 @@
+import re
+
+import numpy as np
+
+import backtest_engine
+import trade_records
+
+# --- 전략 명세 ---
+# 전략 = 지표 + 진입/청산 조건 + 추세 필터 + 손절. 명세는 한 번 컴파일되어 지표 배열 전체에 대한 NumPy 비교로 실행되고,
+# 포지션 진행은 backtest_engine.run_backtest 가 그대로 맡습니다.
+# 새 전략은 STRATEGY_SPECS 에 명세만 추가하면 분석/대시보드 결과와 파라미터 탐색(sweep.py)에 같이 나옵니다.
+#
+#   params     : 파라미터 이름 -> 기본값. 지표 길이 / 조건의 피연산자 / stop_loss 자리에 이름으로 씀
+#   indicators : 별칭 -> (지표 이름, 길이 또는 파라미터 이름)  (indicators.FrameIndicators 캐시 공유, "close" 는 종가)
+#   long_entry / short_entry / long_exit / short_exit : 조건 목록 (모두 참일 때 신호, 빈 목록이면 신호 없음)
+#   filter     : {"long": 조건 목록, "short": 조건 목록} 진입 조건에 AND (추세 필터)
+#   valid      : NaN 이 아니어야 하는 별칭 목록 (그 봉에서는 진입/청산/손절 판단 안 함)
+#   warmup     : 진입 판단을 시작할 봉 위치 (지표 안정화 대기, 지표 길이보다 짧으면 가장 긴 지표 길이)
+#   stop_loss  : 손절 비율 또는 파라미터 이름 (없으면 None)
+#   reasons    : 청산 사유 코드 {"stop": 손절, "long": 롱 신호 청산, "short": 숏 신호 청산} (없으면 사유 없음)
+#   signal     : 마지막 봉 현재 신호 [(표시 문자열, 조건 목록 또는 규칙 이름), ...] 처음 맞는 것, 없으면 default_signal
+#
+#   sweep      : 파라미터 탐색 범위 {파라미터 이름: 값 목록} (sweep.py 기본 격자)
+#   constraints: 탐색 조합이 만족해야 하는 파라미터 조건 목록 (예: 빠른 EMA < 느린 EMA)
+#
+# 조건 = (왼쪽, 비교, 오른쪽). 피연산자는 별칭 / "close" / 파라미터 / 숫자, "별칭[-k]" 는 k 봉 전 값 (처음 k 봉은 NaN)
+# NaN 과의 비교는 항상 거짓입니다.
+STRATEGY_SPECS = {
+    "RSI v1": {
+        "params": {"rsi_length": 14, "lower": 30, "upper": 70},
+        "indicators": {"RSI": ("rsi", "rsi_length")},
+        "long_entry": [("RSI", "<", "lower")],
+        "short_entry": [("RSI", ">", "upper")],
+        "long_exit": [("RSI", ">", "upper")],
+        "short_exit": [("RSI", "<", "lower")],
+        "warmup": 120,
+        "sweep": {"rsi_length": [7, 10, 14, 21, 28], "lower": [20, 25, 30, 35], "upper": [65, 70, 75, 80]},
+        "signal": [("Buy (OverSold)", "long_entry"), ("Sell (OverBought)", "short_entry")],
+        "default_signal": "Hold",
+    },
+    "RSI v2 (Smart)": {
+        "params": {"rsi_length": 14, "lower": 30, "upper": 70, "trend_ema": 200, "sl_pct": 0.02},
+        "indicators": {"RSI": ("rsi", "rsi_length"), "EMA_Trend": ("ema", "trend_ema")},  # EMA 200: 추세 필터용
+        # RSI 재진입(확증) 진입, 반대 과열 구간에서 익절
+        "long_entry": [("RSI[-1]", "<", "lower"), ("RSI", ">=", "lower")],
+        "short_entry": [("RSI[-1]", ">", "upper"), ("RSI", "<=", "upper")],
+        "long_exit": [("RSI", ">", "upper")],
+        "short_exit": [("RSI", "<", "lower")],
+        "filter": {"long": [("close", ">", "EMA_Trend")], "short": [("close", "<", "EMA_Trend")]},
+        "valid": ["RSI", "EMA_Trend"],
+        "warmup": 200,
+        "stop_loss": "sl_pct",
+        "reasons": {"stop": trade_records.REASON_STOP_LOSS,
+                    "long": trade_records.REASON_TAKE_PROFIT_LONG,
+                    "short": trade_records.REASON_TAKE_PROFIT_SHORT},
+        "signal": [("Buy (Trend Follow)", "long_entry"), ("Sell (Trend Follow)", "short_entry")],
+        "default_signal": "Hold",
+        "sweep": {"rsi_length": [7, 10, 14, 21], "lower": [20, 25, 30, 35], "upper": [65, 70, 75, 80],
+                  "trend_ema": [100, 150, 200], "sl_pct": [0.01, 0.02, 0.03, 0.05]},
+    },
+    "EMA Cross": {
+        "params": {"fast": 25, "slow": 120},
+        "indicators": {"EMA_Fast": ("ema", "fast"), "EMA_Slow": ("ema", "slow")},
+        # 골든크로스 롱 / 데드크로스 숏 (직전 봉 대비 교차)
+        "long_entry": [("EMA_Fast[-1]", "<=", "EMA_Slow[-1]"), ("EMA_Fast", ">", "EMA_Slow")],
+        "short_entry": [("EMA_Fast[-1]", ">=", "EMA_Slow[-1]"), ("EMA_Fast", "<", "EMA_Slow")],
+        "long_exit": "short_entry",
+        "short_exit": "long_entry",
+        "warmup": 120,
+        "signal": [("Hold (Bull)", [("EMA_Fast", ">", "EMA_Slow")])],
+        "default_signal": "Hold (Bear)",
+        "sweep": {"fast": [5, 10, 15, 20, 25, 30, 50], "slow": [60, 100, 120, 150, 200]},
+        "constraints": [("fast", "<", "slow")],
+    },
+}
+
+RULES = ["long_entry", "short_entry", "long_exit", "short_exit"]
+COMPARE = {"<": np.less, ">": np.greater, "<=": np.less_equal, ">=": np.greater_equal, "==": np.equal}
+LAGGED = re.compile(r"^(\w+)\[-(\d+)\]$")
+
+
+def _shift(values, lag):
+    if lag == 0:
+        return values
+    out = np.full(values.shape, np.nan)
+    out[lag:] = values[:-lag]
+    return out
+
+
+# 피연산자 -> ((values, params) 에서 배열/값을 꺼내는 함수, 필요한 과거 봉 수)
+def _operand(token, names, params):
+    if not isinstance(token, str):
+        value = float(token)
+        return (lambda values, params: value), 0
+    if token in params:
+        return (lambda values, params: params[token]), 0
+    m = LAGGED.match(token)
+    name, lag = (m.group(1), int(m.group(2))) if m else (token, 0)
+    if name not in names:
+        raise ValueError(f"unknown operand: {token}")
+    return (lambda values, params: _shift(values[name], lag)), lag
+
+
+# 조건 목록 -> ((values, params) -> bool 배열, 필요한 과거 봉 수)
+def _compile_conditions(conditions, names, params):
+    parts = []
+    depth = 0
+    for left, op, right in conditions:
+        if op not in COMPARE:
+            raise ValueError(f"unknown comparison: {op}")
+        lhs, lag_l = _operand(left, names, params)
+        rhs, lag_r = _operand(right, names, params)
+        parts.append((lhs, COMPARE[op], rhs))
+        depth = max(depth, lag_l, lag_r)
+
+    def evaluate(values, params):
+        out = np.full(np.shape(values["close"]), bool(parts))
+        for lhs, compare, rhs in parts:
+            out = out & compare(lhs(values, params), rhs(values, params))
+        return out
+    return evaluate, depth
+
+
+# 길이 배열 -> (봉 수 x 조합 수) 지표 배열, 길이가 같은 조합끼리는 같은 지표 배열(캐시)을 공유
+def _stack(ind, name, lengths):
+    unique = sorted(set(lengths.tolist()))
+    cols = {length: i for i, length in enumerate(unique)}
+    ind.cache.prefetch([ind], name, unique)  # 길이별 열을 커널 한 번으로
+    mat = np.column_stack([ind.get(name, length=length) for length in unique])
+    return mat[:, [cols[length] for length in lengths.tolist()]]
+
+
+class Strategy:
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        self.params = dict(spec.get("params", {}))
+        self.sweep = dict(spec.get("sweep", {}))
+        self.constraints = list(spec.get("constraints", []))
+        self.valid = list(spec.get("valid", []))
+        self.reasons = spec.get("reasons")
+        self.default_signal = spec.get("default_signal", "Hold")
+        for token in [*self.sweep, *(t for l, _, r in self.constraints for t in (l, r) if isinstance(t, str))]:
+            if token not in self.params:
+                raise ValueError(f"unknown parameter: {token}")
+        # 기본 파라미터로 정한 지표 (별칭 -> (지표 이름, 길이)) / 안정화 대기 / 손절
+        self.indicators = {alias: (name, self.params.get(length, length))
+                           for alias, (name, length) in spec["indicators"].items()}
+        self.warmup = self.warmup_for(self.params)
+        self.stop_loss = self.stop_loss_for(self.params)
+        names = {"close", *self.indicators}
+        params = self.params
+
+        # 규칙 이름을 값으로 주면 그 규칙과 같은 조건 ("long_exit": "short_entry")
+        filters = spec.get("filter", {})
+        conditions = {}
+        for rule in RULES:
+            rule_spec = spec.get(rule, [])
+            conditions[rule] = list(spec[rule_spec] if isinstance(rule_spec, str) else rule_spec)
+        for side in ("long", "short"):
+            if conditions[f"{side}_entry"]:
+                conditions[f"{side}_entry"] += filters.get(side, [])
+        # 조건이 같은 규칙은 한 번만 계산 (EMA Cross: 롱 청산 = 숏 진입)
+        compiled = {}
+        for conds in conditions.values():
+            compiled.setdefault(tuple(conds), _compile_conditions(conds, names, params))
+        self.rules = {rule: compiled[tuple(conds)] for rule, conds in conditions.items()}
+
+        self.signal_rules = []
+        for label, cond in spec.get("signal", []):
+            self.signal_rules.append((label, self.rules[cond] if isinstance(cond, str) else _compile_conditions(cond, names, params)))
+        self.depth = max([depth for _, depth in self.rules.values()] + [depth for _, (_, depth) in self.signal_rules])
+
+    # --- 파라미터 ---
+    # params: 기본값 대신 쓸 값 {이름: 값}. 값이 (조합 수,) 배열이면 조합마다 한 열씩 (sweep.py)
+    def param_values(self, params=None):
+        for name in params or {}:
+            if name not in self.params:
+                raise ValueError(f"unknown parameter: {name}")
+        return {**self.params, **(params or {})}
+
+    def _length(self, length, params):
+        return params[length] if isinstance(length, str) else length
+
+    # 진입 판단 시작 봉: 명세의 warmup 과 가장 긴 지표 길이 중 큰 값 (조합별 배열 가능)
+    def warmup_for(self, params=None):
+        params = self.param_values(params)
+        warmup = self.spec.get("warmup", 0)
+        for _, length in self.spec["indicators"].values():
+            warmup = np.maximum(warmup, self._length(length, params))
+        return int(warmup) if np.ndim(warmup) == 0 else warmup
+
+    def stop_loss_for(self, params=None):
+        stop_loss = self.spec.get("stop_loss")
+        return self.param_values(params)[stop_loss] if isinstance(stop_loss, str) else stop_loss
+
+    # 파라미터 조합이 명세의 constraints 를 모두 만족하는지 (탐색 조합 거르기)
+    def accepts(self, params):
+        params = self.param_values(params)
+        value = lambda token: params[token] if isinstance(token, str) else token
+        return all(COMPARE[op](value(left), value(right)) for left, op, right in self.constraints)
+
+    # 지표 배열 (이름 -> 배열), ind: indicators.FrameIndicators
+    # 파라미터에 배열이 있으면 모든 값이 (봉 수, 조합 수) 또는 (봉 수, 1) 2차원 (종가 포함)
+    def values(self, ind, params=None):
+        params = self.param_values(params)
+        wide = any(np.ndim(value) for value in params.values())
+        values = {'close': ind.close[:, None] if wide else ind.close}
+        for alias, (name, length) in self.spec["indicators"].items():
+            length = self._length(length, params)
+            if np.ndim(length):
+                values[alias] = _stack(ind, name, np.asarray(length))
+            else:
+                values[alias] = ind.get(name, length=length)
+                if wide:
+                    values[alias] = values[alias][:, None]
+        return values
+
+    # --- 신호 배열 (backtest_engine.run_backtest 입력) ---
+    # params: values 를 만들 때 쓴 파라미터 (조건의 파라미터 피연산자)
+    def signals(self, values, params=None):
+        params = self.param_values(params)
+        done = {}
+        out = {}
+        for rule, (evaluate, _) in self.rules.items():
+            if evaluate not in done:
+                done[evaluate] = evaluate(values, params)
+            out[rule] = done[evaluate]
+        if self.valid:
+            out["valid"] = ~np.logical_or.reduce([np.isnan(values[alias]) for alias in self.valid])
+        return out
+
+    # 엔진 청산 사유 -> 거래 기록 사유 코드 (trade_records.REASON_LABELS)
+    def reason_codes(self, side, reason):
+        if not self.reasons:
+            return trade_records.REASON_NONE
+        return np.where(reason == backtest_engine.REASON_STOP, self.reasons["stop"],
+                        np.where(side == backtest_engine.LONG, self.reasons["long"], self.reasons["short"]))
+
+    # --- 현재 신호 (마지막 봉 기준): 필요한 마지막 몇 봉만 잘라서 같은 조건으로 평가 ---
+    # params: values 를 만들 때 쓴 파라미터 (기본값 명세의 params)
+    def current_signal(self, values, params=None):
+        params = self.param_values(params)
+        tail = {name: np.asarray(arr)[-(self.depth + 1):] for name, arr in values.items()}
+        for label, (evaluate, _) in self.signal_rules:
+            if evaluate(tail, params)[-1]:
+                return label
+        return self.default_signal
+
+
+def compile_strategies(specs):
+    return {name: Strategy(name, spec) for name, spec in specs.items()}
+
+
+# 컴파일된 전략 (이름 -> Strategy), 결과 행의 strategy 값과 같은 이름
+STRATEGIES = compile_strategies(STRATEGY_SPECS)
+
+
+# 전략들이 쓰는 지표 (지표 이름 -> 길이 목록), 프레임 단위 일괄 계산(prefetch)용
+def indicator_lengths(names=None):
+    lengths = {}
+    for name in names or STRATEGIES:
+        for indicator, length in STRATEGIES[name].indicators.values():
+            lengths.setdefault(indicator, set()).add(length)
+    return {indicator: sorted(values) for indicator, values in lengths.items()}
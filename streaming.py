@@ -0,0 +1,433 @@
+import math
+
+import numpy as np
+
+import backtest_engine
+import kernels
+import risk_metrics
+import strategies
+import trade_records
+
+# --- 스트리밍 전략 ---
+# 봉이 하나 들어올 때마다 지표 상태(Wilder RSI 평균, EMA 값)와 포지션/잔고를 O(1)로 갱신합니다.
+# 지표 점화식은 pandas ewm (pandas_ta 가 사용하는 경로) 과 같은 순서로 계산하고, 전략은 strategies.py 명세를 그대로 쓰므로
+# 같은 봉 시퀀스에 대해 배치 백테스트(batch_analyzer.run_strategy)와 봉 단위로 같은 결과를 냅니다.
+
+NAN = float("nan")
+
+
+# --- pandas ewm(...).mean() 점화식 (ignore_na=False) ---
+class EwmState:
+    def __init__(self, com, adjust, min_periods=0):
+        alpha = self.alpha = 1. / (1. + com)
+        self.factor = 1. - alpha
+        self.new_wt = 1. if adjust else alpha
+        self.adjust = adjust
+        self.minp = max(int(min_periods), 1)
+        self.started = False
+        self.weighted = NAN
+        self.old_wt = 1.
+        self.nobs = 0
+
+    def update(self, cur):
+        is_observation = cur == cur
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            weighted = self.weighted
+            if weighted == weighted:
+                self.old_wt *= self.factor
+                if is_observation:
+                    if weighted != cur:
+                        weighted = self.old_wt * weighted + self.new_wt * cur
+                        weighted /= (self.old_wt + self.new_wt)
+                    self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.
+            elif is_observation:
+                weighted = cur
+            self.weighted = weighted
+        return self.weighted if self.nobs >= self.minp else NAN
+
+    # values 전체를 update 한 것과 같은 상태를 한 번에 (kernels.ewm_mean 으로 가중 평균)
+    # adjust=True 의 old_wt 는 관측 봉마다 f^(지난 봉 수) 의 합, adjust=False 는 마지막 관측 이후 f^(지난 봉 수)
+    def fill(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        observed = np.flatnonzero(~np.isnan(values))
+        self.started = len(values) > 0
+        self.nobs = len(observed)
+        if not len(observed):
+            self.weighted, self.old_wt = NAN, 1.
+            return
+        self.weighted = float(kernels.ewm_mean(values, self.alpha, self.adjust)[-1])
+        age = len(values) - 1 - observed
+        self.old_wt = float(np.sum(self.factor ** age)) if self.adjust else self.factor ** int(age[-1])
+
+    def save(self):
+        return (self.started, self.weighted, self.old_wt, self.nobs)
+
+    def restore(self, state):
+        self.started, self.weighted, self.old_wt, self.nobs = state
+
+
+# --- pandas_ta.rsi (Wilder: rma = ewm(alpha=1/length, min_periods=length)) ---
+class RSIState:
+    def __init__(self, length=14):
+        com = 1. / (1. / length) - 1.
+        self.pos = EwmState(com, True, length)
+        self.neg = EwmState(com, True, length)
+        self.prev_close = None
+
+    def update(self, close):
+        diff = NAN if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        positive = 0. if diff < 0 else diff
+        negative = 0. if diff > 0 else diff
+        pa = self.pos.update(positive)
+        na = self.neg.update(negative)
+        denom = pa + abs(na)
+        if denom == 0:
+            return NAN
+        return 100. * pa / denom
+
+    def fill(self, close):
+        diff = np.diff(close, prepend=NAN)
+        self.pos.fill(np.where(diff < 0, 0., diff))
+        self.neg.fill(np.where(diff > 0, 0., diff))
+        self.prev_close = float(close[-1]) if len(close) else None
+
+    def save(self):
+        return (self.pos.save(), self.neg.save(), self.prev_close)
+
+    def restore(self, state):
+        pos, neg, self.prev_close = state
+        self.pos.restore(pos)
+        self.neg.restore(neg)
+
+
+# --- pandas_ta.ema (첫 length 봉 SMA 로 시작, ewm(span=length, adjust=False)) ---
+class EMAState:
+    def __init__(self, length):
+        self.length = length
+        self.ewm = EwmState((length - 1) / 2., False)
+        self.seed = []
+        self.count = 0
+
+    def update(self, close):
+        if self.count < self.length:
+            self.seed.append(close)
+            if self.count < self.length - 1:
+                value = NAN
+            else:
+                value = np.nansum(np.asarray(self.seed, dtype=np.float64)) / self.length
+        else:
+            value = close
+        self.count += 1
+        return self.ewm.update(value)
+
+    def fill(self, close):
+        length = self.length
+        values = np.array(close, dtype=np.float64)
+        self.seed = values[:length].tolist()
+        self.count = len(values)
+        values[:length - 1] = NAN
+        if len(values) >= length:
+            values[length - 1] = np.nansum(self.seed) / length
+        self.ewm.fill(values)
+
+    def save(self):
+        return (self.ewm.save(), len(self.seed), self.count)
+
+    def restore(self, state):
+        ewm, seed_len, self.count = state
+        self.ewm.restore(ewm)
+        del self.seed[seed_len:]
+
+
+# --- 공통 전략 상태 ---
+class StreamingStrategy:
+    name = ""
+    warmup = 0
+    min_bars = 200
+    initial_balance = 1000000
+
+    def __init__(self):
+        self.bars = 0
+        self.first_time = None
+        self.last_time = None
+        self.last_close = NAN
+        self.prev_close = NAN
+        self.position = None
+        self.entry_price = 0
+        self.balance = self.initial_balance
+        self.trades = trade_records.empty_trades(16)  # 미리 잡아둔 거래 기록 버퍼 (가득 차면 두 배로)
+        self.n_trades = 0
+        self.tz = None
+        self.wins = 0
+        self.entry_time = 0
+        self.hold_ns = 0      # 청산된 거래 보유 시간 합계
+        self.held_bars = 0    # 봉 마감 시 포지션 보유 중이던 봉 수
+        self.times = np.empty(256, dtype=np.int64)  # 봉 단위 시각 / 평가금액 (위험 지표용, 가득 차면 두 배로)
+        self.equity = np.empty(256, dtype=np.float64)
+        self._snapshot = None
+
+    # 지표 상태 (하위 클래스)
+    def _save_indicators(self):
+        return ()
+
+    def _restore_indicators(self, state):
+        pass
+
+    def _save(self):
+        return (self._save_indicators(), self.bars, self.last_time, self.last_close, self.prev_close,
+                self.position, self.entry_price, self.balance, self.n_trades, self.wins,
+                self.entry_time, self.hold_ns, self.held_bars)
+
+    def _restore(self, state):
+        (indicators, self.bars, self.last_time, self.last_close, self.prev_close,
+         self.position, self.entry_price, self.balance, self.n_trades, self.wins,
+         self.entry_time, self.hold_ns, self.held_bars) = state
+        self._restore_indicators(indicators)
+
+    # 새 봉 1개 반영. 마지막 봉과 같은 시각이면 (진행 중이던 봉 갱신) 직전 상태로 되돌린 뒤 다시 반영합니다.
+    # snapshot=False 는 뒤에 봉이 더 이어질 때 (feed) 되돌리기용 상태 저장을 생략합니다.
+    def update(self, time, close, snapshot=True):
+        if self.last_time is not None and time == self.last_time:
+            self._restore(self._snapshot)
+        elif self.last_time is not None and time < self.last_time:
+            raise ValueError(f"out-of-order bar: {time} < {self.last_time}")
+        elif snapshot:
+            self._snapshot = self._save()
+
+        if self.first_time is None:
+            self.first_time = time
+            self.tz = str(time.tz) if getattr(time, "tz", None) is not None else None
+        self.prev_close = self.last_close
+        was_open, n_trades = self.position is not None, self.n_trades
+        self._step(self.bars, time, close)
+        self._record_equity(time, close, was_open and self.n_trades == n_trades)
+        self.last_time = time
+        self.last_close = close
+        self.bars += 1
+
+    def feed(self, df):
+        last = len(df) - 1
+        for i, (time, close) in enumerate(zip(df.index, df['close'].to_numpy(dtype=np.float64).tolist())):
+            self.update(time, close, snapshot=(i == last))
+        return self
+
+    # df 가 이 스트림이 본 봉 시퀀스의 연장인지 (앞부분이 그대로인지) 확인 -> 이어서 반영할 시작 위치
+    def resume_position(self, df):
+        if self.last_time is None or len(df) == 0 or df.index[0] != self.first_time:
+            return None
+        pos = int(df.index.searchsorted(self.last_time))
+        if pos != self.bars - 1 or pos >= len(df) or df.index[pos] != self.last_time:
+            return None
+        if pos > 0:
+            prev = df['close'].iloc[pos - 1]
+            if not (prev == self.prev_close or (math.isnan(prev) and math.isnan(self.prev_close))):
+                return None
+        return pos
+
+    # 봉 마감 평가금액 기록 (batch 경로의 risk_metrics.equity_curve 와 같은 식)
+    def _record_equity(self, time, close, still_open):
+        i = self.bars
+        if i == len(self.equity):
+            self.times = np.concatenate((self.times, np.empty(i, dtype=np.int64)))
+            self.equity = np.concatenate((self.equity, np.empty(i, dtype=np.float64)))
+        self.times[i] = time.value
+        if self.position is None:
+            self.equity[i] = self.balance
+            return
+        if not still_open:
+            self.entry_time = time.value  # 이 봉에서 진입 (청산 후 재진입 포함)
+        self.held_bars += 1
+        if self.position == 'long':
+            self.equity[i] = self.balance * (1 + (close - self.entry_price) / self.entry_price)
+        else:
+            self.equity[i] = self.balance * (1 + (self.entry_price - close) / self.entry_price)
+
+    def _close_position(self, time, pnl, reason=trade_records.REASON_NONE):
+        self.hold_ns += time.value - self.entry_time
+        self.balance *= (1 + pnl)
+        if self.n_trades == len(self.trades):
+            self.trades = np.concatenate((self.trades, trade_records.empty_trades(len(self.trades))))
+        side = 1 if self.position == 'long' else -1
+        self.trades[self.n_trades] = (time.value, pnl, side, reason)
+        self.n_trades += 1
+        if pnl > 0:
+            self.wins += 1
+        self.position = None
+
+    def current_signal(self):
+        return "Hold"
+
+    def result(self):
+        if self.bars < self.min_bars:
+            return None
+        total_return = (self.balance - self.initial_balance) / self.initial_balance * 100
+        win_rate = (self.wins / self.n_trades * 100) if self.n_trades else 0
+        return {
+            "return": total_return,
+            "win_rate": win_rate,
+            "trades": self.n_trades,
+            "trade_history": self.trades[:self.n_trades].copy(),
+            "tz": self.tz,
+            "current_signal": self.current_signal(),
+            "last_price": self.last_close,
+            **risk_metrics.summarize(self.times[:self.bars], self.equity[:self.bars], self.held_bars, self.hold_ns, self.n_trades),
+        }
+
+
+# --- 명세 기반 스트리밍 전략 ---
+# strategies.STRATEGIES[name] 명세(파라미터 / 지표 / 조건 / 손절 / 사유 코드)로 봉 단위 진행을 재현합니다.
+# 조건은 배치와 같은 컴파일된 규칙을 지표별 최근 depth+1 봉 값에 적용하고,
+# 포지션 진행은 backtest_engine.resolve_positions 와 같은 순서 (청산: 손절 우선 -> 신호, 진입: warmup 이후, 청산 봉 재진입 허용)
+INDICATOR_STATES = {"rsi": RSIState, "ema": EMAState}
+
+
+# 전략이 쓰는 지표가 모두 상태 기반 계산을 지원하면 스트리밍 가능
+def streamable(strategy):
+    program = strategies.STRATEGIES.get(strategy)
+    return program is not None and all(name in INDICATOR_STATES for name, _ in program.indicators.values())
+
+
+class SpecStream(StreamingStrategy):
+    def __init__(self, name, params=None):
+        super().__init__()
+        program = self.program = strategies.STRATEGIES[name]
+        self.name = name
+        self.params = program.param_values(params)
+        self.warmup = program.warmup_for(self.params)
+        self.sl_pct = program.stop_loss_for(self.params)
+        self.states = {alias: INDICATOR_STATES[ind](self.params.get(length, length))
+                       for alias, (ind, length) in program.spec["indicators"].items()}
+        # 별칭 / 종가 -> 최근 depth+1 봉 값 (처음 봉들은 NaN, 조건의 "별칭[-k]" 와 같은 채움)
+        self.tail = {alias: np.full(program.depth + 1, NAN) for alias in ("close", *self.states)}
+
+    # 처음 보는 df: 마지막 봉 직전까지는 배치 백테스트 한 번(지표 배열 + run_backtest)으로 상태를 채우고
+    # 마지막 봉만 update (진행 중인 봉이 다시 들어오면 되돌릴 수 있도록). 봉 단위 파이썬 루프 없음
+    # ind: indicators.FrameIndicators (df 의 지표 배열)
+    def fill(self, df, ind):
+        n = len(df) - 1
+        if n < 1:
+            return self.feed(df)
+        program = self.program
+        values = program.values(ind, self.params)
+        close = np.asarray(values["close"], dtype=np.float64)
+        bt = backtest_engine.run_backtest(close, program.signals(values, self.params), start=self.warmup, stop=n, sl_pct=self.sl_pct)
+        times = trade_records.index_times(df.index)
+
+        # 거래 기록 / 잔고 / 봉 단위 평가금액 (배치 경로와 같은 계산)
+        records = trade_records.from_exits(times, bt["exit_idx"], bt["pnl"], bt["side"], program.reason_codes(bt["side"], bt["reason"]))
+        self.trades = np.concatenate((records, trade_records.empty_trades(max(16, len(records)))))
+        self.n_trades = len(records)
+        self.wins = int((bt["pnl"] > 0).sum())
+        self.balance = backtest_engine.compound_balance(self.initial_balance, bt["pnl"])
+        equity, self.held_bars, self.hold_ns = risk_metrics.equity_curve(times[:n], close[:n], bt, self.initial_balance)
+        self.times = np.concatenate((times[:n], np.empty(max(256, n), dtype=np.int64)))
+        self.equity = np.concatenate((equity, np.empty(max(256, n), dtype=np.float64)))
+        if bt["open_side"] != backtest_engine.FLAT:
+            e = bt["open_entry_idx"]
+            self.position = 'long' if bt["open_side"] == backtest_engine.LONG else 'short'
+            self.entry_price = float(close[e])
+            self.entry_time = int(times[e])
+
+        # 지표 상태 / 최근 depth+1 봉 값
+        for state in self.states.values():
+            state.fill(close[:n])
+        for alias, tail in self.tail.items():
+            recent = np.asarray(values[alias], dtype=np.float64)[max(0, n - len(tail)):n]
+            tail[:] = NAN
+            tail[len(tail) - len(recent):] = recent
+
+        self.bars = n
+        self.first_time = df.index[0]
+        self.last_time = df.index[n - 1]
+        self.last_close = float(close[n - 1])
+        self.prev_close = float(close[n - 2]) if n > 1 else NAN
+        self.tz = trade_records.index_tz(df.index)
+        return self.feed(df.iloc[n:])
+
+    # 워커 프로세스에서 채운 스트림을 부모로 넘길 때: 컴파일된 전략(클로저)은 이름으로 다시 찾음
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["program"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.program = strategies.STRATEGIES[self.name]
+
+    def _save_indicators(self):
+        return ({alias: state.save() for alias, state in self.states.items()},
+                {alias: values.copy() for alias, values in self.tail.items()})
+
+    def _restore_indicators(self, state):
+        states, tail = state
+        for alias, saved in states.items():
+            self.states[alias].restore(saved)
+        self.tail = tail
+
+    def _push(self, alias, value):
+        values = self.tail[alias]
+        values[:-1] = values[1:]
+        values[-1] = value
+
+    def _step(self, i, time, close):
+        self._push("close", close)
+        for alias, state in self.states.items():
+            self._push(alias, state.update(close))
+        signals = {rule: bool(values[-1]) for rule, values in self.program.signals(self.tail, self.params).items()}
+        if not signals.get("valid", True):
+            return
+
+        # 1. 청산 (손절 우선, 진입 다음 봉부터)
+        if self.position is not None:
+            long = self.position == 'long'
+            pnl = (close - self.entry_price if long else self.entry_price - close) / self.entry_price
+            if self.sl_pct is not None and (close <= self.entry_price * (1 - self.sl_pct) if long
+                                            else close >= self.entry_price * (1 + self.sl_pct)):
+                self._close_position(time, pnl, self._reason(backtest_engine.REASON_STOP))
+            elif signals["long_exit" if long else "short_exit"]:
+                self._close_position(time, pnl, self._reason(backtest_engine.REASON_SIGNAL))
+
+        # 2. 진입 (청산한 봉에서 바로 재진입 가능)
+        if self.position is None and i >= self.warmup:
+            if signals["long_entry"]:
+                self.position = 'long'; self.entry_price = close
+            elif signals["short_entry"]:
+                self.position = 'short'; self.entry_price = close
+
+    def _reason(self, reason):
+        side = backtest_engine.LONG if self.position == 'long' else backtest_engine.SHORT
+        return int(self.program.reason_codes(side, reason))
+
+    def current_signal(self):
+        return self.program.current_signal(self.tail, self.params)
+
+
+# --- (ticker, interval, 전략) 별 스트림 보관소 ---
+class StreamRegistry:
+    def __init__(self):
+        self.streams = {}
+
+    # key 의 스트림이 df 의 새 봉만 이어서 반영할 수 있는지
+    def warm(self, key, df):
+        stream = self.streams.get(key)
+        return stream is not None and stream.resume_position(df) is not None
+
+    # df 를 반영한 스트림 반환: 이어지는 데이터면 새 봉만, 아니면 배치 한 번으로 다시 구성 (SpecStream.fill)
+    # ind: df 의 indicators.FrameIndicators (다시 구성할 때만 사용, 없으면 봉 단위로 처음부터)
+    def sync(self, key, strategy, df, ind=None):
+        stream = self.streams.get(key)
+        pos = stream.resume_position(df) if stream is not None else None
+        if pos is not None:
+            stream.feed(df.iloc[pos:])
+        elif ind is not None:
+            stream = SpecStream(strategy).fill(df, ind)
+        else:
+            stream = SpecStream(strategy).feed(df)
+        self.streams[key] = stream
+        return stream
@@ -0,0 +1,93 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import backtest_engine
+import indicators
+import strategies
+
+# --- 기본 탐색 범위: 전략 명세의 "sweep" (strategies.STRATEGY_SPECS, 전략 이름은 결과 행의 strategy 값과 동일) ---
+# 명세에 sweep 범위를 적은 전략은 모두 탐색 대상. 조합 거르기(constraints) / 지표 안정화 대기 / 손절도 명세에서 가져옵니다.
+SWEEP_GRIDS = {name: program.sweep for name, program in strategies.STRATEGIES.items() if program.sweep}
+
+# (봉 수 x 조합 수) 신호 배열이 이 크기를 넘지 않도록 조합을 나눠서 처리
+MAX_CELLS = 20_000_000
+
+
+def expand_grid(grid, program=None):
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    if program is not None:
+        combos = [c for c in combos if program.accepts(c)]
+    return combos
+
+
+# 조합 목록 -> (봉 수 x 조합 수) 신호 배열, 조합별 시작 봉, 조합별 손절 비율
+def _signals(program, ind, combos):
+    params = {key: np.array([c[key] for c in combos]) for key in combos[0]}
+    values = program.values(ind, params)
+    shape = (len(ind.close), len(combos))
+    signals = {rule: np.broadcast_to(arr, shape) for rule, arr in program.signals(values, params).items()}
+    sl_pct = program.stop_loss_for(params)
+    start = np.broadcast_to(program.warmup_for(params), (len(combos),))
+    return signals, start, np.inf if sl_pct is None else sl_pct
+
+
+# --- 프레임 1개에 대해 전략의 모든 파라미터 조합 평가 ---
+def sweep_frame(df, strategy, grid=None, ind=None):
+    if df is None or df.empty or len(df) < 200:
+        return pd.DataFrame()
+    program = strategies.STRATEGIES[strategy]
+    ind = ind or indicators.INDICATOR_CACHE.frame(df)
+    combos = expand_grid(grid or program.sweep, program)
+    if not combos:
+        return pd.DataFrame()
+
+    chunk = max(1, MAX_CELLS // len(df))
+    parts = []
+    for lo in range(0, len(combos), chunk):
+        part = combos[lo:lo + chunk]
+        signals, start, sl_pct = _signals(program, ind, part)
+        res = backtest_engine.resolve_positions_batch(
+            ind.close,
+            signals["long_entry"], signals["short_entry"],
+            signals["long_exit"], signals["short_exit"],
+            start=start, sl_pct=sl_pct, valid=signals.get("valid"),
+        )
+        out = pd.DataFrame(part)
+        out["return"] = (res["balance"] - 1000000) / 1000000 * 100
+        out["win_rate"] = np.where(res["trades"] > 0, res["wins"] / np.maximum(res["trades"], 1) * 100, 0.0)
+        out["trades"] = res["trades"]
+        parts.append(out)
+
+    out = pd.concat(parts, ignore_index=True)
+    param_cols = list(combos[0])
+    out["params"] = [", ".join(f"{k}={v}" for k, v in row.items()) for row in out[param_cols].to_dict("records")]
+    out.insert(0, "strategy", strategy)
+    return out
+
+
+# --- 여러 프레임 결과를 순위표로 ---
+# frames: (asset dict, interval, df) 반복자
+def run_sweep(frames, strategies=None, grids=None, top=None):
+    strategies = strategies or list(SWEEP_GRIDS)
+    grids = grids or {}
+    tables = []
+    for asset, interval, df in frames:
+        ind = indicators.INDICATOR_CACHE.frame(df, asset['ticker'], interval)
+        for strategy in strategies:
+            table = sweep_frame(df, strategy, grids.get(strategy), ind)
+            if table.empty:
+                continue
+            table.insert(0, "interval", interval)
+            table.insert(0, "category", asset.get('category', '기타'))
+            table.insert(0, "ticker", asset['ticker'])
+            table.insert(0, "asset", asset['name'])
+            tables.append(table)
+
+    if not tables:
+        return pd.DataFrame()
+    result = pd.concat(tables, ignore_index=True).sort_values("return", ascending=False, ignore_index=True)
+    result.insert(0, "rank", np.arange(1, len(result) + 1))
+    return result.head(top) if top else result
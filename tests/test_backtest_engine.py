@@ -0,0 +1,125 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backtest_engine
+from backtest_engine import FLAT, LONG, SHORT, REASON_SIGNAL, REASON_STOP
+
+
+# 봉 단위 기준 구현: 유효한 봉마다 1. 청산 (손절 우선, 진입 다음 봉부터) 2. 진입 (청산한 봉에서도)
+def reference(close, le, se, lx, sx, start=0, stop=None, sl_pct=None, valid=None):
+    n = len(close) if stop is None else min(stop, len(close))
+    valid = np.ones(len(close), dtype=bool) if valid is None else valid
+    trades = []
+    side, entry = FLAT, -1
+    for i in range(start, n):
+        if not valid[i]:
+            continue
+        if side != FLAT:
+            price = close[entry]
+            if sl_pct is not None and (close[i] <= price * (1 - sl_pct) if side == LONG else close[i] >= price * (1 + sl_pct)):
+                reason = REASON_STOP
+            elif lx[i] if side == LONG else sx[i]:
+                reason = REASON_SIGNAL
+            else:
+                reason = None
+            if reason is not None:
+                pnl = (close[i] - price if side == LONG else price - close[i]) / price
+                trades.append((entry, i, side, reason, pnl))
+                side = FLAT
+        if side == FLAT and (le[i] or se[i]):
+            side, entry = (LONG if le[i] else SHORT), i
+    return trades, side, (entry if side != FLAT else -1)
+
+
+def assert_matches(close, le, se, lx, sx, **kwargs):
+    bt = backtest_engine.resolve_positions(close, le, se, lx, sx, **kwargs)
+    trades, side, entry = reference(close, le, se, lx, sx, **kwargs)
+    assert bt["entry_idx"].tolist() == [t[0] for t in trades]
+    assert bt["exit_idx"].tolist() == [t[1] for t in trades]
+    assert bt["side"].tolist() == [t[2] for t in trades]
+    assert bt["reason"].tolist() == [t[3] for t in trades]
+    assert np.allclose(bt["pnl"], [t[4] for t in trades], equal_nan=True)
+    assert (bt["open_side"], bt["open_entry_idx"]) == (side, entry)
+    return bt
+
+
+def random_case(seed, bars=400, rate=0.05):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    le, se, lx, sx = (rng.random((4, bars)) < rate)
+    valid = rng.random(bars) > 0.1
+    valid[:30] = False  # 지표 안정화 전 (NaN 구간)
+    return close, le, se, lx, sx, valid
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("sl_pct", [None, 0.01, 0.03])
+def test_matches_reference_loop(seed, sl_pct):
+    close, le, se, lx, sx, valid = random_case(seed)
+    assert_matches(close, le, se, lx, sx, sl_pct=sl_pct, valid=valid)
+    assert_matches(close, le, se, lx, sx, start=45, sl_pct=sl_pct)
+
+
+# 구간 경계: start 이전 신호 무시, stop 이후 봉은 보지 않음 (stop 직전까지 청산이 없으면 보유 중)
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("start,stop", [(0, 1), (0, 400), (399, None), (120, 121), (120, 250), (0, 10 ** 6)])
+def test_window_edges(seed, start, stop):
+    close, le, se, lx, sx, valid = random_case(seed, rate=0.2)
+    assert_matches(close, le, se, lx, sx, start=start, stop=stop, sl_pct=0.02, valid=valid)
+
+
+def test_stop_and_signal_on_same_bar_is_stop():
+    close = np.array([100., 100., 97., 99.])
+    le = np.array([False, True, False, False])
+    lx = np.array([False, False, True, False])
+    no = np.zeros(4, dtype=bool)
+    bt = assert_matches(close, le, no, lx, no, sl_pct=0.02)
+    assert bt["reason"].tolist() == [REASON_STOP] and bt["exit_idx"].tolist() == [2]
+
+
+def test_reentry_on_exit_bar():
+    # 1번 봉 롱, 3번 봉에서 롱 청산 신호 + 숏 진입 -> 같은 봉에서 숏으로 재진입, 끝까지 보유
+    close = np.array([100., 101., 102., 103., 104.])
+    no = np.zeros(5, dtype=bool)
+    le = np.array([False, True, False, False, False])
+    se = np.array([False, False, False, True, False])
+    lx = se.copy()
+    bt = assert_matches(close, le, se, lx, no)
+    assert bt["exit_idx"].tolist() == [3]
+    assert (bt["open_side"], bt["open_entry_idx"]) == (SHORT, 3)
+
+
+def test_invalid_bar_skips_exit_and_stop():
+    # 손절 가격까지 떨어진 봉이 무효(NaN 지표)면 건너뛰고 다음 유효 봉에서 판단
+    close = np.array([100., 100., 90., 95., 99.])
+    no = np.zeros(5, dtype=bool)
+    le = np.array([False, True, False, False, False])
+    lx = np.array([False, False, True, False, True])
+    valid = np.array([True, True, False, True, True])
+    bt = assert_matches(close, le, no, lx, no, sl_pct=0.05, valid=valid)
+    assert bt["exit_idx"].tolist() == [3] and bt["reason"].tolist() == [REASON_STOP]
+
+
+# 조합 일괄 상태 머신 = 조합별 resolve_positions
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_single(seed):
+    rng = np.random.default_rng(seed)
+    close, *_ = random_case(seed)
+    p = 6
+    le, se, lx, sx = (rng.random((4, len(close), p)) < 0.05)
+    valid = rng.random((len(close), 1)) > 0.1
+    start = rng.integers(0, 100, p)
+    sl_pct = np.array([np.inf, 0.01, 0.02, 0.03, np.inf, 0.05])
+    batch = backtest_engine.resolve_positions_batch(close, le, se, lx, sx, start=start, sl_pct=sl_pct, valid=valid)
+    for j in range(p):
+        bt = backtest_engine.resolve_positions(close, le[:, j], se[:, j], lx[:, j], sx[:, j], start=int(start[j]),
+                                               sl_pct=None if np.isinf(sl_pct[j]) else sl_pct[j], valid=valid[:, 0])
+        assert batch["trades"][j] == len(bt["pnl"])
+        assert batch["wins"][j] == int((bt["pnl"] > 0).sum())
+        assert batch["open_side"][j] == bt["open_side"]
+        assert np.isclose(batch["balance"][j], backtest_engine.compound_balance(1000000, bt["pnl"]))
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_fetcher
+
+
+# time.monotonic / time.sleep 대신 쓰는 가짜 시계 (sleep 하면 그만큼 시간이 흐름)
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_charges_full_cost(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(data_fetcher.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(data_fetcher.time, "sleep", clock.sleep)
+
+    bucket = data_fetcher.TokenBucket(rate=8, burst=8)
+    bucket.acquire(20)  # 처음 8개는 바로, 나머지 12개는 초당 8개씩
+    assert abs(clock.now - 1.5) < 1e-9
+
+    bucket.acquire(1)  # 다 써버린 상태: 1/8 초 대기
+    assert abs(clock.now - 1.625) < 1e-9
+
+
+def test_token_bucket_rate_over_many_requests(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(data_fetcher.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(data_fetcher.time, "sleep", clock.sleep)
+
+    bucket = data_fetcher.TokenBucket(rate=8, burst=8)
+    for _ in range(5):
+        bucket.acquire(10)  # 업비트 10페이지 요청 x 5 = 50 토큰 = burst 8 + 42 / 8 초
+    assert abs(clock.now - 42 / 8) < 1e-9
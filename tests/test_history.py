@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_analyzer
+import data_fetcher
+import history
+
+LIMITS = {"upbit": {"max_concurrency": 2, "rate": 1000.0, "burst": 1000}}
+NOW = pd.Timestamp("2024-03-01 00:30")
+START = pd.Timestamp("2024-02-01")
+
+
+# to 이전 count 개 1시간봉, broken 에 있는 to (또는 break_nth 번째로 요청된 페이지) 는 재시도해도 실패
+class FakePages:
+    def __init__(self, broken=(), break_nth=None):
+        self.broken = set(broken)
+        self.break_nth = break_nth
+        self.calls = []
+
+    def __call__(self, ticker, interval_str, to, count):
+        if to not in self.calls and len(set(self.calls)) + 1 == self.break_nth:
+            self.broken.add(to)
+        self.calls.append(to)
+        if to in self.broken:
+            raise ConnectionError(f"broken page {to}")
+        index = pd.date_range(end=to - pd.Timedelta(hours=1), periods=count, freq="1h")
+        price = np.arange(len(index), dtype=np.float64) + 100
+        return pd.DataFrame({"open": price, "high": price, "low": price, "close": price, "volume": price}, index=index)
+
+
+# 최근 히스토리 메모리 저장소 (bar_store.BarStore 의 load / save 만)
+class MemoryStore:
+    def __init__(self):
+        self.frames = {}
+
+    def load(self, source, ticker, interval):
+        return self.frames.get((source, ticker, interval))
+
+    def save(self, source, ticker, interval, df):
+        self.frames[(source, ticker, interval)] = df
+
+
+def test_failed_page_is_not_saved_and_refetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_fetcher, "BACKOFF_BASE", 0.0)
+    pages = history.plan_pages("1시간", START, NOW)
+    broken = pages[len(pages) // 2]
+
+    fetch = FakePages(broken=[broken])
+    loader = history.HistoryLoader(fetch, root=str(tmp_path), limits=LIMITS)
+    try:
+        loader.load("KRW-BTC", "1시간", START, now=NOW)
+        raised = False
+    except ConnectionError:
+        raised = True
+    assert raised
+    done, total = loader.progress("KRW-BTC", "1시간", START, NOW)
+    assert (done, total) == (len(pages) - 2, len(pages))  # 실패 페이지 + 진행 중인 최신 페이지만 빠짐
+
+    # 다시 실행하면 실패한 페이지(와 최신 페이지)만 요청하고 빈 구간 없이 이어짐
+    fetch = FakePages()
+    loader = history.HistoryLoader(fetch, root=str(tmp_path), limits=LIMITS)
+    df = loader.load("KRW-BTC", "1시간", START, now=NOW)
+    assert sorted(fetch.calls) == sorted([pages[0], broken])
+    expected = pd.date_range(START, NOW, freq="1h", inclusive="left")
+    assert df.index.equals(expected)
+
+
+def test_backfill_skips_gapped_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_fetcher, "BACKOFF_BASE", 0.0)
+    loader = history.HistoryLoader(FakePages(break_nth=2), root=str(tmp_path), limits=LIMITS)
+    store = MemoryStore()
+    asset = {"name": "BTC", "ticker": "KRW-BTC", "source": "upbit"}
+    batch_analyzer.backfill_upbit({"1시간": 30}, assets=[asset], store=store, loader=loader)
+    assert store.frames == {}
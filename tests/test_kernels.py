@@ -0,0 +1,83 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kernels
+import streaming
+
+
+# 열마다 시작 봉이 다르고 (앞쪽 NaN = 상장 전), 시작 이후 빈 봉 / 긴 공백이 있는 가격 배열
+def random_prices(bars=600, cols=5, seed=0):
+    rng = np.random.default_rng(seed)
+    x = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (bars, cols)), axis=0))
+    x[rng.random((bars, cols)) < 0.05] = np.nan
+    for j, start in enumerate([0, 1, 37, 250, bars - 3][:cols]):
+        x[:start, j] = np.nan
+    x[300:340, 0] = np.nan  # 긴 공백
+    return x
+
+
+# 기준 구현: 열마다 상태 기반 점화식 (streaming.py) 을 봉 단위로
+def reference(x, make):
+    out = np.full(x.shape, np.nan)
+    for j in range(x.shape[1]):
+        state = make(j)
+        out[:, j] = [state.update(v) for v in x[:, j].tolist()]
+    return out
+
+
+def assert_close(actual, expected):
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("adjust", [True, False])
+@pytest.mark.parametrize("min_periods", [0, 1, 14])
+def test_ewm_mean_matches_recurrence(adjust, min_periods):
+    x = random_prices()
+    alpha = np.array([0.5, 0.1, 1 / 14, 2 / 201, 1.0])
+    out = kernels.ewm_mean(x, alpha, adjust, min_periods)
+    assert_close(out, reference(x, lambda j: streaming.EwmState(1 / alpha[j] - 1, adjust, min_periods)))
+    if not adjust:
+        return  # adjust=False 의 빈 봉 다음 가중치는 pandas 버전마다 달라서 (3.0 부터 경과 봉 기준) 점화식만 기준
+    for j in range(x.shape[1]):
+        expected = pd.Series(x[:, j]).ewm(alpha=alpha[j], adjust=adjust, min_periods=min_periods).mean().to_numpy()
+        assert_close(out[:, j], expected)
+
+
+@pytest.mark.parametrize("length", [1, 2, 14, 28])
+def test_rsi_matches_recurrence(length):
+    x = random_prices(seed=length)
+    assert_close(kernels.rsi(x, length), reference(x, lambda j: streaming.RSIState(length)))
+    assert_close(kernels.rsi(x[:, 2], length), reference(x[:, 2:3], lambda j: streaming.RSIState(length))[:, 0])
+
+
+def test_rsi_lengths_per_column():
+    x = random_prices(seed=3)
+    lengths = np.array([7, 14, 21, 14, 2])
+    assert_close(kernels.rsi(x, lengths), reference(x, lambda j: streaming.RSIState(int(lengths[j]))))
+
+
+# EMA 는 열마다 첫 유효 봉부터 시작 (상태 기반 계산에는 시작 봉부터 넣음)
+@pytest.mark.parametrize("length", [1, 5, 25, 200])
+def test_ema_matches_recurrence(length):
+    x = random_prices(seed=length)
+    out = kernels.ema(x, length)
+    for j in range(x.shape[1]):
+        start = int(kernels.first_valid(x[:, j:j + 1])[0])
+        expected = np.full(len(x), np.nan)
+        expected[start:] = reference(x[start:, j:j + 1], lambda _: streaming.EMAState(length))[:, 0]
+        assert_close(out[:, j], expected)
+
+
+def test_ema_constant_columns_share_one_scan():
+    x = random_prices(seed=9)
+    lengths = np.array([5, 25, 5, 25, 120])
+    out = kernels.ema(x, lengths)
+    for j, length in enumerate(lengths.tolist()):
+        assert_close(out[:, j], kernels.ema(x[:, j], length))
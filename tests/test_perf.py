@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_fetcher
+import perf
+
+LIMITS = {"fake": {"max_concurrency": 3, "rate": 1000.0, "burst": 1000}}
+
+
+# 실행 하나: 가짜 소스에서 n 건 수집 (수집 스레드 풀 안에서 span / count 기록)
+def run(n, recorder, barrier):
+    source = data_fetcher.FakeSource(latency=0.01, bars=50)
+    tasks = [{"source": "fake", "args": (f"T{i}", "1시간"), "label": f"T{i}"} for i in range(n)]
+    with perf.recording(recorder):
+        barrier.wait()
+        perf.PERF.count("tasks_total", n)
+        for _ in data_fetcher.iter_fetch(tasks, {"fake": source}, limits=LIMITS):
+            pass
+
+
+def test_concurrent_runs_keep_separate_reports():
+    live, offline = perf.Recorder(), perf.Recorder()
+    barrier = threading.Barrier(2)
+    threads = [threading.Thread(target=run, args=(n, recorder, barrier)) for n, recorder in ((7, live), (3, offline))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for n, recorder in ((7, live), (3, offline)):
+        report = recorder.export()
+        assert report["stages"]["fetch"]["count"] == n
+        assert perf.counter_totals(report)["tasks_total"] == n
+        assert {span["task"] for span in report["spans"]} == {f"T{i}" for i in range(n)}
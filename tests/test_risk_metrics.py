@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_analyzer
+import indicators
+import risk_metrics
+import trade_records
+
+
+# 가격이 변하지 않는 400봉: 청산된 거래 0건 (RSI 전략은 진입도 없음)
+def flat_frame(bars=400):
+    index = pd.date_range("2024-01-01", periods=bars, freq="1h")
+    price = np.full(bars, 100.0)
+    return pd.DataFrame({"open": price, "high": price, "low": price, "close": price, "volume": np.ones(bars)}, index=index)
+
+
+def test_run_strategy_without_trades():
+    df = flat_frame()
+    ind = indicators.IndicatorCache().frame(df)
+    for strategy in batch_analyzer.STRATEGY_NAMES:
+        res = batch_analyzer.run_strategy(df, strategy, ind)
+        assert res["trades"] == 0
+        assert res["return"] == 0
+        assert res["max_drawdown"] == 0
+        assert res["avg_hold_hours"] == 0
+        assert (res["equity_curve"]["equity"] == 1000000).all()
+
+
+def test_calculate_metrics_without_trades():
+    df = flat_frame()
+    times = trade_records.index_times(df.index)
+    bt = {"entry_idx": np.empty(0, dtype=np.int64), "exit_idx": np.empty(0, dtype=np.int64),
+          "side": np.empty(0, dtype=np.int8), "reason": np.empty(0, dtype=np.int8), "pnl": np.empty(0),
+          "open_side": 0, "open_entry_idx": -1}
+    equity, held_bars, hold_ns = risk_metrics.equity_curve(times, df["close"].to_numpy(), bt, 1000000)
+    assert (equity == 1000000).all() and held_bars == 0 and hold_ns == 0
+
+    values = {"close": df["close"].to_numpy(), "RSI": np.full(len(df), np.nan)}
+    res = batch_analyzer.calculate_metrics(1000000, 1000000, trade_records.empty_trades(0), values, "RSI v1",
+                                           curve=(times, equity, held_bars, hold_ns))
+    assert res["trades"] == 0 and res["exposure"] == 0
+    assert res["sharpe"] == 0 and res["sortino"] == 0
+    assert len(res["equity_curve"]) == len(df)
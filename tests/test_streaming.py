@@ -0,0 +1,186 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backtest_engine
+import batch_analyzer
+import indicators
+import parallel
+import strategies
+import streaming
+import trade_records
+
+
+def random_frame(bars=1500, seed=0, holes=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    if holes:
+        close[rng.choice(np.arange(300, bars), holes, replace=False)] = np.nan
+    index = pd.date_range("2024-01-01", periods=bars, freq="1h")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": np.ones(bars)}, index=index)
+
+
+# 명세 하나를 배치 경로(지표 커널 + run_backtest)로 실행한 거래 기록
+def batch_trades(df, name, params=None):
+    program = strategies.STRATEGIES[name]
+    params = program.param_values(params)
+    values = program.values(indicators.IndicatorCache().frame(df), params)
+    bt = backtest_engine.run_backtest(values["close"], program.signals(values, params),
+                                      start=program.warmup_for(params), sl_pct=program.stop_loss_for(params))
+    times = trade_records.index_times(df.index)
+    return trade_records.from_exits(times, bt["exit_idx"], bt["pnl"], bt["side"], program.reason_codes(bt["side"], bt["reason"]))
+
+
+def assert_same_trades(stream, expected):
+    trades = stream.trades[:stream.n_trades]
+    assert len(expected) > 0
+    assert np.array_equal(trades["time"], expected["time"])
+    assert np.array_equal(trades["side"], expected["side"])
+    assert np.array_equal(trades["reason"], expected["reason"])
+    assert np.allclose(trades["pnl"], expected["pnl"], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("name", list(strategies.STRATEGIES))
+@pytest.mark.parametrize("holes", [0, 20])
+def test_stream_matches_backtest(name, holes):
+    df = random_frame(seed=len(name), holes=holes)
+    stream = streaming.SpecStream(name).feed(df)
+    assert_same_trades(stream, batch_trades(df, name))
+
+
+# 기본값이 아닌 파라미터 (sweep 격자의 다른 조합)도 명세에서 그대로
+@pytest.mark.parametrize("name", list(strategies.STRATEGIES))
+def test_stream_uses_spec_params(name):
+    program = strategies.STRATEGIES[name]
+    params = {key: values[0] for key, values in program.sweep.items()}
+    df = random_frame(seed=7)
+    stream = streaming.SpecStream(name, params).feed(df)
+    assert stream.sl_pct == program.stop_loss_for(params)
+    assert_same_trades(stream, batch_trades(df, name, params))
+
+
+# 진행 중인 마지막 봉을 여러 번 갱신해도 마감 값만 반영된 것과 같음
+def test_stream_rewrites_in_progress_bar():
+    df = random_frame(seed=3)
+    stream = streaming.SpecStream("RSI v2 (Smart)").feed(df.iloc[:-1])
+    last = df.index[-1]
+    for close in (90.0, 120.0, df["close"].iloc[-1]):
+        stream.update(last, close)
+    assert_same_trades(stream, batch_trades(df, "RSI v2 (Smart)"))
+
+
+# 배치 한 번으로 채운 스트림 = 봉 단위로 처음부터 반영한 스트림 (이후 새 봉 / 진행 중인 봉 갱신까지)
+@pytest.mark.parametrize("name", list(strategies.STRATEGIES))
+@pytest.mark.parametrize("holes", [0, 20])
+def test_filled_stream_matches_fed_stream(name, holes):
+    df = random_frame(bars=1600, seed=11 + len(name), holes=holes)
+    head, tail = df.iloc[:1500], df.iloc[1500:]
+    fed = streaming.SpecStream(name).feed(head)
+    filled = streaming.SpecStream(name).fill(head, indicators.IndicatorCache().frame(head))
+
+    assert filled.position == fed.position and filled.bars == fed.bars
+    states = ("balance", "held_bars", "hold_ns", "wins", "prev_close") + (("entry_price", "entry_time") if fed.position else ())
+    for state in states:
+        assert np.isclose(getattr(filled, state), getattr(fed, state), rtol=1e-12, equal_nan=True), state
+    assert np.allclose(filled.equity[:filled.bars], fed.equity[:fed.bars], rtol=1e-12, equal_nan=True)
+    for alias in fed.tail:
+        assert np.allclose(filled.tail[alias], fed.tail[alias], rtol=0, atol=1e-9, equal_nan=True), alias
+
+    filled.update(tail.index[0], 1.0)  # 진행 중인 봉 -> 마감 값으로 다시
+    for stream in (fed, filled):
+        stream.feed(tail)
+    assert_same_trades(filled, batch_trades(df, name))
+    assert_same_trades(fed, batch_trades(df, name))
+    a, b = fed.result(), filled.result()
+    assert a["current_signal"] == b["current_signal"]
+    for metric in ("return", "win_rate", "trades", "max_drawdown", "sharpe"):
+        if metric in a:
+            assert np.isclose(a[metric], b[metric], rtol=1e-9), metric
+
+
+# 처음 보는 프레임은 워커 프로세스에서 채운 스트림을 받아오고, 다음 실행은 새 봉만 이어서 반영
+def test_parallel_fills_streams():
+    asset = {"name": "BTC", "ticker": "KRW-BTC", "source": "upbit"}
+    df = random_frame(bars=1200, seed=5)
+    registry = streaming.StreamRegistry()
+    [(key, rows)] = parallel.run_parallel([(asset, "1시간", df.iloc[:-1])], "t", workers=2, streams=registry)
+    assert key == ("KRW-BTC", "1시간")
+    assert batch_analyzer.frame_warm(asset, "1시간", df, registry)
+
+    streamed = batch_analyzer.analyze_frame(asset, "1시간", df, "t", registry)
+    batch = batch_analyzer.analyze_frame(asset, "1시간", df, "t")
+    assert [row["strategy"] for row in streamed] == [row["strategy"] for row in batch]
+    for a, b in zip(streamed, batch):
+        assert a["trades"] == b["trades"] and a["current_signal"] == b["current_signal"]
+        assert np.isclose(a["return"], b["return"])
+
+
+# 가격 수준 전략: 95 아래 롱 / 105 위 숏, 종가가 EMA(3) 반대편으로 가면 청산, 1% 손절
+# (급락/급등 봉은 손절과 신호 청산이 함께 걸리고, 청산 봉이 아직 진입 구간이면 같은 봉에서 재진입)
+LEVEL_SPEC = {
+    "params": {"low": 95, "high": 105, "stop": 0.01},
+    "indicators": {"EMA": ("ema", 3)},
+    "long_entry": [("close", "<", "low")],
+    "long_exit": [("close", "<", "EMA")],
+    "short_entry": [("close", ">", "high")],
+    "short_exit": [("close", ">", "EMA")],
+    "valid": ["EMA"],
+    "warmup": 5,
+    "stop_loss": "stop",
+    "reasons": {"stop": trade_records.REASON_STOP_LOSS,
+                "long": trade_records.REASON_TAKE_PROFIT_LONG,
+                "short": trade_records.REASON_TAKE_PROFIT_SHORT},
+}
+
+
+def level_frame(close):
+    close = np.asarray(close, dtype=np.float64)
+    index = pd.date_range("2024-01-01", periods=len(close), freq="1h")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": np.ones(len(close))}, index=index)
+
+
+# 봉 단위 기준 구현 (test_backtest_engine.reference) -> (거래 기록, 기준 구현의 거래 목록, 신호)
+def reference_trades(df, name):
+    from test_backtest_engine import reference
+
+    program = strategies.STRATEGIES[name]
+    values = program.values(indicators.IndicatorCache().frame(df))
+    s = program.signals(values)
+    trades, _, _ = reference(values["close"], s["long_entry"], s["short_entry"], s["long_exit"], s["short_exit"],
+                             start=program.warmup, sl_pct=program.stop_loss, valid=s.get("valid"))
+    times = trade_records.index_times(df.index)
+    exit_idx = np.array([t[1] for t in trades], dtype=np.int64)
+    side = np.array([t[2] for t in trades], dtype=np.int8)
+    records = trade_records.from_exits(times, exit_idx, np.array([t[4] for t in trades]), side,
+                                       program.reason_codes(side, np.array([t[3] for t in trades])))
+    return records, trades, s
+
+
+def test_stream_matches_reference_loop(monkeypatch):
+    monkeypatch.setitem(strategies.STRATEGIES, "Level", strategies.Strategy("Level", LEVEL_SPEC))
+    close = 100 + 12 * np.sin(np.arange(800) / 15) + np.random.default_rng(1).normal(0, 2, 800)  # 95 / 105 구간을 오가는 가격
+    close[:5] = 90  # 안정화 전 진입 신호 (무시)
+    close[np.random.default_rng(2).random(800) < 0.05] = np.nan  # 빈 봉 (EMA 는 이어지지만 가격 비교는 거짓)
+    df = level_frame(close)
+
+    expected, trades, signals = reference_trades(df, "Level")
+    # 필요한 경우가 모두 들어 있는지: 손절과 신호 청산이 같은 봉, 청산 봉 재진입, 신호 청산, 양방향
+    exits = {"long": signals["long_exit"], "short": signals["short_exit"]}
+    assert any(reason == backtest_engine.REASON_STOP and exits["long" if side == backtest_engine.LONG else "short"][x]
+               for _, x, side, reason, _ in trades)
+    assert any(a[1] == b[0] for a, b in zip(trades, trades[1:]))
+    assert {t[3] for t in trades} == {backtest_engine.REASON_STOP, backtest_engine.REASON_SIGNAL}
+    assert {t[2] for t in trades} == {backtest_engine.LONG, backtest_engine.SHORT}
+    assert trades[0][0] >= 5
+
+    assert_same_trades(streaming.SpecStream("Level").feed(df), expected)
+    for split in [2, 6] + [t[1] for t in trades[:6]] + [t[1] + 1 for t in trades[:6]]:
+        # 청산 봉 / 그 다음 봉까지 배치로 채우고 나머지는 봉 단위로
+        head = df.iloc[:split]
+        stream = streaming.SpecStream("Level").fill(head, indicators.IndicatorCache().frame(head)).feed(df.iloc[split:])
+        assert_same_trades(stream, expected)
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backtest_engine
+import indicators
+import strategies
+import sweep
+
+# 명세만 있는 전략: 종가가 EMA 위면 롱, 아래로 내려가면 청산
+TREND_SPEC = {
+    "params": {"length": 20, "stop": 0.03},
+    "indicators": {"EMA": ("ema", "length")},
+    "long_entry": [("close", ">", "EMA")],
+    "long_exit": [("close", "<", "EMA")],
+    "warmup": 30,
+    "stop_loss": "stop",
+    "sweep": {"length": [10, 20, 40], "stop": [0.01, 0.03]},
+}
+
+
+def random_frame(bars=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    index = pd.date_range("2024-01-01", periods=bars, freq="1h")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": np.ones(bars)}, index=index)
+
+
+def test_spec_strategy_is_sweepable(monkeypatch):
+    program = strategies.Strategy("Trend", TREND_SPEC)
+    monkeypatch.setitem(strategies.STRATEGIES, "Trend", program)
+    df = random_frame()
+    ind = indicators.IndicatorCache().frame(df)
+
+    table = sweep.sweep_frame(df, "Trend", ind=ind)
+    assert len(table) == 6
+    for row in table.to_dict("records"):
+        params = {"length": row["length"], "stop": row["stop"]}
+        values = program.values(ind, params)
+        bt = backtest_engine.run_backtest(values["close"], program.signals(values, params),
+                                          start=program.warmup_for(params), sl_pct=program.stop_loss_for(params))
+        balance = backtest_engine.compound_balance(1000000, bt["pnl"])
+        assert row["trades"] == len(bt["pnl"])
+        assert np.isclose(row["return"], (balance - 1000000) / 1000000 * 100)
+
+
+def test_sweep_constraints_from_spec():
+    combos = sweep.expand_grid(strategies.STRATEGIES["EMA Cross"].sweep, strategies.STRATEGIES["EMA Cross"])
+    assert combos and all(c["fast"] < c["slow"] for c in combos)
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trade_index
+import trade_records
+
+TZS = [None, "Asia/Seoul", None, "America/New_York", None, None]
+
+
+# 행별 거래 기록: 구조화 배열 (tz 있음/없음), 예전 dict 목록, 거래 없는 행, 기록 없는 행
+# 같은 시각 거래, pnl = -1 (잔고 0), pnl < -1 (부호 반전) 포함
+def random_histories(seed=0):
+    rng = np.random.default_rng(seed)
+    hours = pd.Timestamp("2024-01-01").value + rng.integers(0, 24 * 60, (6, 40)) * 3_600_000_000_000
+    histories = []
+    for row in range(6):
+        times = np.sort(hours[row])
+        times[5] = times[4]
+        pnl = rng.normal(0, 0.05, len(times))
+        pnl[[7, 20]] = [-1.0, -1.5] if row == 2 else pnl[[7, 20]]
+        records = trade_records.from_exits(times, np.arange(len(times)), pnl, 1)
+        histories.append(records)
+    histories[4] = trade_records.to_dicts(histories[4])
+    histories[5] = None
+    histories.append(trade_records.empty_trades())
+    return histories, TZS + [None]
+
+
+# 기준 구현: 행마다 [start, end] (양끝 포함, 현지 시각) 안의 거래를 순서대로 복리
+def reference(histories, tzs, start, end):
+    out = {"return": [], "win_rate": [], "trades": [], "wins": []}
+    for h, tz in zip(histories, tzs):
+        if isinstance(h, list):
+            times = trade_index.parse_trade_times([t["time"] for t in h])
+            pnl = np.array([t["pnl"] for t in h])
+        elif h is None:
+            times, pnl = np.empty(0, dtype=np.int64), np.empty(0)
+        else:
+            times, pnl = trade_records.wall_times(h, tz), h["pnl"]
+        order = np.argsort(times, kind="stable")
+        growth, wins, n = 1.0, 0, 0
+        for t, p in zip(times[order].tolist(), pnl[order].tolist()):
+            if (start is None or t >= pd.Timestamp(start).value) and (end is None or t <= pd.Timestamp(end).value):
+                growth *= 1 + p
+                wins += p > 0
+                n += 1
+        out["return"].append((growth - 1) * 100)
+        out["win_rate"].append(wins / n * 100 if n else 0.0)
+        out["trades"].append(n)
+        out["wins"].append(wins)
+    return out
+
+
+def window_edges(index):
+    times = np.sort(index.times)
+    first, last, mid = (pd.Timestamp(v) for v in (times[0], times[-1], times[len(times) // 2]))
+    hour = pd.Timedelta(hours=1)
+    return [
+        (None, None), (first, None), (None, last), (first, last),  # 전체
+        (mid, mid),                                                 # 한 시각 (같은 시각 거래 모두)
+        (mid, mid - hour),                                          # 빈 구간 (start > end)
+        (first - hour, first - pd.Timedelta(1)), (last + pd.Timedelta(1), None),  # 범위 밖
+        (first + pd.Timedelta(1), last - pd.Timedelta(1)),         # 양끝 거래 제외
+        (mid - 3 * hour, mid + 5 * hour), (str(mid.date()), None), (None, str(mid.date())),
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_window_stats_matches_reference(seed):
+    histories, tzs = random_histories(seed)
+    index = trade_index.TradeIndex.from_histories(histories, tzs)
+    for start, end in window_edges(index):
+        stats = index.window_stats(start, end)
+        expected = reference(histories, tzs, start, end)
+        assert stats["trades"].tolist() == expected["trades"], (start, end)
+        assert stats["wins"].tolist() == expected["wins"], (start, end)
+        assert np.allclose(stats["win_rate"], expected["win_rate"]), (start, end)
+        assert np.allclose(stats["return"], expected["return"], rtol=1e-9, atol=1e-9), (start, end)
+
+
+def test_window_bounds_slice_rows():
+    histories, tzs = random_histories(1)
+    index = trade_index.TradeIndex.from_histories(histories, tzs)
+    for start, end in window_edges(index):
+        stats = index.window_stats(start, end)
+        for row in range(index.n_rows):
+            lo, hi = stats["lo"][row], stats["hi"][row]
+            assert index.offsets[row] <= lo <= hi <= index.offsets[row + 1]
+            assert (index.row_ids[lo:hi] == row).all()
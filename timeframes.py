@@ -0,0 +1,90 @@
+# --- 봉 길이 -> pandas 리샘플 규칙 ---
+INTERVAL_RULES = {"5분": "5min", "15분": "15min", "30분": "30min", "1시간": "1h", "4시간": "4h", "1일": "24h"}
+INTERVAL_MINUTES = {"5분": 5, "15분": 15, "30분": 30, "1시간": 60, "4시간": 240, "1일": 1440}
+
+# --- 세션(거래 시간대) 정렬 규칙 ---
+# tz: 봉 경계를 계산할 기준 타임존 (tz 없는 인덱스는 이 타임존의 현지 시각으로 간주)
+# intraday_offset: 분/시간 봉의 기준 시각 (자정 기준 오프셋)
+# day_offset: 일봉 경계 시각
+SESSION_RULES = {
+    # Upbit: KST 09:00 (UTC 00:00) 에 일봉이 바뀌고 4시간봉도 09시 기준
+    "upbit_krw": {"tz": "Asia/Seoul", "intraday_offset": "9h", "day_offset": "9h"},
+    # Yahoo 암호화폐: UTC 자정 기준 24시간
+    "crypto_utc": {"tz": "UTC", "intraday_offset": "0h", "day_offset": "0h"},
+    # 미국 주식/ETF: 정규장 09:30 ET 기준 (09:30~13:30, 13:30~16:00)
+    "us_equity": {"tz": "America/New_York", "intraday_offset": "9h30min", "day_offset": "0h"},
+    # CME 선물: 18:00 ET 에 다음 거래일 세션 시작
+    "us_futures": {"tz": "America/New_York", "intraday_offset": "18h", "day_offset": "18h"},
+}
+
+
+def get_session(asset):
+    if asset.get('source') == "upbit":
+        return "upbit_krw"
+    category = asset.get('category')
+    if category in ("주식", "ETF"):
+        return "us_equity"
+    if category == "선물":
+        return "us_futures"
+    return "crypto_utc"
+
+
+# --- 소스별 수집 계획: 목표 봉 길이 -> 실제로 받아올 기준(base) 봉 길이 ---
+# Yahoo 는 기간(period) 단위로 한 번에 내려주므로 촘촘한 봉 하나에서 나머지를 만듭니다.
+#   (5분봉은 최근 1달만 제공 -> 15/30분까지만 파생, 1시간봉(2년)에서 4시간/일봉 파생)
+# Upbit 은 200개 단위 페이지로 요청하므로 리샘플해도 요청 수가 줄지 않아 네이티브 봉을 그대로 받습니다.
+FETCH_PLANS = {
+    "upbit": {"5분": "5분", "15분": "15분", "30분": "30분", "1시간": "1시간", "4시간": "4시간", "1일": "1일"},
+    "yahoo": {"5분": "5분", "15분": "5분", "30분": "5분", "1시간": "1시간", "4시간": "1시간", "1일": "1시간"},
+}
+
+
+def plan_fetch(source, intervals):
+    # 기준 봉 길이 -> 그 봉에서 만들 목표 봉 길이 목록
+    plan = FETCH_PLANS.get(source, {})
+    groups = {}
+    for interval in intervals:
+        base = plan.get(interval, interval)
+        groups.setdefault(base, []).append(interval)
+    return groups
+
+
+def base_ratio(base, targets):
+    # 파생 봉을 목표 개수만큼 만들려면 기준 봉이 몇 배 필요한지
+    return max(INTERVAL_MINUTES[t] // INTERVAL_MINUTES[base] for t in targets)
+
+
+# --- OHLCV 리샘플 ---
+OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def resample_ohlcv(df, interval_str, session="crypto_utc"):
+    if df is None or df.empty:
+        return df
+    rules = SESSION_RULES[session]
+    rule = INTERVAL_RULES[interval_str]
+    offset = rules['day_offset'] if interval_str == "1일" else rules['intraday_offset']
+
+    # 서머타임 전환에도 경계가 현지 시각에 고정되도록 현지 시각(naive)으로 바꿔서 리샘플
+    tz = df.index.tz
+    local = df
+    if tz is not None:
+        local = df.tz_convert(rules['tz']).tz_localize(None)
+
+    agg = {c: how for c, how in OHLCV_AGG.items() if c in df.columns}
+    out = local.resample(rule, origin="start_day", offset=offset, label="left", closed="left").agg(agg)
+    out = out.dropna(subset=['close'])
+
+    if tz is not None:
+        out = out.tz_localize(rules['tz'], ambiguous=True, nonexistent="shift_forward")
+    return out
+
+
+def build_timeframes(base_df, base_interval, targets, session="crypto_utc"):
+    frames = {}
+    for interval in targets:
+        if interval == base_interval:
+            frames[interval] = base_df
+        else:
+            frames[interval] = resample_ohlcv(base_df, interval, session)
+    return frames
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+import trade_records
+
+# --- 결과 행별 거래 내역 인덱스 ---
+# 모든 행의 거래를 (행, 시각) 순으로 정렬된 열 배열 하나로 이어 붙이고,
+# 누적합(로그 수익, 승리 수 등)을 미리 계산해 둡니다.
+# 임의 기간의 행별 수익률/승률/거래 수는 searchsorted 두 번 + 누적합 차이로 구합니다.
+#
+# 시각은 대시보드 비교 기준과 같은 "현지 시각(tz 제거)" 의 epoch-ns 입니다.
+
+
+def parse_trade_times(times):
+    # str(Timestamp) 형식 ("YYYY-MM-DD HH:MM:SS[+09:00]") -> tz 를 떼어낸 현지 시각
+    wall = [t[:19] if isinstance(t, str) else None for t in times]
+    parsed = pd.to_datetime(wall, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    return parsed.as_unit("ns").asi8.copy() if len(wall) else np.empty(0, dtype=np.int64)
+
+
+class TradeIndex:
+    def __init__(self, row_ids, times, pnl, n_rows, has_history):
+        order = np.lexsort((times, row_ids))
+        self.row_ids = row_ids[order]
+        self.times = times[order]
+        self.pnl = pnl[order]
+        self.n_rows = n_rows
+        self.has_history = has_history  # trade_history 가 있는 행 (bool, 행 수)
+        self.offsets = np.searchsorted(self.row_ids, np.arange(n_rows + 1))
+
+        # 시각을 전체 고유 시각 순위로 바꿔 (행, 순위) 를 하나의 정렬 키로 만듦
+        self.unique_times = np.unique(self.times)
+        self.stride = len(self.unique_times) + 1
+        self.keys = self.row_ids * self.stride + np.searchsorted(self.unique_times, self.times)
+
+        # 누적합 (앞에 0 하나): 로그 |1+pnl|, 음수 인자 수, 0 인자 수, 승리 수
+        factor = 1 + self.pnl
+        with np.errstate(divide="ignore"):
+            log_abs = np.where(factor != 0, np.log(np.abs(factor)), 0.0)
+        self.cum_log = np.concatenate(([0.0], np.cumsum(log_abs)))
+        self.cum_neg = np.concatenate(([0], np.cumsum(factor < 0)))
+        self.cum_zero = np.concatenate(([0], np.cumsum(factor == 0)))
+        self.cum_win = np.concatenate(([0], np.cumsum(self.pnl > 0)))
+
+    # histories: 행별 거래 기록 (trade_records 구조화 배열, 또는 예전 스냅샷의 dict 목록)
+    # tzs: 행별 거래 시각 타임존 (구조화 배열의 UTC 시각을 현지 시각으로 바꿀 때 사용)
+    @classmethod
+    def from_histories(cls, histories, tzs=None):
+        n_rows = len(histories)
+        tzs = tzs if tzs is not None else [None] * n_rows
+        has_history = np.array([isinstance(h, (list, np.ndarray)) for h in histories], dtype=bool)
+
+        row_parts, time_parts, pnl_parts = [], [], []
+        for row, (h, tz) in enumerate(zip(histories, tzs)):
+            if isinstance(h, np.ndarray):
+                times = trade_records.wall_times(h, tz)
+                pnl = h['pnl']
+            elif isinstance(h, list):
+                times = parse_trade_times([t.get('time') for t in h])
+                pnl = np.array([t.get('pnl', np.nan) for t in h], dtype=np.float64)
+            else:
+                continue
+            row_parts.append(np.full(len(h), row, dtype=np.int64))
+            time_parts.append(times)
+            pnl_parts.append(pnl)
+
+        row_ids = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.int64)
+        times = np.concatenate(time_parts) if time_parts else np.empty(0, dtype=np.int64)
+        pnl = np.concatenate(pnl_parts).astype(np.float64) if pnl_parts else np.empty(0, dtype=np.float64)
+
+        valid = (times != np.iinfo(np.int64).min) & ~np.isnan(pnl)  # 시각 파싱 실패 / pnl 없음 제외
+        return cls(row_ids[valid], times[valid], pnl[valid], n_rows, has_history)
+
+    @classmethod
+    def from_frame(cls, df):
+        if 'trade_history' not in df.columns:
+            return cls.from_histories([None] * len(df))
+        tzs = df['tz'].tolist() if 'tz' in df.columns else None
+        return cls.from_histories(df['trade_history'].tolist(), tzs)
+
+    # --- 전체 기간 시각 범위 ---
+    def time_range(self):
+        if len(self.times) == 0:
+            return None, None
+        return pd.Timestamp(self.times.min()), pd.Timestamp(self.times.max())
+
+    # --- 행별 [start, end] 구간 위치 ---
+    def _bounds(self, start=None, end=None):
+        rows = np.arange(self.n_rows, dtype=np.int64)
+        if start is None:
+            lo = self.offsets[:-1]
+        else:
+            rank = np.searchsorted(self.unique_times, pd.Timestamp(start).value, side="left")
+            lo = np.searchsorted(self.keys, rows * self.stride + rank, side="left")
+        if end is None:
+            hi = self.offsets[1:]
+        else:
+            rank = np.searchsorted(self.unique_times, pd.Timestamp(end).value, side="right")
+            hi = np.searchsorted(self.keys, rows * self.stride + rank, side="left")
+        return lo, hi
+
+    # --- 기간 통계 (행 순서 그대로의 배열) ---
+    # 수익률(%)은 기간 안의 거래를 순서대로 복리 적용한 값
+    def window_stats(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        trades = hi - lo
+        log_sum = self.cum_log[hi] - self.cum_log[lo]
+        sign = np.where((self.cum_neg[hi] - self.cum_neg[lo]) % 2 == 1, -1.0, 1.0)
+        wiped = (self.cum_zero[hi] - self.cum_zero[lo]) > 0
+        growth = np.where(wiped, 0.0, sign * np.exp(log_sum))
+        wins = self.cum_win[hi] - self.cum_win[lo]
+        win_rate = np.where(trades > 0, wins / np.maximum(trades, 1) * 100, 0.0)
+        return {
+            "return": (growth - 1) * 100,
+            "win_rate": win_rate,
+            "trades": trades,
+            "wins": wins,
+            "lo": lo,
+            "hi": hi,
+        }
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# --- 거래 기록 (구조화 배열) ---
+# 거래 1건 = (청산 시각 epoch-ns, 수익률, 포지션 방향, 청산 사유 코드) 18바이트
+# 시각은 UTC 기준 epoch-ns (tz 없는 인덱스면 현지 시각 그대로). 결과 행의 "tz" 로 현지 시각을 복원합니다.
+TRADE_DTYPE = np.dtype([("time", "i8"), ("pnl", "f8"), ("side", "i1"), ("reason", "i1")])
+
+# 청산 사유 코드 -> 표시용 문자열 (None: 사유 표시 없음, RSI v1 / EMA Cross)
+REASON_NONE, REASON_STOP_LOSS, REASON_TAKE_PROFIT_LONG, REASON_TAKE_PROFIT_SHORT = 0, 1, 2, 3
+REASON_LABELS = (None, "Stop Loss", "Take Profit (RSI > 70)", "Take Profit (RSI < 30)")
+
+
+def empty_trades(capacity=0):
+    return np.empty(capacity, dtype=TRADE_DTYPE)
+
+
+def index_times(index):
+    # DatetimeIndex -> epoch-ns (해상도와 무관하게 ns)
+    return pd.DatetimeIndex(index).as_unit("ns").asi8
+
+
+def index_tz(index):
+    tz = pd.DatetimeIndex(index).tz
+    return str(tz) if tz is not None else None
+
+
+# 엔진 결과(청산 봉 위치 등)에서 한 번에 채우기
+def from_exits(times, exit_idx, pnl, side, reason=REASON_NONE):
+    records = empty_trades(len(exit_idx))
+    records["time"] = times[exit_idx]
+    records["pnl"] = pnl
+    records["side"] = side
+    records["reason"] = reason
+    return records
+
+
+# 현지 시각(tz 제거) epoch-ns: 대시보드 기간 비교 기준
+def wall_times(records, tz=None):
+    times = records["time"] if isinstance(records, np.ndarray) and records.dtype == TRADE_DTYPE else records
+    if tz is None:
+        return np.asarray(times, dtype=np.int64)
+    index = pd.DatetimeIndex(np.asarray(times, dtype="datetime64[ns]")).tz_localize("UTC").tz_convert(tz)
+    return index.tz_localize(None).as_unit("ns").asi8
+
+
+# --- 표시용 변환 (화면에 거래 목록을 보여줄 때만) ---
+# 예전 형식 {'time': str(Timestamp), 'type': 'Exit', 'pnl': ..., ['reason': ...]} 목록
+def to_dicts(records, tz=None):
+    if isinstance(records, list):
+        return records
+    index = pd.DatetimeIndex(records["time"].astype("datetime64[ns]"))
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    out = []
+    for time, pnl, code in zip(index, records["pnl"].tolist(), records["reason"].tolist()):
+        trade = {'time': str(time), 'type': 'Exit', 'pnl': pnl}
+        if REASON_LABELS[code] is not None:
+            trade['reason'] = REASON_LABELS[code]
+        out.append(trade)
+    return out
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+import backtest_engine
+import indicators
+import strategies
+
+# --- 워크포워드 (구간 이동) 평가 ---
+# 학습(train) 구간과 바로 뒤 검증(test) 구간을 step 봉씩 밀면서 같은 전략의 성과를 구간별로 비교합니다.
+# 지표/신호는 전체 히스토리로 한 번만 계산하고 구간마다 백테스트를 다시 돌리지 않습니다.
+#
+# 구간 [lo, hi) 결과 = backtest_engine.resolve_positions(start=lo, stop=hi) 와 같음
+#   (lo 이후 첫 진입 후보에서 시작, 청산 봉이 hi 전인 거래까지, 끝까지 보유 중인 포지션은 제외)
+# 진입 후보 봉마다 "여기서 진입하면 언제 청산되고 다음 진입은 어느 봉인지" 가 구간과 무관하게 정해져 있으므로
+# 진입 후보 = 노드, 다음 진입 = 간선으로 보고 2^k 단계 점프 표(누적 수익 배율 / 승 수 / 마지막 청산 봉)를 만들어 두면
+# 구간 하나는 log2(진입 후보 수) 번의 배열 연산이고, 모든 구간을 한꺼번에 처리합니다.
+TRAIN_BARS = 1000
+TEST_BARS = 250
+STEP_BARS = 250
+BLOCK = 64  # 손절 검색 블록 크기 (블록 안은 직접 비교, 블록 사이는 블록 최솟값으로 건너뜀)
+
+
+# 구간 최솟값 표: table[k][i] = min(values[i:i + 2^k])
+def _min_table(values):
+    table = [values]
+    width = 1
+    while width * 2 <= len(values):
+        prev = table[-1]
+        table.append(np.minimum(prev[:-width], prev[width:]))
+        width *= 2
+    return table
+
+
+# 위치마다 (start, limit] 안에서 값 <= threshold 인 첫 위치 (없으면 -1), 최솟값 표로 큰 칸부터 건너뜀
+def _first_in_table(table, start, limit, threshold):
+    pos = start + 1
+    for k in reversed(range(len(table))):
+        width = 1 << k
+        level = table[k]
+        fits = pos + width - 1 <= limit
+        idx = np.minimum(pos, len(level) - 1)
+        pos = np.where(fits & (level[idx] > threshold), pos + width, pos)
+    return np.where((pos <= limit) & ~np.isnan(threshold), pos, -1)
+
+
+# 블록 하나씩 (행마다 다른 블록) lo..limit 안에서 값 <= threshold 인 첫 위치 (없으면 -1)
+def _scan_blocks(blocks, block, lo, limit, threshold):
+    pos = block[:, None] * BLOCK + np.arange(BLOCK)
+    hit = (pos >= lo[:, None]) & (pos <= limit[:, None]) & (blocks[block] <= threshold[:, None])
+    return np.where(hit.any(axis=1), pos[np.arange(len(block)), hit.argmax(axis=1)], -1)
+
+
+# 위치마다 (start, limit] 안에서 values <= threshold 인 첫 봉 (없으면 -1, values 의 NaN / 무효 봉은 inf 로)
+def _first_at_or_below(values, start, limit, threshold):
+    n = len(values)
+    blocks = np.full(-(-n // BLOCK) * BLOCK, np.inf)
+    blocks[:n] = values
+    blocks = blocks.reshape(-1, BLOCK)
+    first = start + 1
+    block = np.minimum(first // BLOCK, len(blocks) - 1)
+    found = _scan_blocks(blocks, block, first, limit, threshold)
+
+    # 첫 블록에 없으면 뒤 블록들 중 최솟값이 threshold 이하인 첫 블록 안에서 다시 찾음
+    rest = np.flatnonzero((found < 0) & ((block + 1) * BLOCK <= limit))
+    if len(rest):
+        table = _min_table(blocks.min(axis=1))
+        next_block = _first_in_table(table, block[rest], limit[rest] // BLOCK, threshold[rest])
+        ok = next_block >= 0
+        rest = rest[ok]
+        found[rest] = _scan_blocks(blocks, next_block[ok], first[rest], limit[rest], threshold[rest])
+    return found
+
+
+# --- 진입 후보별 거래 (전체 히스토리 기준 1회) ---
+# resolve_positions 의 한 거래 진행(신호 청산 / 손절 / 같은 봉 재진입)을 모든 진입 후보에 대해 한 번에 계산
+def trade_graph(close, signals, sl_pct=None):
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    valid = signals.get("valid")
+    if valid is None:
+        valid = np.ones(n, dtype=bool)
+    long_entry = signals["long_entry"]
+    entries = np.flatnonzero((long_entry | signals["short_entry"]) & valid)
+    side = np.where(long_entry[entries], backtest_engine.LONG, backtest_engine.SHORT).astype(np.int8)
+    exit_idx = np.full(len(entries), n)
+    reason = np.full(len(entries), backtest_engine.REASON_SIGNAL, dtype=np.int8)
+
+    # 1. 신호 청산: 진입 다음 봉부터 첫 청산 신호 (없으면 n)
+    for s, exits in ((backtest_engine.LONG, signals["long_exit"]), (backtest_engine.SHORT, signals["short_exit"])):
+        rows = np.flatnonzero(exits & valid)
+        sel = side == s
+        k = np.searchsorted(rows, entries[sel], side="right")
+        exit_idx[sel] = np.append(rows, n)[k]
+
+    # 2. 손절: 신호 청산 봉까지 포함해 종가 검사 (숏은 부호를 뒤집어 같은 최솟값 검색)
+    if sl_pct is not None and len(entries):
+        for s, sign, factor in ((backtest_engine.LONG, 1, 1 - sl_pct), (backtest_engine.SHORT, -1, 1 + sl_pct)):
+            sel = np.flatnonzero(side == s)
+            if not len(sel):
+                continue
+            hit = _first_at_or_below(np.where(valid & ~np.isnan(close), sign * close, np.inf), entries[sel],
+                                     np.minimum(exit_idx[sel], n - 1), sign * close[entries[sel]] * factor)
+            stopped = hit >= 0
+            exit_idx[sel[stopped]] = hit[stopped]
+            reason[sel[stopped]] = backtest_engine.REASON_STOP
+
+    closed = exit_idx < n
+    entry_price = close[entries]
+    exit_price = close[np.minimum(exit_idx, n - 1)]
+    pnl = np.where(side == backtest_engine.LONG, exit_price - entry_price, entry_price - exit_price) / entry_price
+    return {
+        "entries": entries,
+        "exit_idx": exit_idx,
+        "side": side,
+        "reason": reason,
+        "pnl": np.where(closed, pnl, 0.0),
+        "next": np.searchsorted(entries, exit_idx),  # 청산 봉부터 다시 진입 후보 검색 (len(entries) = 더 없음)
+        "n": n,
+    }
+
+
+# --- 2^k 단계 점프 표 ---
+# 노드 len(entries) 는 "더 이상 거래 없음" (자기 자신으로 점프, 청산 봉 n 이라 어떤 구간에도 포함 안 됨)
+def jump_tables(graph):
+    n = graph["n"]
+    up = np.append(graph["next"], len(graph["entries"]))
+    last_exit = np.append(graph["exit_idx"], n)
+    factor = np.append(1 + graph["pnl"], 1.0)
+    wins = np.append(graph["pnl"] > 0, False).astype(np.int64)
+    levels = [(up, last_exit, factor, wins)]
+    for _ in range(max(1, int(len(up)).bit_length())):
+        up, last_exit, factor, wins = levels[-1]
+        levels.append((up[up], last_exit[up], factor * factor[up], wins + wins[up]))
+    return levels
+
+
+# 구간들 [lo, hi) 의 (잔고 배율, 거래 수, 승 수) (lo / hi: 봉 위치 배열)
+def evaluate_windows(graph, levels, lo, hi):
+    cur = np.searchsorted(graph["entries"], lo)
+    balance = np.ones(len(cur))
+    trades = np.zeros(len(cur), dtype=np.int64)
+    wins = np.zeros(len(cur), dtype=np.int64)
+    for k in reversed(range(len(levels))):
+        up, last_exit, factor, level_wins = levels[k]
+        ok = last_exit[cur] < hi
+        balance = np.where(ok, balance * factor[cur], balance)
+        trades += ok << k
+        wins += np.where(ok, level_wins[cur], 0)
+        cur = np.where(ok, up[cur], cur)
+    return balance, trades, wins
+
+
+def window_bounds(n, warmup, train=TRAIN_BARS, test=TEST_BARS, step=STEP_BARS):
+    # 학습 구간 시작 위치 (지표 안정화 이후부터), 검증 구간이 데이터 안에 다 들어오는 것만
+    return np.arange(warmup, n - train - test + 1, step)
+
+
+# --- 프레임 1개에 대해 전략의 모든 구간 평가 ---
+def walk_forward_frame(df, strategy, train=TRAIN_BARS, test=TEST_BARS, step=STEP_BARS, ind=None):
+    program = strategies.STRATEGIES[strategy]
+    if df is None or df.empty or len(df) < program.warmup + train + test:
+        return pd.DataFrame()
+    ind = ind or indicators.INDICATOR_CACHE.frame(df)
+    values = program.values(ind)
+    graph = trade_graph(values['close'], program.signals(values), program.stop_loss)
+    levels = jump_tables(graph)
+
+    starts = window_bounds(len(df), program.warmup, train, test, step)
+    out = pd.DataFrame({"window": np.arange(len(starts)),
+                        "train_start": df.index[starts],
+                        "test_start": df.index[starts + train],
+                        "test_end": df.index[starts + train + test - 1]})
+    for phase, lo, hi in (("train", starts, starts + train), ("test", starts + train, starts + train + test)):
+        balance, trades, wins = evaluate_windows(graph, levels, lo, hi)
+        out[f"{phase}_return"] = (balance - 1) * 100
+        out[f"{phase}_win_rate"] = np.where(trades > 0, wins / np.maximum(trades, 1) * 100, 0.0)
+        out[f"{phase}_trades"] = trades
+    out.insert(0, "strategy", strategy)
+    return out
+
+
+# --- 여러 프레임 결과를 한 표로 ---
+# frames: (asset dict, interval, df) 반복자
+def run_walk_forward(frames, strategy_names=None, train=TRAIN_BARS, test=TEST_BARS, step=STEP_BARS):
+    strategy_names = strategy_names or list(strategies.STRATEGIES)
+    tables = []
+    for asset, interval, df in frames:
+        ind = indicators.INDICATOR_CACHE.frame(df, asset['ticker'], interval)
+        for strategy in strategy_names:
+            table = walk_forward_frame(df, strategy, train, test, step, ind)
+            if table.empty:
+                continue
+            table.insert(0, "interval", interval)
+            table.insert(0, "category", asset.get('category', '기타'))
+            table.insert(0, "ticker", asset['ticker'])
+            table.insert(0, "asset", asset['name'])
+            tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+
+# 전략 x 봉 길이별 요약: 검증 구간 수익 비율 / 평균, 학습-검증 수익률 상관 (엣지가 다음 구간에도 이어지는지)
+def summarize(table):
+    if table.empty:
+        return pd.DataFrame()
+    rows = []
+    for (strategy, interval), part in table.groupby(["strategy", "interval"], sort=False):
+        corr = part["train_return"].corr(part["test_return"]) if len(part) > 2 else np.nan
+        rows.append({"strategy": strategy, "interval": interval, "windows": len(part),
+                     "train_return": part["train_return"].mean(), "test_return": part["test_return"].mean(),
+                     "test_positive": (part["test_return"] > 0).mean() * 100,
+                     "test_trades": part["test_trades"].mean(), "train_test_corr": corr})
+    return pd.DataFrame(rows)